@@ -0,0 +1,10 @@
+"""
+Benchmarks for journal-lib.
+
+These are plain scripts, run from the repository root with the package
+installed, e.g. `python -m benchmarks.lexer_pathological`.
+
+`python -m benchmarks.suite` runs the throughput benchmarks on journals from
+benchmarks.generator, and can write and compare JSON results against a
+baseline, see the module docstring.
+"""
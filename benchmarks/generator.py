@@ -0,0 +1,187 @@
+"""
+Deterministic synthetic journals for the benchmarks.
+
+The same configuration and seed always produce the same journal. Account
+names are drawn from a Zipf distribution, so a few accounts are used by most
+postings, as in real journals.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+ACCOUNT_ROOTS = ("Assets", "Liabilities", "Expenses", "Income", "Equity")
+WORDS = (
+    "Bank", "Cash", "Groceries", "Rent", "Salary", "Travel", "Books", "Coffee",
+    "Insurance", "Savings", "Fuel", "Phone", "Gifts", "Health", "Taxes", "Misc",
+)
+INCLUDE_LAYOUTS = ("flat", "chain", "tree")
+
+
+@dataclass
+class GeneratorConfig:
+    entries: int = 1_000
+    postings: int = 3  # Postings per entry, at least 2
+    accounts: int = 200  # Number of distinct account names
+    zipf_s: float = 1.1  # Exponent of the Zipf distribution of accounts
+    comment_density: float = 0.1  # Chance of a comment after an entry line
+    block_comments: float = 0.01  # Chance of a block comment after an entry
+    elided: float = 0.5  # Chance of eliding the amount of the last posting
+    transfers: float = 0.05  # Chance of an entry being half of a transfer pair
+    directives: bool = True  # Add account and commodity directives
+    include_files: int = 0  # Number of files the entries are split into
+    include_layout: str = "flat"  # How the files include each other, see INCLUDE_LAYOUTS
+    seed: int = 0
+
+
+class JournalGenerator:
+    def __init__(self, config: GeneratorConfig):
+        if config.postings < 2:
+            raise ValueError("An entry needs at least 2 postings")
+        if config.include_layout not in INCLUDE_LAYOUTS:
+            raise ValueError(f"Unknown include layout {config.include_layout!r}")
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.account_names = self._account_names()
+        weights = [1 / (rank**config.zipf_s) for rank in range(1, config.accounts + 1)]
+        self.cum_weights = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+
+    def _account_names(self) -> list[str]:
+        names = []
+        for i in range(self.config.accounts):
+            root = ACCOUNT_ROOTS[i % len(ACCOUNT_ROOTS)]
+            first = WORDS[(i // len(ACCOUNT_ROOTS)) % len(WORDS)]
+            names.append(f"{root}:{first}:Account {i}")
+        return names
+
+    def account(self) -> str:
+        return self.rng.choices(self.account_names, cum_weights=self.cum_weights)[0]
+
+    def amount(self, cents: int, currency: str) -> str:
+        value = f"{cents / 100:.2f}"
+        return f"${value}" if currency == "$" else f"{value} NOK"
+
+    def comment(self, indent: str = "    ") -> str:
+        return f"{indent}; note {self.rng.randrange(10_000)}\n"
+
+    def directives(self) -> str:
+        lines = []
+        for name in self.account_names[:20]:
+            lines.append(f"account {name}  ; type:{name.split(':')[0]}\n")
+        lines.append("\ncommodity NOK\n    note Norwegian kroner\n    format 1000.00 NOK\n\n")
+        lines.append("commodity $\n    format $1000.00\n    nomarket\n\n")
+        return "".join(lines)
+
+    def entry(self, day: date, number: int) -> str:
+        c = self.config
+        rng = self.rng
+        status = rng.choice(("* ", "! ", ""))
+        lines = [f"{day.isoformat()} {status}Entry {number}\n"]
+        if rng.random() < c.comment_density:
+            lines.append(self.comment())
+        currency = rng.choice(("NOK", "NOK", "$"))
+        total = 0
+        for _ in range(c.postings - 1):
+            cents = rng.randrange(100, 1_000_000)
+            total += cents
+            line = f"    {self.account()}  {self.amount(cents, currency)}"
+            if rng.random() < c.comment_density:
+                line += f"  ; tag:{rng.randrange(100)}"
+            lines.append(line + "\n")
+        if rng.random() < c.elided:
+            lines.append(f"    {self.account()}\n")
+        else:
+            lines.append(f"    {self.account()}  {self.amount(-total, currency)}\n")
+        return "".join(lines)
+
+    def transfer(self, day: date, number: int) -> tuple[str, str]:
+        """Two entries of the same transfer, as imported from two different accounts"""
+        cents = self.rng.randrange(100, 1_000_000)
+        a, b = self.account(), self.account()
+        first = (
+            f"{day.isoformat()} * Transfer {number}\n"
+            f"    ; FROM_DUMP_ACCOUNT: {a}\n"
+            f"    {a}  {self.amount(-cents, 'NOK')}\n"
+            f"    Assets:Transfers:Out  {self.amount(cents, 'NOK')}\n"
+        )
+        later = day + timedelta(days=self.rng.randrange(3))
+        second = (
+            f"{later.isoformat()} * Transfer {number}\n"
+            f"    ; FROM_DUMP_ACCOUNT: {b}\n"
+            f"    {b}  {self.amount(cents, 'NOK')}\n"
+            f"    Assets:Transfers:In  {self.amount(-cents, 'NOK')}\n"
+        )
+        return first, second
+
+    def blocks(self) -> list[str]:
+        """The entries and comments of the journal, each ending with a blank line"""
+        c = self.config
+        rng = self.rng
+        blocks = []
+        day = date(2020, 1, 1)
+        number = 0
+        while number < c.entries:
+            day += timedelta(days=rng.randrange(2))
+            if rng.random() < c.transfers and number + 1 < c.entries:
+                blocks.extend(e + "\n" for e in self.transfer(day, number))
+                number += 2
+            else:
+                blocks.append(self.entry(day, number) + "\n")
+                number += 1
+            if rng.random() < c.comment_density / 10:
+                blocks.append(self.comment("") + "\n")
+            if rng.random() < c.block_comments:
+                blocks.append("comment\nthis entry was\n\n    moved elsewhere\nend comment\n\n")
+        return blocks
+
+    def journal(self) -> str:
+        """Generate the whole journal as one string"""
+        head = self.directives() if self.config.directives else ""
+        return head + "".join(self.blocks())
+
+    def write(self, directory: Path) -> Path:
+        """
+        Write the journal to directory, split into include_files files laid out
+        as configured, and return the path of the main file.
+        """
+        directory = Path(directory)
+        c = self.config
+        main = directory / "main.journal"
+        head = self.directives() if c.directives else ""
+        blocks = self.blocks()
+        if c.include_files == 0:
+            main.write_text(head + "".join(blocks))
+            return main
+
+        per_file = -(-len(blocks) // c.include_files)
+        files = [directory / f"part{i}.journal" for i in range(c.include_files)]
+        children = {path: [] for path in [main, *files]}
+        for i, path in enumerate(files):
+            if c.include_layout == "flat":
+                parent = main
+            elif c.include_layout == "chain":
+                parent = files[i - 1] if i else main
+            else:
+                parent = files[(i - 1) // 2] if i else main
+            children[parent].append(path)
+
+        for i, path in enumerate(files):
+            body = "".join(blocks[i * per_file : (i + 1) * per_file])
+            # preprocess_includes resolves paths relative to the working directory
+            includes = "".join(f"include {child.resolve()}\n" for child in children[path])
+            path.write_text(body + (includes + "\n" if includes else ""))
+        includes = "".join(f"include {child.resolve()}\n" for child in children[main])
+        main.write_text(head + includes + "\n")
+        return main
+
+
+def generate_journal(config: GeneratorConfig | None = None) -> str:
+    return JournalGenerator(config or GeneratorConfig()).journal()
+
+
+def write_journal(directory: Path, config: GeneratorConfig | None = None) -> Path:
+    return JournalGenerator(config or GeneratorConfig()).write(directory)
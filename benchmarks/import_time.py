@@ -0,0 +1,100 @@
+"""
+Import-time benchmark.
+
+Imports the package in fresh interpreters with `python -X importtime`, and
+checks that every statement below doesn't import its heavy modules, like
+the parser and PLY for the dataclasses alone, or NumPy for parsing, and that
+the cumulative import time of journal_lib stays under a limit.
+"""
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+# Modules which must only be imported when parsing
+PARSER_MODULES = (
+    "journal_lib.utils",
+    "journal_lib.parse.ply.lex",
+    "journal_lib.parse.ply.yacc",
+    "journal_lib.parse.lexers.l_ledger",
+    "journal_lib.parse.parsers.p_ledger",
+)
+
+# Modules which must only be imported for the analytics, see columns.py
+ANALYTICS_MODULES = (
+    "numpy",
+    "journal_lib.columns",
+)
+
+# Statements which must import neither the parser nor the analytics
+STATEMENTS = (
+    "import journal_lib",
+    "from journal_lib import Journal, JournalEntry, DATE_FORMAT",
+    "from journal_lib import EntryFilter",
+)
+
+# Statements which import the parser, but must not import the analytics
+PARSER_STATEMENTS = (
+    "from journal_lib import journal_from_str",
+    "from journal_lib import validate_journal",
+)
+
+RUNS = 5
+
+
+def import_time(statement: str) -> tuple[int, set[str]]:
+    """Return the cumulative import time of journal_lib in microseconds, and the imported modules"""
+    code = (
+        f"{statement}\n"
+        "import sys\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line.split("|")
+        # Modules imported lazily by the statement are listed at the top level too
+        if name.startswith(" journal_lib"):
+            cumulative += int(cumulative_us)
+    return cumulative, set(result.stdout.split())
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=60.0,
+        help="Maximum cumulative import time of journal_lib in milliseconds",
+    )
+    parser.add_argument(
+        "--max-parser-ms",
+        type=float,
+        default=120.0,
+        help="Maximum cumulative import time of journal_lib with the parser in milliseconds",
+    )
+    args = parser.parse_args()
+
+    checks = [(statement, PARSER_MODULES + ANALYTICS_MODULES, args.max_ms) for statement in STATEMENTS]
+    checks += [(statement, ANALYTICS_MODULES, args.max_parser_ms) for statement in PARSER_STATEMENTS]
+    failed = False
+    for statement, heavy_modules, max_ms in checks:
+        runs = [import_time(statement) for _ in range(RUNS)]
+        best = min(cumulative for cumulative, _ in runs)
+        heavy = sorted(set().union(*(modules for _, modules in runs)) & set(heavy_modules))
+        ok = not heavy and best / 1000 <= max_ms
+        failed |= not ok
+        print(f"{'ok' if ok else 'FAIL':4} {best / 1000:7.2f} ms  {statement}")
+        for module in heavy:
+            print(f"     imports {module}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
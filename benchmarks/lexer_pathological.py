@@ -0,0 +1,85 @@
+"""
+Guards against super-linear lexing of long posting lines.
+
+Every input is lexed at several line lengths while the total input size stays
+the same, so a linear lexer spends about the same time on each. The benchmark
+fails if the time grows with the line length.
+"""
+import sys
+import time
+
+from journal_lib.parse import JournalLexer
+
+LINE_LENGTHS = (2_500, 5_000, 10_000)
+TOTAL_SIZE = 2_000_000
+MAX_RATIO = 1.5
+
+
+def long_accounts(length: int) -> str:
+    account = ("Expenses:a b" * (length // 12))[:length].rstrip()
+    return f"2023-01-01 * title\n    {account}  50.00 NOK  ; comment\n    Assets:Cash\n\n"
+
+
+def long_titles(length: int) -> str:
+    title = ("word " * (length // 5)).rstrip()
+    return f"2023-01-01 * {title}\n    Expenses:Food  50.00 NOK\n    Assets:Cash\n\n"
+
+
+def inline_comments(length: int) -> str:
+    lines = "".join(
+        f"    Expenses:Food  {i}.00 NOK  ; comment ; with ; separators {i}\n"
+        for i in range(length // 60)
+    )
+    return f"2023-01-01 * title\n{lines}    Assets:Cash\n\n"
+
+
+def unterminated_postings(length: int) -> str:
+    account = ("Assets:x y" * (length // 10))[:length].rstrip()
+    return f"2023-01-01 * title\n    {account}\nnext\n\n"
+
+
+INPUTS = {
+    "long_accounts": long_accounts,
+    "long_titles": long_titles,
+    "inline_comments": inline_comments,
+    "unterminated_postings": unterminated_postings,
+}
+
+
+def lex(data: str) -> float:
+    lexer = JournalLexer()
+    lexer.input(data)
+    start = time.perf_counter()
+    while lexer.token() is not None:
+        pass
+    return time.perf_counter() - start
+
+
+def run() -> dict:
+    results = {}
+    for name, make in INPUTS.items():
+        timings = {}
+        for length in LINE_LENGTHS:
+            block = make(length)
+            timings[length] = min(
+                lex(block * max(1, TOTAL_SIZE // len(block))) for _ in range(3)
+            )
+        results[name] = {
+            "seconds": timings,
+            "ratio": timings[LINE_LENGTHS[-1]] / timings[LINE_LENGTHS[0]],
+        }
+    return results
+
+
+def main():
+    failed = False
+    for name, result in run().items():
+        ok = result["ratio"] < MAX_RATIO
+        failed |= not ok
+        seconds = " ".join(f"{l}:{s:.3f}s" for l, s in result["seconds"].items())
+        print(f"{'ok' if ok else 'FAIL':4} {name:24} ratio {result['ratio']:.2f}  {seconds}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
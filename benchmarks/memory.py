@@ -0,0 +1,143 @@
+"""
+Memory footprint benchmark.
+
+Parses generated journals of increasing size under tracemalloc, and reports
+the peak and retained memory of journal_from_str, and the bytes per posting.
+The retained objects are broken down by type by walking the parsed journal.
+After parsing, the source string must not be referenced by anything but the
+caller, which is checked with its reference count.
+
+The benchmark fails if the source is retained, if the retained bytes per
+posting grow with the size of the journal, or if they exceed a baseline
+written by an earlier run by more than the tolerance.
+
+    python -m benchmarks.memory --output memory.json
+    python -m benchmarks.memory --baseline memory.json
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from decimal import Decimal
+from pathlib import Path
+
+from journal_lib import (
+    Journal,
+    JournalEntry,
+    JournalEntryTransaction,
+    journal_from_str,
+)
+
+from .generator import GeneratorConfig, generate_journal
+
+SIZES = (1_000, 4_000, 16_000)
+MAX_RATIO = 1.25
+
+# Types reported on their own, everything else is counted as "other"
+CATEGORIES = {
+    JournalEntry: "JournalEntry",
+    JournalEntryTransaction: "JournalEntryTransaction",
+    str: "str",
+    Decimal: "Decimal",
+}
+
+
+def object_sizes(journal: Journal) -> dict[str, int]:
+    """Sum the sizes of the objects reachable from journal, by type"""
+    sizes = {name: 0 for name in [*CATEGORIES.values(), "other"]}
+    seen = set()
+    stack = [journal]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+            stack.extend(obj.__dict__.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        sizes[CATEGORIES.get(type(obj), "other")] += size
+    return sizes
+
+
+def measure(entries: int) -> dict:
+    data = generate_journal(GeneratorConfig(entries=entries))
+    refcount = sys.getrefcount(data)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    journal = journal_from_str(data)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    postings = sum(len(entry.transactions) for entry in journal.entries)
+    retained = current - before
+    return {
+        "entries": len(journal.entries),
+        "postings": postings,
+        "source_bytes": len(data.encode("utf-8")),
+        "peak_bytes": peak - before,
+        "retained_bytes": retained,
+        "bytes_per_posting": retained / postings,
+        "source_retained": sys.getrefcount(data) > refcount,
+        "objects": object_sizes(journal),
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Measure the memory used by parsing")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against the results in this file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.1,
+        help="Fail if the bytes per posting are more than this times the baseline",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for entries in SIZES:
+        result = results[entries] = measure(entries)
+        objects = "  ".join(f"{name} {size / 1e6:.1f}MB" for name, size in result["objects"].items())
+        print(
+            f"{entries:8} entries  peak {result['peak_bytes'] / 1e6:7.1f}MB"
+            f"  retained {result['retained_bytes'] / 1e6:7.1f}MB"
+            f"  {result['bytes_per_posting']:6.0f} bytes/posting"
+            f"  source retained: {result['source_retained']}"
+        )
+        print(f"{'':8}          {objects}")
+        if result["source_retained"]:
+            failed = True
+
+    small, large = results[SIZES[0]], results[SIZES[-1]]
+    ratio = large["bytes_per_posting"] / small["bytes_per_posting"]
+    print(f"{'ok' if ratio < MAX_RATIO else 'FAIL'} bytes per posting ratio {ratio:.2f}")
+    failed |= ratio >= MAX_RATIO
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        for entries, result in results.items():
+            if (base := baseline.get(str(entries))) is None:
+                continue
+            ratio = result["bytes_per_posting"] / base["bytes_per_posting"]
+            status = "FAIL" if ratio > args.tolerance else "ok"
+            print(f"{status:4} {entries:8} entries {ratio:6.2f}x baseline bytes per posting")
+            failed |= ratio > args.tolerance
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
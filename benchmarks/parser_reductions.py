@@ -0,0 +1,78 @@
+"""
+Reduction-heavy parser benchmark.
+
+Parses journals of many entries with many postings and comments, which makes
+the parser reduce several productions per token. The lexer and parser are
+built once, and lexing time is measured separately so the time spent in the
+parse loop and grammar actions can be reported on its own. The benchmark
+fails if the time per posting grows with the size of the journal.
+"""
+import sys
+import time
+
+from journal_lib.parse import JournalLexer, JournalParser
+
+SIZES = (2_000, 8_000)
+POSTINGS = 10
+MAX_RATIO = 1.5
+
+
+def journal(entries: int) -> str:
+    lines = []
+    for i in range(entries):
+        lines.append(f"2023-01-{i % 28 + 1:02d} * Entry {i}\n    ; entry comment\n")
+        for j in range(POSTINGS - 1):
+            lines.append(f"    Expenses:Account {j}  {i}.{j:02d} NOK  ; posting {j}\n")
+        lines.append("    Assets:Checking\n    ; trailing comment\n\n")
+    return "".join(lines)
+
+
+def lex(data: str) -> float:
+    lexer = JournalLexer()
+    lexer.input(data)
+    start = time.perf_counter()
+    while lexer.token() is not None:
+        pass
+    return time.perf_counter() - start
+
+
+def parse(parser: JournalParser, data: str) -> float:
+    lexer = JournalLexer()
+    start = time.perf_counter()
+    parser.parse(data, lexer=lexer)
+    return time.perf_counter() - start
+
+
+def run() -> dict:
+    parser = JournalParser()
+    results = {}
+    for entries in SIZES:
+        data = journal(entries)
+        lexing = min(lex(data) for _ in range(3))
+        parsing = min(parse(parser, data) for _ in range(3))
+        results[entries] = {
+            "lex_seconds": lexing,
+            "parse_seconds": parsing,
+            "parser_seconds": parsing - lexing,
+            "postings_per_second": entries * POSTINGS / parsing,
+        }
+    return results
+
+
+def main():
+    results = run()
+    for entries, result in results.items():
+        print(
+            f"{entries:8} entries  lex {result['lex_seconds']:.3f}s"
+            f"  parse {result['parse_seconds']:.3f}s"
+            f"  parser only {result['parser_seconds']:.3f}s"
+            f"  {result['postings_per_second']:,.0f} postings/s"
+        )
+    small, large = (results[n] for n in SIZES)
+    ratio = small["postings_per_second"] / large["postings_per_second"]
+    print(f"{'ok' if ratio < MAX_RATIO else 'FAIL'} time per posting ratio {ratio:.2f}")
+    sys.exit(0 if ratio < MAX_RATIO else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Throughput benchmark suite.
+
+Runs the benchmarks below on synthetic journals from benchmarks.generator,
+and writes the results as JSON. Given a baseline written by an earlier run,
+the results are compared against it, and the suite fails if any benchmark is
+slower than the baseline by more than the tolerance.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline results.json
+"""
+import json
+import platform
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import datetime
+from pathlib import Path
+
+from journal_lib import (
+    balances_from_str,
+    headers_from_str,
+    journal_from_file,
+    journal_from_str,
+    set_force_nocolor,
+    validate_journal,
+)
+from journal_lib.parse import JournalLexer
+from journal_lib.export import journal_to_ledger
+
+from .generator import GeneratorConfig, JournalGenerator
+
+DATE_SKEW = 3
+
+
+def best_of(repeat: int, func) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_lex(data: str):
+    lexer = JournalLexer()
+    lexer.input(data)
+    while lexer.token() is not None:
+        pass
+
+
+def bench_transfers(entries) -> int:
+    """Match every entry against the later entries within DATE_SKEW days"""
+    days = [datetime.strptime(e.date, "%Y-%m-%d").toordinal() for e in entries]
+    matches = 0
+    for i, entry in enumerate(entries):
+        j = i + 1
+        while j < len(entries) and days[j] - days[i] <= DATE_SKEW:
+            if entry.likely_transfer(entries[j], DATE_SKEW):
+                matches += 1
+            j += 1
+    return matches
+
+
+def run(entries: int, repeat: int) -> dict:
+    set_force_nocolor(True)
+    config = GeneratorConfig(entries=entries)
+    data = JournalGenerator(config).journal()
+    journal = journal_from_str(data)
+    size = len(data.encode("utf-8"))
+    # likely_transfer needs explicit amounts on every posting
+    transfer_entries = sorted(
+        journal_from_str(
+            JournalGenerator(GeneratorConfig(entries=entries, elided=0, transfers=0.2)).journal()
+        ).entries
+    )
+
+    results = {}
+
+    def record(name: str, seconds: float, nbytes: int | None = size):
+        results[name] = {
+            "seconds": seconds,
+            "entries_per_second": entries / seconds,
+            "mb_per_second": None if nbytes is None else nbytes / seconds / 1e6,
+        }
+
+    record("lex", best_of(repeat, lambda: bench_lex(data)))
+    record("journal_from_str", best_of(repeat, lambda: journal_from_str(data)))
+    record("headers_from_str", best_of(repeat, lambda: headers_from_str(data)))
+    record("balances_from_str", best_of(repeat, lambda: balances_from_str(data)))
+    record("journal_str", best_of(repeat, lambda: str(journal)))
+    record("journal_to_ledger", best_of(repeat, lambda: journal_to_ledger(journal, sort=True)))
+    record("to_columns", best_of(repeat, journal.to_columns), None)
+    columns = journal.to_columns()
+    record("monthly_balances", best_of(repeat, columns.monthly_balances), None)
+    record("validate_journal", best_of(repeat, lambda: validate_journal(journal, strict=True)), None)
+    for layout in ("flat", "chain", "tree"):
+        with tempfile.TemporaryDirectory() as directory:
+            include_config = GeneratorConfig(
+                entries=entries, include_files=16, include_layout=layout
+            )
+            main = JournalGenerator(include_config).write(Path(directory))
+            nbytes = sum(p.stat().st_size for p in Path(directory).iterdir())
+            record(
+                f"journal_from_file_{layout}",
+                best_of(repeat, lambda: journal_from_file(main)),
+                nbytes,
+            )
+    record(
+        "transfer_matching",
+        best_of(repeat, lambda: bench_transfers(transfer_entries)),
+        None,
+    )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the names of the benchmarks slower than baseline by more than tolerance"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["seconds"] / baseline[name]["seconds"]
+        status = "FAIL" if ratio > tolerance else "ok"
+        print(f"{status:4} {name:28} {ratio:6.2f}x baseline")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description="Run the throughput benchmarks")
+    parser.add_argument("--entries", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against the results in this file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="Fail if a benchmark takes more than this times the baseline",
+    )
+    args = parser.parse_args()
+
+    results = run(args.entries, args.repeat)
+    for name, result in results.items():
+        line = f"{name:28} {result['seconds']:8.3f}s  {result['entries_per_second']:12,.0f} entries/s"
+        if result["mb_per_second"] is not None:
+            line += f"  {result['mb_per_second']:8.2f} MB/s"
+        print(line)
+
+    if args.output is not None:
+        document = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "entries": args.entries,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["entries"] != args.entries:
+            print(f"The baseline was run with {baseline['entries']} entries")
+            sys.exit(2)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,54 @@
 __version__ = "1.0.0"
 
-from .utils import journal_from_str, journal_from_file
-from .dataclasses import JournalEntryTransaction, JournalEntry, JournalAccountDef, JournalCommodityDef, Journal, set_force_nocolor, DATE_FORMAT
+import importlib
+
+from .dataclasses import JournalEntryTransaction, JournalEntry, JournalEntryHeader, JournalAccountDef, JournalCommodityDef, Journal, set_force_nocolor, DATE_FORMAT
+
+# The parser, and PLY with it, is only imported when one of these is first used,
+# so importing the package for the dataclasses alone stays cheap.
+_lazy_attributes = {
+    "journal_from_str": ".utils",
+    "journal_from_file": ".utils",
+    "headers_from_str": ".utils",
+    "headers_from_file": ".utils",
+    "iter_journals_from_str": ".utils",
+    "iter_entries_from_str": ".utils",
+    "iter_entries_from_file": ".utils",
+    "iter_journals_from_file": ".utils",
+    "balances_from_str": ".utils",
+    "balances_from_file": ".utils",
+    "EntryFilter": ".parse.filters",
+    "Diagnostics": ".parse.diagnostics",
+    "JournalSyntaxError": ".parse.diagnostics",
+    "JournalSyntaxWarning": ".parse.diagnostics",
+    "ParseStats": ".parse.stats",
+    "PostingColumns": ".columns",
+    "Violation": ".validate",
+    "validate_journal": ".validate",
+    "validate_str": ".validate",
+    "validate_file": ".validate",
+}
+
+__all__ = [
+    "JournalEntryTransaction",
+    "JournalEntry",
+    "JournalEntryHeader",
+    "JournalAccountDef",
+    "JournalCommodityDef",
+    "Journal",
+    "set_force_nocolor",
+    "DATE_FORMAT",
+    *_lazy_attributes,
+]
+
+
+def __getattr__(name: str):
+    if (module := _lazy_attributes.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
@@ -0,0 +1,253 @@
+"""
+The postings of a journal as columns of arrays, for analytics.
+
+Every posting is one row, stored across the arrays
+
+    date       array("i")  proleptic Gregorian ordinal of the entry date
+    entry      array("i")  index of the entry
+    account    array("i")  index into accounts
+    commodity  array("i")  index into commodities, which may contain None
+    amount     array("q")  amount in hundredths
+    status     array("B")  bitfield of CLEARED, PENDING and INFERRED
+
+An elided amount is inferred from the other postings of the entry, with one
+row for every commodity it balances, like in export.postings.
+
+When NumPy is installed, the group sums are computed with NumPy on views of
+the arrays, otherwise they are computed in Python.
+"""
+from array import array
+from dataclasses import dataclass, field
+import datetime
+from decimal import Decimal
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from journal_lib.dataclasses import JournalEntry, _to_minor
+
+CLEARED = 1
+PENDING = 2
+INFERRED = 4  # The amount was elided and inferred from the other postings
+
+# Columns which can be grouped by, "month" is computed from date
+KEYS = ("date", "month", "entry", "account", "commodity", "status")
+
+# Float sums of integers are exact below this
+_EXACT_FLOAT = 1 << 53
+
+
+def _ordinal(value: str | datetime.date) -> int:
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value.replace("/", "-"))
+    return value.toordinal()
+
+
+def _month(ordinal: int) -> int:
+    """Months since 0001-01 of a date ordinal"""
+    d = datetime.date.fromordinal(ordinal)
+    return d.year * 12 + d.month - 13
+
+
+def month_name(month: int) -> str:
+    """Format a month from the month column as YYYY-MM"""
+    return f"{month // 12 + 1:04}-{month % 12 + 1:02}"
+
+
+def _np_sums(index, amounts, size: int):
+    """Exact sums of the amounts by index, as an int64 array of length size"""
+    if len(amounts) == 0:
+        return np.zeros(size, dtype=np.int64)
+    if max(int(amounts.max()), -int(amounts.min())) * len(amounts) < _EXACT_FLOAT:
+        return np.bincount(index, weights=amounts, minlength=size).astype(np.int64)
+    sums = np.zeros(size, dtype=np.int64)
+    np.add.at(sums, index, amounts)
+    return sums
+
+
+def _from_minor(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+@dataclass(eq=False)
+class PostingColumns:
+    date: array = field(default_factory=lambda: array("i"))
+    entry: array = field(default_factory=lambda: array("i"))
+    account: array = field(default_factory=lambda: array("i"))
+    commodity: array = field(default_factory=lambda: array("i"))
+    amount: array = field(default_factory=lambda: array("q"))
+    status: array = field(default_factory=lambda: array("B"))
+    accounts: list[str] = field(default_factory=list)
+    commodities: list[str | None] = field(default_factory=list)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[JournalEntry]) -> "PostingColumns":
+        columns = cls()
+        account_ids = {}
+        commodity_ids = {}
+        ordinals = {}
+        rows = []
+        for index, entry in enumerate(entries):
+            if (ordinal := ordinals.get(entry.date)) is None:
+                ordinal = ordinals[entry.date] = _ordinal(entry.date)
+            flags = CLEARED if entry.cleared else PENDING if entry.pending else 0
+            balance = None
+            for t in entry.transactions:
+                if (account := account_ids.get(t.account)) is None:
+                    account = account_ids[t.account] = len(account_ids)
+                if t.amount is not None:
+                    if (commodity := commodity_ids.get(t.currency)) is None:
+                        commodity = commodity_ids[t.currency] = len(commodity_ids)
+                    rows.append((ordinal, index, account, commodity, _to_minor(t.amount), flags))
+                    continue
+                if balance is None:
+                    balance = {}
+                    for other in entry.transactions:
+                        if other.amount is not None:
+                            balance[other.currency] = balance.get(other.currency, 0) - _to_minor(other.amount)
+                    if not balance:
+                        balance[None] = 0
+                for currency, amount in balance.items():
+                    if (commodity := commodity_ids.get(currency)) is None:
+                        commodity = commodity_ids[currency] = len(commodity_ids)
+                    rows.append((ordinal, index, account, commodity, amount, flags | INFERRED))
+            if len(rows) >= 4096:
+                columns._extend(rows)
+                rows = []
+        columns._extend(rows)
+        columns.accounts = list(account_ids)
+        columns.commodities = list(commodity_ids)
+        return columns
+
+    def _extend(self, rows: list[tuple]):
+        if not rows:
+            return
+        dates, entries, accounts, commodities, amounts, status = zip(*rows)
+        self.date.extend(dates)
+        self.entry.extend(entries)
+        self.account.extend(accounts)
+        self.commodity.extend(commodities)
+        self.amount.extend(amounts)
+        self.status.extend(status)
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def numpy(self, name: str):
+        """A NumPy view of a column, or of the month column computed from date"""
+        if np is None:
+            raise ImportError("NumPy is required for PostingColumns.numpy")
+        if name == "month":
+            dates = np.frombuffer(self.date, dtype=np.int32)
+            if len(dates) == 0:
+                return np.zeros(0, dtype=np.int64)
+            # Look the months up in a table of the dates spanned, much smaller than the column
+            low = int(dates.min())
+            days = np.arange(low, int(dates.max()) + 1) - datetime.date(1970, 1, 1).toordinal()
+            months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + 1969 * 12
+            return months[dates - low]
+        return np.frombuffer(getattr(self, name), dtype=getattr(self, name).typecode)
+
+    def column(self, name: str):
+        """A column by name, as a NumPy array if NumPy is installed, else as a list or array"""
+        if np is not None:
+            return self.numpy(name)
+        if name == "month":
+            months = {}
+            return [months[d] if d in months else months.setdefault(d, _month(d)) for d in self.date]
+        return getattr(self, name)
+
+    def date_mask(self, start: str | datetime.date | None = None, end: str | datetime.date | None = None):
+        """A mask of the rows dated from start up to, but not including, end"""
+        low = _ordinal(start) if start is not None else None
+        high = _ordinal(end) if end is not None else None
+        if np is not None:
+            dates = self.numpy("date")
+            mask = np.ones(len(dates), dtype=bool)
+            if low is not None:
+                mask &= dates >= low
+            if high is not None:
+                mask &= dates < high
+            return mask
+        return [(low is None or d >= low) and (high is None or d < high) for d in self.date]
+
+    def sum_by(self, *keys: str, mask=None) -> dict[tuple[int, ...], int]:
+        """
+        Sum the amounts in hundredths grouped by the columns keys, see KEYS.
+        Only the rows set in mask, from date_mask or a NumPy boolean array, are summed.
+        """
+        for key in keys:
+            if key not in KEYS:
+                raise ValueError(f"Can't group by {key!r}")
+        if np is not None:
+            return self._np_sum_by(keys, mask)
+        columns = [self.column(key) for key in keys]
+        sums = {}
+        rows = zip(self.amount, *columns)
+        if mask is not None:
+            rows = (row for row, selected in zip(rows, mask) if selected)
+        for amount, *group in rows:
+            group = tuple(group)
+            sums[group] = sums.get(group, 0) + amount
+        return sums
+
+    def _np_sum_by(self, keys: tuple[str, ...], mask) -> dict[tuple[int, ...], int]:
+        amounts = self.numpy("amount")
+        columns = [self.numpy(key) for key in keys]
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            amounts = amounts[mask]
+            columns = [c[mask] for c in columns]
+        if len(amounts) == 0:
+            return {}
+
+        # Combine the keys into one index, compacted if it gets much larger than the data
+        lows = [int(c.min()) for c in columns]
+        dims = [int(c.max()) - low + 1 for c, low in zip(columns, lows)]
+        index = np.zeros(len(amounts), dtype=np.intp)
+        for c, low, dim in zip(columns, lows, dims):
+            index *= dim
+            index += c
+            index -= low
+        size = int(np.prod(dims))
+        groups = None
+        if size > max(4 * len(amounts), 1 << 16):
+            groups, index = np.unique(index, return_inverse=True)
+            size = len(groups)
+
+        counts = np.bincount(index, minlength=size)
+        sums = _np_sums(index, amounts, size)
+
+        present = np.flatnonzero(counts)
+        flat = present if groups is None else groups[present]
+        parts = np.unravel_index(flat, dims) if columns else []
+        keys = zip(*[(part + low).tolist() for part, low in zip(parts, lows)]) if columns else [()]
+        return dict(zip(keys, sums[present].tolist()))
+
+    def account_totals(self, mask=None) -> dict[tuple[str, str | None], Decimal]:
+        """The total amount of every account, by commodity"""
+        return {
+            (self.accounts[account], self.commodities[commodity]): _from_minor(value)
+            for (account, commodity), value in self.sum_by("account", "commodity", mask=mask).items()
+        }
+
+    def monthly_balances(self, mask=None, cumulative: bool = True) -> dict[tuple[str, str, str | None], Decimal]:
+        """
+        The balance of every account by commodity at the end of every month it has postings in,
+        keyed by (YYYY-MM, account, commodity). Without cumulative, the change in the month.
+        """
+        sums = sorted(self.sum_by("account", "commodity", "month", mask=mask).items())
+        balances = {}
+        running = {}
+        names = {}
+        for (account, commodity, month), value in sums:
+            if cumulative:
+                value = running[account, commodity] = running.get((account, commodity), 0) + value
+            if (name := names.get(month)) is None:
+                name = names[month] = month_name(month)
+            key = (name, self.accounts[account], self.commodities[commodity])
+            balances[key] = _from_minor(value)
+        return balances
@@ -1,3 +1,4 @@
+import io
 import sys
 from copy import deepcopy
 from dataclasses import dataclass, field
@@ -17,6 +18,20 @@ def anesc(code: str):
     return "" if FORCE_NOCOLOR or not sys.stdout.isatty() else f"\u001b[{code}"
 
 
+# The ANSI color codes used when printing the dataclasses
+ESCAPE_CODES = ("0m", "31m", "32m", "33m", "34m", "36m", "38m")
+
+
+def escapes(color: bool | None = None) -> dict[str, str]:
+    """
+    Map every code in ESCAPE_CODES to its escape sequence, or to empty strings without color.
+    By default, color is used if stdout is a terminal and set_force_nocolor isn't set.
+    """
+    if color is None:
+        color = not FORCE_NOCOLOR and sys.stdout.isatty()
+    return {code: f"\u001b[{code}" if color else "" for code in ESCAPE_CODES}
+
+
 def format_amount(amount: str, currency: str | None = None) -> str:
     if currency is None:
         return amount
@@ -27,6 +42,17 @@ def format_amount(amount: str, currency: str | None = None) -> str:
     return f"{amount} {currency}"
 
 
+def _to_minor(amount: str) -> int:
+    """Convert an amount to hundredths, raises ValueError if it has more than two decimals"""
+    whole, _, cents = amount.partition(".")
+    if len(cents) > 2:
+        value = Decimal(amount).scaleb(2)
+        if value != value.to_integral_value():
+            raise ValueError(f"Amount {amount} has more than two decimals")
+        return int(value)
+    return int(whole + cents.ljust(2, "0"))
+
+
 @dataclass
 class JournalEntryTransaction:
     account: str
@@ -34,7 +60,7 @@ class JournalEntryTransaction:
     amount: str | None
     comment: str | None
     sign: int = field(init=False)
-    amount_value: int = field(init=False)
+    amount_value: Decimal | None = field(init=False)
 
     def __post_init__(self):
         if self.amount is not None:
@@ -46,6 +72,7 @@ class JournalEntryTransaction:
             self.amount_value = Decimal(self.amount.lstrip("-+"))
         else:
             self.sign = 1
+            self.amount_value = None
 
     def key(self):
         return (self.account, abs(Decimal(self.amount)), self.currency)
@@ -56,38 +83,50 @@ class JournalEntry:
     date: str
     cleared: bool
     pending: bool
-    title: str
+    title: str | None
     effective_date: str | None
     transactions: list[JournalEntryTransaction]
     comments: list[str]
+    # Position of the entry date in the source, when parsed
+    lineno: int | None = field(default=None, compare=False, repr=False)
+    column: int | None = field(default=None, compare=False, repr=False)
 
     def __str__(self):
-        s = f"{anesc('34m')}{self.date}{anesc('0m')}"
+        return self._render(escapes())
+
+    def _render(self, esc: dict[str, str]) -> str:
+        reset = esc["0m"]
+        parts = [f"{esc['34m']}{self.date}{reset}"]
         if self.effective_date is not None:
-            s += f"={anesc('36m')}{self.effective_date}{anesc('0m')}"
+            parts.append(f"={esc['36m']}{self.effective_date}{reset}")
         if self.cleared:
-            s += f" {anesc('31m')}*{anesc('0m')}"
+            parts.append(f" {esc['31m']}*{reset}")
         if self.pending:
-            s += f" {anesc('31m')}!{anesc('0m')}"
-        s += f"  {anesc('36m')}{self.title}{anesc('0m')}\n"
+            parts.append(f" {esc['31m']}!{reset}")
+        if self.title is not None:
+            parts.append(f"  {esc['36m']}{self.title}{reset}")
+        parts.append("\n")
 
-        max_account_len = max(len(x.account) for x in self.transactions)
+        max_account_len = max((len(x.account) for x in self.transactions), default=0)
         for transaction in self.transactions:
-            t = f"  {anesc('33m')}{transaction.account:{max_account_len}}{anesc('0m')}"
+            parts.append(f"  {esc['33m']}{transaction.account:{max_account_len}}{reset}")
             if transaction.amount is not None:
                 amount_code = "32m"
                 if transaction.amount[0] == "-":
                     amount_code = "31m"
                 else:
-                    t += " "
-                t += f"  {anesc(amount_code)}{format_amount(transaction.amount, transaction.currency)}{anesc('0m')}"
+                    parts.append(" ")
+                parts.append(
+                    f"  {esc[amount_code]}{format_amount(transaction.amount, transaction.currency)}{reset}"
+                )
             if transaction.comment is not None:
-                t += f"  {anesc('38m')}{transaction.comment}{anesc('0m')}"
-            s += t + f"{anesc('0m')}\n"
+                parts.append(f"  {esc['38m']}{transaction.comment}{reset}")
+            parts.append(f"{reset}\n")
 
         for comment in self.comments:
-            s += f"  ; {anesc('38m')}{comment}{anesc('0m')}\n"
-        return s + "\n"
+            parts.append(f"  ; {esc['38m']}{comment}{reset}\n")
+        parts.append("\n")
+        return "".join(parts)
 
     def __lt__(self, other):
         return self.date < other.date
@@ -147,15 +186,48 @@ class JournalEntry:
         return True
 
 
+@dataclass
+class JournalEntryHeader:
+    """The header of an entry, as returned when parsing without entry bodies"""
+
+    date: str
+    cleared: bool
+    pending: bool
+    title: str | None
+    effective_date: str | None
+
+    def __str__(self):
+        return self._render(escapes())
+
+    def _render(self, esc: dict[str, str]) -> str:
+        reset = esc["0m"]
+        s = f"{esc['34m']}{self.date}{reset}"
+        if self.effective_date is not None:
+            s += f"={esc['36m']}{self.effective_date}{reset}"
+        if self.cleared:
+            s += f" {esc['31m']}*{reset}"
+        if self.pending:
+            s += f" {esc['31m']}!{reset}"
+        if self.title is not None:
+            s += f"  {esc['36m']}{self.title}{reset}"
+        return s + "\n"
+
+    def __lt__(self, other):
+        return self.date < other.date
+
+
 @dataclass
 class JournalAccountDef:
     account: str
     comment: str | None
 
     def __str__(self):
-        s = f"{anesc('38m')}account {anesc('33m')}{self.account}{anesc('0m')}"
+        return self._render(escapes())
+
+    def _render(self, esc: dict[str, str]) -> str:
+        s = f"{esc['38m']}account {esc['33m']}{self.account}{esc['0m']}"
         if self.comment is not None:
-            s += f" {anesc('38m')}{self.comment}{anesc('0m')}"
+            s += f" {esc['38m']}{self.comment}{esc['0m']}"
         return s + "\n"
 
 
@@ -168,15 +240,18 @@ class JournalCommodityDef:
     default: bool = False
 
     def __str__(self):
-        s = f"{anesc('38m')}commodity {anesc('33m')}{self.commodity}{anesc('0m')}\n"
+        return self._render(escapes())
+
+    def _render(self, esc: dict[str, str]) -> str:
+        s = f"{esc['38m']}commodity {esc['33m']}{self.commodity}{esc['0m']}\n"
         for attr in ["format", "note", "nomarket", "default"]:
-            if hasattr(self, attr) and getattr(self, attr) is not None:
-                if isinstance(getattr(self, attr), bool) and not getattr(self, attr):
-                    continue
-                s += f"    {anesc('38m')}{attr}{anesc('0m')}"
-                if isinstance(getattr(self, attr), str):
-                    s += f" {anesc('36m')}{getattr(self, attr)}{anesc('0m')}"
-                s += "\n"
+            value = getattr(self, attr)
+            if value is None or value is False:
+                continue
+            s += f"    {esc['38m']}{attr}{esc['0m']}"
+            if isinstance(value, str):
+                s += f" {esc['36m']}{value}{esc['0m']}"
+            s += "\n"
         return s
 
 
@@ -187,20 +262,27 @@ class Journal:
     commodities: list[JournalCommodityDef]
 
     def __str__(self):
-        s = ""
-
-        for account in self.accounts:
-            s += f"{account}"
-        s += "\n"
-
-        for commodity in self.commodities:
-            s += f"{commodity}"
-        s += "\n"
-
-        for entry in self.entries:
-            s += f"{entry}"
-
-        return s
+        buffer = io.StringIO()
+        self.write_to(buffer)
+        return buffer.getvalue()
+
+    def write_to(self, fp, color: bool | None = None, chunk_size: int = 256):
+        """
+        Write the journal to the text file fp, chunk_size entries at a time.
+        color is decided once, by default if stdout is a terminal, see escapes.
+        """
+        esc = escapes(color)
+        fp.write("".join(account._render(esc) for account in self.accounts) + "\n")
+        fp.write("".join(commodity._render(esc) for commodity in self.commodities) + "\n")
+        entries = self.entries
+        for i in range(0, len(entries), chunk_size):
+            fp.write("".join(entry._render(esc) for entry in entries[i : i + chunk_size]))
+
+    def to_columns(self) -> "PostingColumns":
+        """The postings of the journal as columns of arrays, see journal_lib.columns"""
+        from .columns import PostingColumns
+
+        return PostingColumns.from_entries(self.entries)
 
     @staticmethod
     def from_elements(elements: list[str | JournalEntry]):
@@ -0,0 +1,16 @@
+from .ledger import (
+    write_ledger,
+    write_ledger_file,
+    journal_to_ledger,
+    entry_to_ledger,
+    account_to_ledger,
+    commodity_to_ledger,
+)
+from .postings import (
+    POSTING_FIELDS,
+    iter_postings,
+    parse_tags,
+    write_postings_csv,
+    write_postings_jsonl,
+)
+from .sqlite import journal_to_sqlite, entry_fingerprints
@@ -0,0 +1,122 @@
+"""
+Canonical ledger format writer.
+
+Every journal is written the same way, regardless of how it was formatted
+when it was read: account directives, then commodity directives, then the
+entries, with dates written with dashes, entry comments before the postings,
+postings indented by four spaces and amounts aligned to the right in every
+entry. The output parses back to an equal journal.
+"""
+from pathlib import Path
+
+from journal_lib.dataclasses import (
+    Journal,
+    JournalEntry,
+    JournalAccountDef,
+    JournalCommodityDef,
+    format_amount,
+)
+
+INDENT = "    "
+# Entries joined into one string before it is written
+CHUNK_SIZE = 1024
+BUFFER_SIZE = 1 << 20
+
+
+def _date(date: str) -> str:
+    return date.replace("/", "-") if "/" in date else date
+
+
+def account_to_ledger(account: JournalAccountDef) -> str:
+    if account.comment is None:
+        return f"account {account.account}\n"
+    # Comments are read with the whitespace after the ';'
+    separator = ";" if account.comment[:1].isspace() else "; "
+    return f"account {account.account}  {separator}{account.comment}\n"
+
+
+def commodity_to_ledger(commodity: JournalCommodityDef) -> str:
+    lines = [f"commodity {commodity.commodity}\n"]
+    if commodity.note is not None:
+        lines.append(f"{INDENT}note {commodity.note}\n")
+    if commodity.format is not None:
+        lines.append(f"{INDENT}format {commodity.format}\n")
+    if commodity.nomarket:
+        lines.append(f"{INDENT}nomarket\n")
+    if commodity.default:
+        lines.append(f"{INDENT}default\n")
+    return "".join(lines)
+
+
+def entry_to_ledger(entry: JournalEntry) -> str:
+    header = _date(entry.date)
+    if entry.effective_date is not None:
+        header += "=" + _date(entry.effective_date)
+    if entry.cleared:
+        header += " *"
+    elif entry.pending:
+        header += " !"
+    if entry.title is not None:
+        header += " " + entry.title
+    lines = [header + "\n"]
+    for comment in entry.comments:
+        lines.append(f"{INDENT}; {comment}\n")
+
+    # Collect the postings and the column widths in one pass
+    postings = []
+    account_width = amount_width = 0
+    for transaction in entry.transactions:
+        account = transaction.account
+        if len(account) > account_width:
+            account_width = len(account)
+        amount = transaction.amount
+        if amount is not None:
+            amount = format_amount(amount, transaction.currency)
+            if len(amount) > amount_width:
+                amount_width = len(amount)
+        postings.append((account, amount, transaction.comment))
+
+    for account, amount, comment in postings:
+        if amount is None:
+            line = INDENT + account
+        else:
+            line = f"{INDENT}{account.ljust(account_width)}  {amount.rjust(amount_width)}"
+        if comment is not None:
+            line += "  ; " + comment
+        lines.append(line + "\n")
+    return "".join(lines)
+
+
+def write_ledger(journal: Journal, fp, sort: bool = False):
+    """
+    Write journal to the text file fp in the canonical ledger format.
+    With sort, entries are written ordered by date, keeping the order of entries on the same date.
+    """
+    write = fp.write
+    if journal.accounts:
+        write("".join(map(account_to_ledger, journal.accounts)) + "\n")
+    if journal.commodities:
+        write("\n".join(map(commodity_to_ledger, journal.commodities)) + "\n")
+    entries = journal.entries
+    if sort:
+        entries = sorted(entries, key=lambda e: _date(e.date))
+    for i in range(0, len(entries), CHUNK_SIZE):
+        write("\n".join(map(entry_to_ledger, entries[i : i + CHUNK_SIZE])) + "\n")
+
+
+def write_ledger_file(journal: Journal, filename: Path, sort: bool = False):
+    """Write journal to the file filename in the canonical ledger format, see write_ledger"""
+    with open(filename, "w", buffering=BUFFER_SIZE) as fp:
+        write_ledger(journal, fp, sort=sort)
+
+
+def journal_to_ledger(journal: Journal, sort: bool = False) -> str:
+    """Return journal in the canonical ledger format, see write_ledger"""
+    chunks = []
+    write_ledger(journal, _ListWriter(chunks), sort=sort)
+    return "".join(chunks)
+
+
+class _ListWriter:
+    def __init__(self, chunks: list[str]):
+        self.write = chunks.append
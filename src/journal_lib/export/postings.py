@@ -0,0 +1,141 @@
+"""
+Flat tables of postings, written as CSV or JSON Lines.
+
+Every posting becomes one row of POSTING_FIELDS. The entries can be a list,
+like Journal.entries, or an iterator from a streaming parse, like
+iter_entries_from_file, and rows are written in batches without building
+the whole table.
+
+An elided amount is inferred from the other postings of the entry, with
+one row for every commodity it balances. Tags are read from the entry
+comments and the posting comment, as ledger ':tag1:tag2:' tags and
+'key: value' metadata.
+"""
+import csv
+import json
+import re
+from decimal import Decimal
+from itertools import islice
+from json.encoder import encode_basestring
+from typing import Iterable, Iterator
+
+from journal_lib.dataclasses import JournalEntry
+
+POSTING_FIELDS = (
+    "date",
+    "effective_date",
+    "status",
+    "title",
+    "account",
+    "commodity",
+    "amount",
+    "comment",
+    "tags",
+)
+
+BATCH_SIZE = 1024
+
+TAGS_RE = re.compile(r"(?:^|\s):((?:[^\s:]+:)+)(?=\s|$)")
+METADATA_RE = re.compile(r"(?:^|\s)([^\s:]+):[ \t]+(\S.*?)\s*$")
+
+
+def parse_tags(comment: str) -> dict[str, str | None]:
+    """Read the ':tag1:tag2:' tags and 'key: value' metadata of a comment"""
+    tags = {}
+    for m in TAGS_RE.finditer(comment):
+        for name in m.group(1)[:-1].split(":"):
+            tags[name] = None
+    if (m := METADATA_RE.search(comment)) is not None:
+        tags[m.group(1)] = m.group(2)
+    return tags
+
+
+def _status(entry: JournalEntry) -> str:
+    if entry.cleared:
+        return "cleared"
+    if entry.pending:
+        return "pending"
+    return "unmarked"
+
+
+def _balance(entry: JournalEntry) -> dict[str | None, Decimal]:
+    """The negated sum of the amounts of the entry, by commodity"""
+    totals = {}
+    for t in entry.transactions:
+        if t.amount is not None:
+            totals[t.currency] = totals.get(t.currency, 0) - Decimal(t.amount)
+    return totals
+
+
+def iter_postings(entries: Iterable[JournalEntry], infer_amounts: bool = True) -> Iterator[tuple]:
+    """Yield a tuple of POSTING_FIELDS for every posting of entries"""
+    for entry in entries:
+        status = _status(entry)
+        entry_tags = {}
+        for comment in entry.comments:
+            entry_tags.update(parse_tags(comment))
+        head = (entry.date, entry.effective_date, status, entry.title)
+        for t in entry.transactions:
+            tags = entry_tags
+            if t.comment is not None and (posting_tags := parse_tags(t.comment)):
+                tags = entry_tags | posting_tags
+            if t.amount is not None or not infer_amounts:
+                yield (*head, t.account, t.currency, t.amount, t.comment, tags)
+                continue
+            balance = _balance(entry)
+            if not balance:
+                yield (*head, t.account, None, None, t.comment, tags)
+            for currency, amount in balance.items():
+                yield (*head, t.account, currency, str(amount), t.comment, tags)
+
+
+def _batches(rows: Iterator[tuple], size: int) -> Iterator[list[tuple]]:
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _tags_to_csv(tags: dict[str, str | None]) -> str:
+    return ";".join(name if value is None else f"{name}={value}" for name, value in tags.items())
+
+
+def write_postings_csv(
+    entries: Iterable[JournalEntry],
+    fp,
+    header: bool = True,
+    infer_amounts: bool = True,
+    batch_size: int = BATCH_SIZE,
+):
+    """
+    Write the postings of entries to the text file fp as CSV, see iter_postings.
+    Tags are written as 'tag;key=value'. fp should be opened with newline="".
+    """
+    writer = csv.writer(fp)
+    if header:
+        writer.writerow(POSTING_FIELDS)
+    for batch in _batches(iter_postings(entries, infer_amounts), batch_size):
+        writer.writerows([(*row[:-1], _tags_to_csv(row[-1])) for row in batch])
+
+
+def _json_str(value: str | None) -> str:
+    return "null" if value is None else encode_basestring(value)
+
+
+def write_postings_jsonl(
+    entries: Iterable[JournalEntry],
+    fp,
+    infer_amounts: bool = True,
+    batch_size: int = BATCH_SIZE,
+):
+    """
+    Write the postings of entries to the text file fp as JSON Lines, see iter_postings.
+    Amounts are written as strings to keep them exact, and tags as an object.
+    """
+    keys = [encode_basestring(name) + ":" for name in POSTING_FIELDS[:-1]]
+    tags_key = encode_basestring("tags") + ":"
+    for batch in _batches(iter_postings(entries, infer_amounts), batch_size):
+        lines = []
+        for row in batch:
+            fields = ",".join(key + _json_str(value) for key, value in zip(keys, row))
+            tags = json.dumps(row[-1], ensure_ascii=False) if row[-1] else "{}"
+            lines.append(f"{{{fields},{tags_key}{tags}}}\n")
+        fp.write("".join(lines))
@@ -0,0 +1,240 @@
+"""
+Loading journals into a SQLite database.
+
+The tables are
+
+    accounts(id, name, comment)
+    commodities(name, format, note, nomarket, is_default)
+    entries(id, fingerprint, date, effective_date, status, title)
+    postings(id, entry_id, position, account_id, commodity, amount, amount_minor, inferred, comment)
+    tags(entry_id, posting_id, name, value)
+
+Amounts are stored as exact text, and as integers of hundredths in
+amount_minor for summing. Elided amounts are inferred like in postings.py,
+with inferred set. Tags with a null posting_id are tags of the entry.
+
+The fingerprint of an entry is a hash of its canonical ledger form, so in
+incremental mode only entries which were added, changed or removed since the
+last load are written.
+"""
+import hashlib
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from journal_lib.dataclasses import Journal, JournalEntry, _to_minor
+from .ledger import entry_to_ledger
+from .postings import parse_tags, _balance, _status
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    comment TEXT
+);
+CREATE TABLE IF NOT EXISTS commodities (
+    name TEXT PRIMARY KEY,
+    format TEXT,
+    note TEXT,
+    nomarket INTEGER NOT NULL,
+    is_default INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    date TEXT NOT NULL,
+    effective_date TEXT,
+    status TEXT NOT NULL,
+    title TEXT
+);
+CREATE TABLE IF NOT EXISTS postings (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    commodity TEXT,
+    amount TEXT,
+    amount_minor INTEGER,
+    inferred INTEGER NOT NULL,
+    comment TEXT
+);
+CREATE TABLE IF NOT EXISTS tags (
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    posting_id INTEGER REFERENCES postings(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT
+);
+"""
+
+# Created after loading, so they are built once instead of updated on every insert
+INDEXES = """
+CREATE INDEX IF NOT EXISTS entries_date ON entries(date);
+CREATE INDEX IF NOT EXISTS postings_entry ON postings(entry_id);
+CREATE INDEX IF NOT EXISTS postings_account ON postings(account_id);
+CREATE INDEX IF NOT EXISTS tags_entry ON tags(entry_id);
+CREATE INDEX IF NOT EXISTS tags_name ON tags(name, value);
+"""
+
+TABLES = ("tags", "postings", "entries", "commodities", "accounts")
+
+BATCH_SIZE = 10_000
+
+
+def entry_fingerprints(
+    entries: Iterable[JournalEntry], counts: dict[str, int] | None = None
+) -> Iterator[tuple[str, JournalEntry]]:
+    """
+    Yield the fingerprint of every entry with the entry.
+    Equal entries get different fingerprints by the order they appear in,
+    counted in counts, which can be passed on to continue with more entries.
+    """
+    if counts is None:
+        counts = {}
+    for entry in entries:
+        digest = hashlib.sha1(entry_to_ledger(entry).encode("utf-8")).hexdigest()
+        n = counts[digest] = counts.get(digest, -1) + 1
+        yield f"{digest}:{n}", entry
+
+
+def _journals(journal_or_path: Journal | Path | str) -> Iterator[Journal]:
+    if isinstance(journal_or_path, Journal):
+        yield journal_or_path
+        return
+    from journal_lib.utils import iter_journals_from_file
+
+    yield from iter_journals_from_file(Path(journal_or_path))
+
+
+class _Loader:
+    def __init__(self, conn: sqlite3.Connection, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.account_ids = {name: id for id, name in conn.execute("SELECT id, name FROM accounts")}
+        self.next_account_id = self._next_id("accounts")
+        self.next_entry_id = self._next_id("entries")
+        self.next_posting_id = self._next_id("postings")
+        self.new_accounts = []
+
+    def _next_id(self, table: str) -> int:
+        return self.conn.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    def account_id(self, name: str) -> int:
+        if (id := self.account_ids.get(name)) is None:
+            id = self.account_ids[name] = self.next_account_id
+            self.next_account_id += 1
+            self.new_accounts.append((id, name))
+        return id
+
+    def load_directives(self, journal: Journal):
+        for account in journal.accounts:
+            self.account_id(account.account)
+        self.flush_accounts()
+        self.conn.executemany(
+            "UPDATE accounts SET comment = ? WHERE name = ?",
+            [(a.comment, a.account) for a in journal.accounts],
+        )
+        self.conn.executemany(
+            "INSERT INTO commodities VALUES (?, ?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+            "format = excluded.format, note = excluded.note, "
+            "nomarket = excluded.nomarket, is_default = excluded.is_default",
+            [(c.commodity, c.format, c.note, c.nomarket, c.default) for c in journal.commodities],
+        )
+
+    def flush_accounts(self):
+        self.conn.executemany("INSERT INTO accounts(id, name) VALUES (?, ?)", self.new_accounts)
+        self.new_accounts = []
+
+    def load_entries(self, entries: Iterable[tuple[str, JournalEntry]]):
+        entries = iter(entries)
+        while batch := list(islice(entries, self.batch_size)):
+            entry_rows, posting_rows, tag_rows = [], [], []
+            for fingerprint, entry in batch:
+                entry_id = self.next_entry_id
+                self.next_entry_id += 1
+                entry_rows.append(
+                    (entry_id, fingerprint, entry.date, entry.effective_date, _status(entry), entry.title)
+                )
+                for comment in entry.comments:
+                    for name, value in parse_tags(comment).items():
+                        tag_rows.append((entry_id, None, name, value))
+                for position, t in enumerate(entry.transactions):
+                    account_id = self.account_id(t.account)
+                    if t.amount is not None:
+                        amounts = [(t.currency, t.amount, False)]
+                    else:
+                        amounts = [(c, str(a), True) for c, a in _balance(entry).items()] or [(None, None, False)]
+                    for currency, amount, inferred in amounts:
+                        posting_id = self.next_posting_id
+                        self.next_posting_id += 1
+                        posting_rows.append((
+                            posting_id,
+                            entry_id,
+                            position,
+                            account_id,
+                            currency,
+                            amount,
+                            None if amount is None else _to_minor(amount),
+                            inferred,
+                            t.comment,
+                        ))
+                        if t.comment is not None:
+                            for name, value in parse_tags(t.comment).items():
+                                tag_rows.append((entry_id, posting_id, name, value))
+            self.flush_accounts()
+            self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", entry_rows)
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", posting_rows)
+            self.conn.executemany("INSERT INTO tags VALUES (?, ?, ?, ?)", tag_rows)
+
+
+def journal_to_sqlite(
+    journal_or_path: Journal | Path | str,
+    db_path: Path | str,
+    incremental: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> dict[str, int]:
+    """
+    Load a Journal, or a journal file parsed a chunk at a time, into the SQLite database db_path.
+    Without incremental, the tables are recreated. With incremental, entries already in the
+    database are kept, new and changed entries are added, and entries no longer in the journal
+    are deleted. Returns the number of entries added, deleted and unchanged.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            if not incremental:
+                for table in TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.executescript(SCHEMA)
+
+        with conn:
+            loader = _Loader(conn, batch_size)
+            existing = dict(conn.execute("SELECT fingerprint, id FROM entries"))
+            seen = set()
+            counts = {}
+            added = 0
+
+            def new_entries(journal: Journal):
+                nonlocal added
+                for fingerprint, entry in entry_fingerprints(journal.entries, counts):
+                    seen.add(fingerprint)
+                    if fingerprint not in existing:
+                        added += 1
+                        yield fingerprint, entry
+
+            for journal in _journals(journal_or_path):
+                loader.load_directives(journal)
+                loader.load_entries(new_entries(journal))
+
+            removed = [(id,) for fingerprint, id in existing.items() if fingerprint not in seen]
+            conn.executemany("DELETE FROM entries WHERE id = ?", removed)
+
+        conn.executescript(INDEXES)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return {"added": added, "deleted": len(removed), "unchanged": len(seen) - added}
+    finally:
+        conn.close()
@@ -1,5 +1,30 @@
 __version__ = "1.0.0"
 
-from .parsers.p_ledger import JournalParser
-from .lexers.l_ledger import JournalLexer
-from .preprocessing import preprocess_includes
+import importlib
+
+# The lexer and parser modules import PLY, so they are only imported on first use
+_lazy_attributes = {
+    "JournalParser": ".parsers.p_ledger",
+    "JournalLexer": ".lexers.l_ledger",
+    "preprocess_includes": ".preprocessing",
+    "EntryFilter": ".filters",
+    "Diagnostics": ".diagnostics",
+    "Diagnostic": ".diagnostics",
+    "JournalSyntaxError": ".diagnostics",
+    "JournalSyntaxWarning": ".diagnostics",
+    "ParseStats": ".stats",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name: str):
+    if (module := _lazy_attributes.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
@@ -0,0 +1,73 @@
+"""
+Splitting a journal into chunks which can be parsed one at a time.
+
+A chunk ends at a blank line followed by a line starting in the first column,
+where the lexer is back in its initial state, so every entry and directive is
+entirely within one chunk. Blank lines inside block comments are skipped.
+"""
+import re
+from typing import Iterable, Iterator
+
+CHUNK_BOUNDARY_RE = re.compile(r"\n\n(?=\S)")
+# The same markers as the block comment rule of JournalLexer
+BLOCKCOMMENT_START_RE = re.compile(r"^comment", re.M)
+BLOCKCOMMENT_END_RE = re.compile(r"end\scomment")
+
+# Default size of a chunk, in characters
+CHUNK_SIZE = 1 << 20
+
+
+def chunk_bounds(data: str, size: int = CHUNK_SIZE) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) of the chunks of data, each at least size characters long but the last"""
+    n = len(data)
+    start = 0
+    checked = 0  # Block comments starting before this have been looked at
+    while start < n:
+        end = n
+        pos = start + size
+        while pos < n:
+            m = CHUNK_BOUNDARY_RE.search(data, pos)
+            if m is None:
+                break
+            cut = m.end()
+            block_end = None
+            for block in BLOCKCOMMENT_START_RE.finditer(data, checked, cut):
+                if block.start() < checked:
+                    continue
+                e = BLOCKCOMMENT_END_RE.search(data, block.end())
+                checked = e.end() if e else n
+                if checked > cut:
+                    block_end = checked
+                    break
+            if block_end is None:
+                end = cut
+                break
+            # The boundary is inside a block comment, look after it
+            pos = block_end
+        yield start, end
+        start = end
+
+
+def iter_chunks(lines: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Join lines, like the lines of a file, into chunks split like chunk_bounds,
+    each at least size characters long but the last, reading the lines only as needed.
+    """
+    buffer = []
+    length = 0
+    blank = False  # The last line was empty
+    in_block = False  # Inside a block comment
+    for line in lines:
+        if length >= size and blank and not in_block and line[:1] and not line[0].isspace():
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+        buffer.append(line)
+        length += len(line)
+        if in_block:
+            in_block = BLOCKCOMMENT_END_RE.search(line) is None
+        elif BLOCKCOMMENT_START_RE.match(line):
+            in_block = BLOCKCOMMENT_END_RE.search(line, len("comment")) is None
+        blank = line == "\n"
+    if buffer:
+        yield "".join(buffer)
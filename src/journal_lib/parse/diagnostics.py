@@ -0,0 +1,127 @@
+import warnings
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable
+
+
+class JournalSyntaxError(Exception):
+    """Raised for the first error when diagnostics are collected with raise_on_error"""
+
+    def __init__(self, diagnostic: "Diagnostic"):
+        super().__init__(str(diagnostic))
+        self.diagnostic = diagnostic
+
+
+class JournalSyntaxWarning(UserWarning):
+    """Warned when errors were found, but no Diagnostics were given to collect them"""
+
+
+@dataclass
+class Diagnostic:
+    kind: str  # "lex" for illegal characters, "syntax" for parse errors
+    message: str
+    lineno: int
+    column: int
+    line: str
+    lexpos: int
+    length: int = 1
+
+    def __str__(self):
+        return (
+            f"{self.message} on line {self.lineno}, position {self.column}\n"
+            f"    {self.line}\n"
+            f"    {' ' * self.column}{'^' * self.length}"
+        )
+
+
+class LineIndex:
+    """Start offsets of every line in a string, resolving positions to lines with bisect"""
+
+    def __init__(self, data: str):
+        self.data = data
+        self.offsets = array("q", [0])
+        pos = data.find("\n")
+        while pos != -1:
+            self.offsets.append(pos + 1)
+            pos = data.find("\n", pos + 1)
+
+    def position(self, lexpos: int) -> tuple[int, int]:
+        """Return the (line number, column) of a position, line numbers start at 1"""
+        i = bisect_right(self.offsets, lexpos) - 1
+        return i + 1, lexpos - self.offsets[i]
+
+    def line(self, lineno: int) -> str:
+        """Return the text of a line, without the newline"""
+        start = self.offsets[lineno - 1]
+        end = self.data.find("\n", start)
+        return self.data[start:] if end == -1 else self.data[start:end]
+
+
+class Diagnostics:
+    """
+    Collects lexing and parsing errors.
+    After max_errors errors, further errors are only counted in dropped.
+    With raise_on_error, the first error is raised as a JournalSyntaxError.
+    """
+
+    def __init__(self, max_errors: int | None = None, raise_on_error: bool = False):
+        self.max_errors = max_errors
+        self.raise_on_error = raise_on_error
+        self.errors: list[Diagnostic] = []
+        self.dropped = 0
+        # Added to the line numbers, when the input is a part of a larger file
+        self.line_offset = 0
+        self._index = None
+
+    def __len__(self):
+        return len(self.errors) + self.dropped
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def release_source(self):
+        """Drop the line index of the last input, which references the input"""
+        self._index = None
+
+    def warn(self, stacklevel: int = 1):
+        """
+        Warn with a JournalSyntaxWarning if there are errors, for callers who didn't ask for them.
+        stacklevel is relative to the caller of warn, like for warnings.warn.
+        """
+        if not len(self):
+            return
+        count = f"{len(self)} error{'s' if len(self) > 1 else ''}"
+        message = f"{count} while reading the journal, the first: {self.errors[0]}" if self.errors else count
+        warnings.warn(message, JournalSyntaxWarning, stacklevel=stacklevel + 1)
+
+    def extend(self, diagnostics: Iterable[Diagnostic]):
+        """Record errors collected by other Diagnostics, like in another process"""
+        for diagnostic in diagnostics:
+            if self.max_errors is not None and len(self.errors) >= self.max_errors:
+                self.dropped += 1
+                continue
+            self.errors.append(diagnostic)
+            if self.raise_on_error:
+                raise JournalSyntaxError(diagnostic)
+
+    def add(self, kind: str, message: str, data: str, lexpos: int, length: int = 1):
+        """Record an error at position lexpos in data"""
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.dropped += 1
+            return
+        if self._index is None or self._index.data is not data:
+            self._index = LineIndex(data)
+        lineno, column = self._index.position(lexpos)
+        diagnostic = Diagnostic(
+            kind=kind,
+            message=message,
+            lineno=lineno + self.line_offset,
+            column=column,
+            line=self._index.line(lineno),
+            lexpos=lexpos,
+            length=length,
+        )
+        self.errors.append(diagnostic)
+        if self.raise_on_error:
+            raise JournalSyntaxError(diagnostic)
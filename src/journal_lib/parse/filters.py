@@ -0,0 +1,96 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+
+# Matches the account of every posting line in a raw entry body. An account
+# ends at two consecutive whitespace characters, a ';' or the end of the line,
+# which is the same rule the lexer uses for posting lines.
+POSTING_ACCOUNT_RE = re.compile(r"^[ \t]+([^\s;](?:[^\s;]|[ \t](?=[^\s;]))*)", re.M)
+
+# Matches the rest of an entry header after the date, up to the status mark.
+# Whitespace is allowed around the effective date, like in the lexer.
+HEADER_STATUS_RE = re.compile(r"[ \t]*(?:=[ \t]*\d{4}[-/]\d{2}[-/]\d{2}[ \t]*)?([*!]?)")
+
+ENTRY_STATUSES = ("cleared", "pending", "unmarked")
+
+
+def _iso_date(value: str | date | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.isoformat()
+    return value.replace("/", "-")
+
+
+@dataclass
+class EntryFilter:
+    """
+    Predicates used to skip journal entries while lexing, before any tokens or
+    dataclasses are produced for them.
+
+    account may be a prefix string or a compiled regular expression, which is
+    searched in the account name. An entry is kept if any posting matches.
+    begin is inclusive and end is exclusive, like the ledger -b/-e options.
+    status is one or more of "cleared", "pending" and "unmarked".
+    Account and commodity definitions are never filtered.
+    """
+
+    account: str | re.Pattern | None = None
+    begin: str | date | None = None
+    end: str | date | None = None
+    status: str | tuple[str, ...] | None = None
+
+    def __post_init__(self):
+        self.begin = _iso_date(self.begin)
+        self.end = _iso_date(self.end)
+        if isinstance(self.status, str):
+            self.status = (self.status,)
+        if self.status is not None:
+            for status in self.status:
+                if status not in ENTRY_STATUSES:
+                    raise ValueError(f"Unknown entry status '{status}'")
+
+    def match_date(self, value: str) -> bool:
+        """Check a raw date as written in the journal"""
+        value = value.replace("/", "-")
+        if self.begin is not None and value < self.begin:
+            return False
+        if self.end is not None and value >= self.end:
+            return False
+        return True
+
+    def match_status(self, mark: str) -> bool:
+        """Check the status mark ("*", "!" or "") of an entry header"""
+        if self.status is None:
+            return True
+        if mark == "*":
+            return "cleared" in self.status
+        if mark == "!":
+            return "pending" in self.status
+        return "unmarked" in self.status
+
+    def match_account(self, account: str) -> bool:
+        if self.account is None:
+            return True
+        if isinstance(self.account, str):
+            return account.startswith(self.account)
+        return self.account.search(account) is not None
+
+    def match_header(self, data: str, start: int, end: int) -> bool:
+        """
+        Check the raw header line data[start:end], where start is the position
+        right after the entry date.
+        """
+        if self.status is None:
+            return True
+        m = HEADER_STATUS_RE.match(data, start, end)
+        return self.match_status(m.group(1))
+
+    def match_postings(self, data: str, start: int, end: int) -> bool:
+        """Check the raw posting lines in data[start:end] against the account predicate"""
+        if self.account is None:
+            return True
+        for m in POSTING_ACCOUNT_RE.finditer(data, start, end):
+            if self.match_account(m.group(1).strip('"')):
+                return True
+        return False
@@ -0,0 +1,48 @@
+# This file is automatically generated by journal_lib.parse.tabgen.
+# Do not edit, regenerate it with `python -m journal_lib.parse.tabgen`.
+# fmt: off
+
+_lexsignature = 'a9f8e7c0'
+_lextokens      = set(('AMOUNT', 'COMMENT', 'COMMODITY', 'COMMODITY_DEFAULT', 'COMMODITY_FORMAT', 'COMMODITY_NOMARKET', 'COMMODITY_NOTE', 'DATE', 'ENTRY_EFFECTIVE_DATE_SEPARATOR', 'ENTRY_STATUS', 'INLINE_COMMENT', 'KW_ACCOUNT', 'KW_COMMODITY', 'TEXT'))
+_lexreflags     = 0
+_lexliterals    = '\n'
+_lexstateinfo   = {'INITIAL': 'inclusive', 'sHEADER': 'exclusive', 'sHEADEREFF': 'exclusive', 'sENTRY': 'exclusive', 'sENTRYCONTENT': 'exclusive', 'sACCOUNT': 'exclusive', 'sCOMMODITY': 'exclusive'}
+_lexstatere     = {'INITIAL': [('(?P<t_INITIAL_DATE>\\d{4}(-|\\/)\\d{2}(-|\\/)\\d{2})|(?P<t_INITIAL_COMMENT>[;\\#%|*][^\\n]*(\\n[ \\t]*[;\\#%|*][^\\n]*)*\\n?)|(?P<t_INITIAL_BLOCKCOMMENT>comment)|(?P<t_INITIAL_KEYWORD>[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_ANY_newline>\\n+)', [None, ('t_INITIAL_DATE', 'DATE'), None, None, ('t_INITIAL_COMMENT', 'COMMENT'), None, ('t_INITIAL_BLOCKCOMMENT', 'BLOCKCOMMENT'), ('t_INITIAL_KEYWORD', 'KEYWORD'), ('t_ANY_newline', 'newline')], [None, 't_INITIAL_DATE', None, None, 't_INITIAL_COMMENT', None, 't_INITIAL_BLOCKCOMMENT', 't_INITIAL_KEYWORD', 't_ANY_newline'])], 'sHEADER': [('(?P<t_sHEADER_ENTRY_STATUS>(\\*|!))|(?P<t_sHEADER_ENTRY_EFFECTIVE_DATE_SEPARATOR>=)|(?P<t_sHEADER_TEXT>[^\\n]+)|(?P<t_sHEADER_newline>\\n)|(?P<t_ANY_newline>\\n+)', [None, ('t_sHEADER_ENTRY_STATUS', 'ENTRY_STATUS'), None, ('t_sHEADER_ENTRY_EFFECTIVE_DATE_SEPARATOR', 'ENTRY_EFFECTIVE_DATE_SEPARATOR'), ('t_sHEADER_TEXT', 'TEXT'), ('t_sHEADER_newline', 'newline'), ('t_ANY_newline', 'newline')], [None, 't_sHEADER_ENTRY_STATUS', None, 't_sHEADER_ENTRY_EFFECTIVE_DATE_SEPARATOR', 't_sHEADER_TEXT', 't_sHEADER_newline', 't_ANY_newline'])], 'sHEADEREFF': [('(?P<t_sHEADEREFF_DATE>\\d{4}(-|\\/)\\d{2}(-|\\/)\\d{2})|(?P<t_ANY_newline>\\n+)', [None, ('t_sHEADEREFF_DATE', 'DATE'), None, None, ('t_ANY_newline', 'newline')], [None, 't_sHEADEREFF_DATE', None, None, 't_ANY_newline'])], 'sENTRY': [('(?P<t_sENTRY_TEXT>[^\\s;](?:[^\\s;]|[ \\t](?=[^\\s;]))*)|(?P<t_sENTRY_COMMENT>;[^\\n]*)|(?P<t_sENTRY_sENTRYCONTENT_double_newline>\\n\\n)|(?P<t_ANY_newline>\\n+)', [None, ('t_sENTRY_TEXT', 'TEXT'), ('t_sENTRY_COMMENT', 'COMMENT'), ('t_sENTRY_sENTRYCONTENT_double_newline', 'double_newline'), ('t_ANY_newline', 'newline')], [None, 't_sENTRY_TEXT', 't_sENTRY_COMMENT', 't_sENTRY_sENTRYCONTENT_double_newline', 't_ANY_newline'])], 'sENTRYCONTENT': [('(?P<t_sENTRYCONTENT_COMMODITY>\\$|NOK)|(?P<t_sENTRYCONTENT_AMOUNT>(-)?(\\d|\\,)+(\\.\\d{2})?)|(?P<t_sENTRYCONTENT_INLINE_COMMENT>;[^\\n]*)|(?P<t_sENTRY_sENTRYCONTENT_double_newline>\\n\\n)|(?P<t_sENTRYCONTENT_newline>\\n)|(?P<t_ANY_newline>\\n+)', [None, ('t_sENTRYCONTENT_COMMODITY', 'COMMODITY'), ('t_sENTRYCONTENT_AMOUNT', 'AMOUNT'), None, None, None, ('t_sENTRYCONTENT_INLINE_COMMENT', 'INLINE_COMMENT'), ('t_sENTRY_sENTRYCONTENT_double_newline', 'double_newline'), ('t_sENTRYCONTENT_newline', 'newline'), ('t_ANY_newline', 'newline')], [None, 't_sENTRYCONTENT_COMMODITY', 't_sENTRYCONTENT_AMOUNT', None, None, None, 't_sENTRYCONTENT_INLINE_COMMENT', 't_sENTRY_sENTRYCONTENT_double_newline', 't_sENTRYCONTENT_newline', 't_ANY_newline'])], 'sACCOUNT': [('(?P<t_sACCOUNT_TEXT>("[^"]+")|([^\\n;]+))|(?P<t_sACCOUNT_COMMENT>(;)[^\\n]*)|(?P<t_sACCOUNT_newline>\\n)|(?P<t_ANY_newline>\\n+)', [None, ('t_sACCOUNT_TEXT', 'TEXT'), None, None, ('t_sACCOUNT_COMMENT', 'COMMENT'), None, ('t_sACCOUNT_newline', 'newline'), ('t_ANY_newline', 'newline')], [None, 't_sACCOUNT_TEXT', None, None, 't_sACCOUNT_COMMENT', None, 't_sACCOUNT_newline', 't_ANY_newline'])], 'sCOMMODITY': [('(?P<t_sCOMMODITY_KW>(note|format|nomarket|default))|(?P<t_sCOMMODITY_TEXT>[^\\n]+)|(?P<t_sCOMMODITY_newline>\\n(?=(\\s*\\n|\\s*$|[^\\s])))|(?P<t_ANY_newline>\\n+)', [None, ('t_sCOMMODITY_KW', 'KW'), None, ('t_sCOMMODITY_TEXT', 'TEXT'), ('t_sCOMMODITY_newline', 'newline'), None, ('t_ANY_newline', 'newline')], [None, 't_sCOMMODITY_KW', None, 't_sCOMMODITY_TEXT', 't_sCOMMODITY_newline', None, 't_ANY_newline'])]}
+_lexstateignore = {'INITIAL': ' \t', 'sHEADER': ' \t', 'sHEADEREFF': ' \t', 'sENTRY': ' \t', 'sENTRYCONTENT': ' \t', 'sACCOUNT': ' \t', 'sCOMMODITY': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_ANY_error', 'sHEADER': 't_ANY_error', 'sHEADEREFF': 't_ANY_error', 'sENTRY': 't_ANY_error', 'sENTRYCONTENT': 't_ANY_error', 'sACCOUNT': 't_ANY_error', 'sCOMMODITY': 't_ANY_error'}
+_lexstateeoff   = {'INITIAL': 't_INITIAL_eof', 'sHEADER': 't_ANY_eof', 'sHEADEREFF': 't_ANY_eof', 'sENTRY': 't_ANY_eof', 'sENTRYCONTENT': 't_ANY_eof', 'sACCOUNT': 't_ANY_eof', 'sCOMMODITY': 't_ANY_eof'}
+
+_lrsignature = 'c434b5df'
+_lr_action = {0: {'$end': -18, 'DATE': 5, 'KW_ACCOUNT': 6, 'KW_COMMODITY': 7}, 1: {'$end': 0}, 2: {'$end': -1, 'DATE': 5, 'KW_ACCOUNT': 6, 'KW_COMMODITY': 7}, 3: {'$end': -2}, 4: {'DATE': -4, 'KW_ACCOUNT': -4, 'KW_COMMODITY': -4, '$end': -4}, 5: {'ENTRY_EFFECTIVE_DATE_SEPARATOR': 10, 'ENTRY_STATUS': -18, 'TEXT': -18}, 6: {'TEXT': 12}, 7: {'TEXT': 13}, 8: {'DATE': -3, 'KW_ACCOUNT': -3, 'KW_COMMODITY': -3, '$end': -3}, 9: {'ENTRY_STATUS': 15, 'TEXT': -18}, 10: {'DATE': 17}, 11: {'ENTRY_STATUS': -15, 'TEXT': -15}, 12: {'COMMENT': 18, 'DATE': -7, 'KW_ACCOUNT': -7, 'KW_COMMODITY': -7, '$end': -7}, 13: {'COMMODITY_FORMAT': 20, 'COMMODITY_NOTE': 21, 'COMMODITY_NOMARKET': 22, 'COMMODITY_DEFAULT': 23, 'DATE': -18, 'KW_ACCOUNT': -18, 'KW_COMMODITY': -18, '$end': -18}, 14: {'TEXT': 25}, 15: {'TEXT': -16}, 16: {'TEXT': -17}, 17: {'ENTRY_STATUS': -14, 'TEXT': -14}, 18: {'DATE': -6, 'KW_ACCOUNT': -6, 'KW_COMMODITY': -6, '$end': -6}, 19: {'DATE': -8, 'KW_ACCOUNT': -8, 'KW_COMMODITY': -8, '$end': -8}, 20: {'TEXT': 26}, 21: {'TEXT': 27}, 22: {'COMMODITY_FORMAT': 20, 'COMMODITY_NOTE': 21, 'COMMODITY_NOMARKET': 22, 'COMMODITY_DEFAULT': 23, 'DATE': -18, 'KW_ACCOUNT': -18, 'KW_COMMODITY': -18, '$end': -18}, 23: {'COMMODITY_FORMAT': 20, 'COMMODITY_NOTE': 21, 'COMMODITY_NOMARKET': 22, 'COMMODITY_DEFAULT': 23, 'DATE': -18, 'KW_ACCOUNT': -18, 'KW_COMMODITY': -18, '$end': -18}, 24: {'DATE': -13, 'KW_ACCOUNT': -13, 'KW_COMMODITY': -13, '$end': -13}, 25: {'COMMENT': 33, 'TEXT': 30}, 26: {'COMMODITY_FORMAT': 20, 'COMMODITY_NOTE': 21, 'COMMODITY_NOMARKET': 22, 'COMMODITY_DEFAULT': 23, 'DATE': -18, 'KW_ACCOUNT': -18, 'KW_COMMODITY': -18, '$end': -18}, 27: {'COMMODITY_FORMAT': 20, 'COMMODITY_NOTE': 21, 'COMMODITY_NOMARKET': 22, 'COMMODITY_DEFAULT': 23, 'DATE': -18, 'KW_ACCOUNT': -18, 'KW_COMMODITY': -18, '$end': -18}, 28: {'DATE': -11, 'KW_ACCOUNT': -11, 'KW_COMMODITY': -11, '$end': -11}, 29: {'DATE': -12, 'KW_ACCOUNT': -12, 'KW_COMMODITY': -12, '$end': -12}, 30: {'INLINE_COMMENT': 37, 'COMMENT': -28, 'TEXT': -28, 'DATE': -28, 'KW_ACCOUNT': -28, 'KW_COMMODITY': -28, '$end': -28, 'COMMODITY': 38, 'AMOUNT': 39}, 31: {'DATE': -5, 'KW_ACCOUNT': -5, 'KW_COMMODITY': -5, '$end': -5, 'COMMENT': 41, 'TEXT': 30}, 32: {'COMMENT': -21, 'TEXT': -21, 'DATE': -21, 'KW_ACCOUNT': -21, 'KW_COMMODITY': -21, '$end': -21}, 33: {'COMMENT': -22, 'TEXT': -22, 'DATE': -22, 'KW_ACCOUNT': -22, 'KW_COMMODITY': -22, '$end': -22}, 34: {'DATE': -9, 'KW_ACCOUNT': -9, 'KW_COMMODITY': -9, '$end': -9}, 35: {'DATE': -10, 'KW_ACCOUNT': -10, 'KW_COMMODITY': -10, '$end': -10}, 36: {'INLINE_COMMENT': 42, 'COMMENT': -26, 'TEXT': -26, 'DATE': -26, 'KW_ACCOUNT': -26, 'KW_COMMODITY': -26, '$end': -26}, 37: {'COMMENT': -27, 'TEXT': -27, 'DATE': -27, 'KW_ACCOUNT': -27, 'KW_COMMODITY': -27, '$end': -27}, 38: {'AMOUNT': 43}, 39: {'COMMODITY': 44}, 40: {'COMMENT': -19, 'TEXT': -19, 'DATE': -19, 'KW_ACCOUNT': -19, 'KW_COMMODITY': -19, '$end': -19}, 41: {'COMMENT': -20, 'TEXT': -20, 'DATE': -20, 'KW_ACCOUNT': -20, 'KW_COMMODITY': -20, '$end': -20}, 42: {'COMMENT': -25, 'TEXT': -25, 'DATE': -25, 'KW_ACCOUNT': -25, 'KW_COMMODITY': -25, '$end': -25}, 43: {'INLINE_COMMENT': -23, 'COMMENT': -23, 'TEXT': -23, 'DATE': -23, 'KW_ACCOUNT': -23, 'KW_COMMODITY': -23, '$end': -23}, 44: {'INLINE_COMMENT': -24, 'COMMENT': -24, 'TEXT': -24, 'DATE': -24, 'KW_ACCOUNT': -24, 'KW_COMMODITY': -24, '$end': -24}}
+_lr_goto = {0: {'journal': 1, 'elements': 2, 'empty': 3, 'element': 4}, 1: {}, 2: {'element': 8}, 3: {}, 4: {}, 5: {'effective_date': 9, 'empty': 11}, 6: {}, 7: {}, 8: {}, 9: {'status': 14, 'empty': 16}, 10: {}, 11: {}, 12: {}, 13: {'commodity_attributes': 19, 'empty': 24}, 14: {}, 15: {}, 16: {}, 17: {}, 18: {}, 19: {}, 20: {}, 21: {}, 22: {'commodity_attributes': 28, 'empty': 24}, 23: {'commodity_attributes': 29, 'empty': 24}, 24: {}, 25: {'transactions': 31, 'transaction': 32}, 26: {'commodity_attributes': 34, 'empty': 24}, 27: {'commodity_attributes': 35, 'empty': 24}, 28: {}, 29: {}, 30: {'amount': 36}, 31: {'transaction': 40}, 32: {}, 33: {}, 34: {}, 35: {}, 36: {}, 37: {}, 38: {}, 39: {}, 40: {}, 41: {}, 42: {}, 43: {}, 44: {}}
+_lr_productions = [
+  ("S' -> journal", "S'", 1, None),
+  ('journal -> elements', 'journal', 1, 'p_journal'),
+  ('journal -> empty', 'journal', 1, 'p_journal'),
+  ('elements -> elements element', 'elements', 2, 'p_elements'),
+  ('elements -> element', 'elements', 1, 'p_elements'),
+  ('element -> DATE effective_date status TEXT transactions', 'element', 5, 'p_element_entry'),
+  ('element -> KW_ACCOUNT TEXT COMMENT', 'element', 3, 'p_element_account'),
+  ('element -> KW_ACCOUNT TEXT', 'element', 2, 'p_element_account'),
+  ('element -> KW_COMMODITY TEXT commodity_attributes', 'element', 3, 'p_element_commodity'),
+  ('commodity_attributes -> COMMODITY_FORMAT TEXT commodity_attributes', 'commodity_attributes', 3, 'p_commodity_attributes'),
+  ('commodity_attributes -> COMMODITY_NOTE TEXT commodity_attributes', 'commodity_attributes', 3, 'p_commodity_attributes'),
+  ('commodity_attributes -> COMMODITY_NOMARKET commodity_attributes', 'commodity_attributes', 2, 'p_commodity_attributes'),
+  ('commodity_attributes -> COMMODITY_DEFAULT commodity_attributes', 'commodity_attributes', 2, 'p_commodity_attributes'),
+  ('commodity_attributes -> empty', 'commodity_attributes', 1, 'p_commodity_attributes'),
+  ('effective_date -> ENTRY_EFFECTIVE_DATE_SEPARATOR DATE', 'effective_date', 2, 'p_effective_date'),
+  ('effective_date -> empty', 'effective_date', 1, 'p_effective_date'),
+  ('status -> ENTRY_STATUS', 'status', 1, 'p_status'),
+  ('status -> empty', 'status', 1, 'p_status'),
+  ('empty -> <empty>', 'empty', 0, 'p_empty'),
+  ('transactions -> transactions transaction', 'transactions', 2, 'p_transactions'),
+  ('transactions -> transactions COMMENT', 'transactions', 2, 'p_comments'),
+  ('transactions -> transaction', 'transactions', 1, 'p_transactions_single'),
+  ('transactions -> COMMENT', 'transactions', 1, 'p_transactions_comment_single'),
+  ('amount -> COMMODITY AMOUNT', 'amount', 2, 'p_amount_prefixed'),
+  ('amount -> AMOUNT COMMODITY', 'amount', 2, 'p_amount_suffixed'),
+  ('transaction -> TEXT amount INLINE_COMMENT', 'transaction', 3, 'p_transaction_with_amount'),
+  ('transaction -> TEXT amount', 'transaction', 2, 'p_transaction_with_amount'),
+  ('transaction -> TEXT INLINE_COMMENT', 'transaction', 2, 'p_transaction_without_amount'),
+  ('transaction -> TEXT', 'transaction', 1, 'p_transaction_without_amount'),
+]
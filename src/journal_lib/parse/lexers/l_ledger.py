@@ -1,13 +1,26 @@
+import re
+
 from journal_lib.parse.lexwrapper import LexWrapper
+from journal_lib.parse.filters import EntryFilter
+from journal_lib.parse.diagnostics import Diagnostics
+from journal_lib.parse.tables import TABMODULE
+
+BLOCKCOMMENT_END_RE = re.compile(r"end\scomment")
+# Entries, directives and global comments start in the first column of a line
+TOPLEVEL_RE = re.compile(r"\n(?=\S)")
 
 
 class JournalLexer(LexWrapper):
+    tabmodule = TABMODULE
+    # The rules have no whitespace or comments outside character classes,
+    # so the master regexes are written and compiled without re.VERBOSE
+    reflags = 0
+
     states = (
         ('sHEADER', 'exclusive'),        # Entry header parsing state
         ('sHEADEREFF', 'exclusive'),     # Entry header effective date parsing state
         ('sENTRY', 'exclusive'),         # Entry parsing state
         ('sENTRYCONTENT', 'exclusive'),  # Entry parsing state
-        ('sBLOCKCOMMENT', 'exclusive'),  # Block comment parsing state
         ('sACCOUNT', 'exclusive'),       # Account definition parsing state
         ('sCOMMODITY', 'exclusive'),     # Commodity definition parsing state
     )
@@ -41,10 +54,75 @@ class JournalLexer(LexWrapper):
 
     literals = "\n"
 
+    def __init__(
+        self,
+        debug: bool = False,
+        entry_filter: EntryFilter | None = None,
+        headers_only: bool = False,
+        diagnostics: Diagnostics | None = None,
+        profile: bool = False,
+    ):
+        """
+        Initialize a new JournalLexer, optionally skipping entries not matching entry_filter.
+        If headers_only is set, the body of every entry is skipped without producing tokens.
+        """
+        self.entry_filter = entry_filter
+        self.headers_only = headers_only
+        # Whether the header of the current entry has a title, see t_sHEADER_newline
+        self.header_title = False
+        super().__init__(debug=debug, diagnostics=diagnostics, profile=profile)
+
+    @staticmethod
+    def _entry_end(data: str, pos: int) -> int:
+        """Find the blank line ending the entry containing pos"""
+        end = data.find("\n\n", pos)
+        return len(data) if end == -1 else end
+
+    def _skip_to(self, t, end: int):
+        """Move the lexer to end, keeping the line number up to date"""
+        t.lexer.lineno += t.lexer.lexdata.count("\n", t.lexer.lexpos, end)
+        t.lexer.lexpos = end
+
+    def _skip_entry(self, t):
+        """
+        Evaluate the entry filter on the raw entry starting at the date token t.
+        If the entry can't match, the lexer is moved to the blank line ending it,
+        and True is returned.
+        """
+        data = t.lexer.lexdata
+        end = self._entry_end(data, t.lexpos)
+        header_end = data.find("\n", t.lexer.lexpos, end)
+        if header_end == -1:
+            header_end = end
+        f = self.entry_filter
+        if (
+            f.match_date(t.value)
+            and f.match_header(data, t.lexer.lexpos, header_end)
+            and f.match_postings(data, header_end + 1, end)
+        ):
+            return False
+        self._skip_to(t, end)
+        return True
+
+    def resync(self):
+        """
+        Skip to the next line starting in the first column, where a new entry,
+        directive or comment begins. Used to recover from syntax errors.
+        """
+        lexer = self.lexer
+        m = TOPLEVEL_RE.search(lexer.lexdata, lexer.lexpos)
+        end = m.end() if m else lexer.lexlen
+        lexer.lineno += lexer.lexdata.count("\n", lexer.lexpos, end)
+        lexer.lexpos = end
+        self._state_begin("INITIAL")
+
     # Rules for the 'initial' state
 
     def t_INITIAL_DATE(self, t):
         r"\d{4}(-|\/)\d{2}(-|\/)\d{2}"
+        if self.entry_filter is not None and self._skip_entry(t):
+            return None
+        self.header_title = False
         self._state_begin("sHEADER", t)
         return t
 
@@ -52,15 +130,14 @@ class JournalLexer(LexWrapper):
         pass
 
     def t_INITIAL_COMMENT(self, t):
-        r"(;|\#|\%|\||\*).+\n"
-        t.value = t.value.lstrip()
-        if t.value[0] in [";", "#", "%", "|", "*"]:
-            t.value = t.value[1:]
-        pass
+        r"[;\#%|*][^\n]*(\n[ \t]*[;\#%|*][^\n]*)*\n?"
+        # A run of consecutive comment lines is matched at once
+        t.lexer.lineno += t.value.count("\n")
 
     def t_INITIAL_BLOCKCOMMENT(self, t):
         r"comment"
-        self._state_begin("sBLOCKCOMMENT", t)
+        m = BLOCKCOMMENT_END_RE.search(t.lexer.lexdata, t.lexer.lexpos)
+        self._skip_to(t, m.end() if m else t.lexer.lexlen)
 
     def t_INITIAL_KEYWORD(self, t):
         r"[a-zA-Z_][a-zA-Z_0-9]*"
@@ -69,19 +146,6 @@ class JournalLexer(LexWrapper):
             self._state_begin(new_state, t)
         return t
 
-    # Rules for the 'sBLOCKCOMMENT' state
-
-    def t_sBLOCKCOMMENT_end(self, t):
-        r"end\scomment"
-        t.lexer.lineno += t.value.count("\n")
-        self._state_begin("INITIAL", t)
-
-    def t_sBLOCKCOMMENT_content(self, t):
-        r".+?\n"
-
-    def t_sBLOCKCOMMENT_error(self, t):
-        r.lexer.skip(1)
-
     # Rules for the 'sACCOUNT' state
 
     def t_sACCOUNT_TEXT(self, t):
@@ -100,6 +164,7 @@ class JournalLexer(LexWrapper):
 
     def t_sACCOUNT_newline(self, t):
         r"\n"
+        t.lexer.lineno += 1
         self._state_begin("INITIAL", t)
 
     # Rules for the 'sCOMMODITY' state
@@ -123,6 +188,7 @@ class JournalLexer(LexWrapper):
 
     def t_sCOMMODITY_newline(self, t):
         r"\n(?=(\s*\n|\s*$|[^\s]))"
+        t.lexer.lineno += 1
         self._state_begin("INITIAL", t)
 
     # Rules for the 'sheader' state
@@ -142,11 +208,26 @@ class JournalLexer(LexWrapper):
             t.value.startswith("'") and t.value.endswith("'")
         ):
             t.value = t.value[1:-1]
+        self.header_title = True
         return t
 
     def t_sHEADER_newline(self, t):
         r"\n"
-        self._state_begin("sENTRY", t)
+        t.lexer.lineno += 1
+        if self.headers_only:
+            self._skip_to(t, self._entry_end(t.lexer.lexdata, t.lexpos))
+            self._state_begin("INITIAL", t)
+        elif t.lexer.lexdata.startswith("\n", t.lexer.lexpos):
+            # A blank line right after the header ends the entry, which has no postings
+            self._state_begin("INITIAL", t)
+        else:
+            self._state_begin("sENTRY", t)
+        if not self.header_title:
+            # The header ended without a title, which is passed on as a TEXT without a
+            # value, so the first posting isn't taken for the title
+            t.type = "TEXT"
+            t.value = None
+            return t
 
     # Rules for the  'sheader_effective_date' state
 
@@ -156,15 +237,23 @@ class JournalLexer(LexWrapper):
         return t
 
     # Rules for the 'sentry' state
+    # The lexer is in sENTRY at the start of every line in an entry, and in
+    # sENTRYCONTENT after the account of a posting line has been read.
 
     def t_sENTRY_TEXT(self, t):
-        r"[^\n;]+?(?=\s{2,}|$|;)"
+        r"[^\s;](?:[^\s;]|[ \t](?=[^\s;]))*"
+        # An account ends at two consecutive whitespace characters, a ';' or
+        # the end of the line. Each character is examined once.
         if t.value.startswith('"') and t.value.endswith('"'):
             t.value = t.value[1:-1]
-        t.value = t.value.rstrip()
         self._state_begin("sENTRYCONTENT")
         return t
 
+    def t_sENTRY_COMMENT(self, t):
+        r";[^\n]*"
+        t.value = t.value.lstrip(" ;")
+        return t
+
     # Rules for the 'sENTRYCONTENT' state
 
     def t_sENTRYCONTENT_COMMODITY(self, t):
@@ -176,29 +265,21 @@ class JournalLexer(LexWrapper):
         t.value = t.value.replace(",", "")
         return t
 
-    def t_sENTRY_sENTRYCONTENT_COMMENT(self, t):
+    def t_sENTRYCONTENT_INLINE_COMMENT(self, t):
         r";[^\n]*"
-        # Check if the comment is at the start of a line (considering whitespaces)
-        line_start = t.lexer.lexdata.rfind("\n", 0, t.lexpos) + 1
-        pre_comment = t.lexer.lexdata[line_start : t.lexpos]
-        # Remove the leading characters
         t.value = t.value.lstrip(" ;")
-
-        # If the comment is at the start of a line, it's a standalone comment
-        if pre_comment.isspace() or pre_comment == "":
-            t.type = "COMMENT"
-        else:
-            t.type = "INLINE_COMMENT"
         return t
 
-    def t_sENTRYCONTENT_newline(self, t):
-        r"\n"
-        self._state_begin("sENTRY", t)
-
     def t_sENTRY_sENTRYCONTENT_double_newline(self, t):
         r"\n\n"
+        t.lexer.lineno += 2
         self._state_begin("INITIAL", t)
 
+    def t_sENTRYCONTENT_newline(self, t):
+        r"\n"
+        t.lexer.lineno += 1
+        self._state_begin("sENTRY", t)
+
     # Common rules
 
     def t_ANY_eof(self, t):
@@ -1,19 +1,23 @@
+import re
+from collections import deque
 from .ply import lex
+from .tables import load_tables
+from .diagnostics import Diagnostics
 import sys
 
 
 class LexWrapper(object):
-    state_trail = ["INITIAL"]
+    # Name of a module with pre-generated lexer tables, see tables.py
+    tabmodule = None
+    # Flags the rule regexes are compiled with, verbose like in PLY by default
+    reflags = int(re.VERBOSE)
 
     def _state_begin(self, state: str, t=None):
         """Convenient wrapper for the lexer.begin, which makes it possible to track state changes."""
         self.lexer.begin(state)
-        self.state_trail.append(self.lexer.current_state())
-
-        if len(self.state_trail) > 5:
-            self.state_trail = self.state_trail[-5:]
 
         if self.debug:
+            self.state_trail.append(state)
             d = f"{' ':{self.max_token_name_length+2}}{self.state_trail[-2]} -> {self.state_trail[-1]}"
             if t is not None:
                 d += ', recognized [{}] "{}"'.format(
@@ -21,21 +25,54 @@ class LexWrapper(object):
                 )
             self.debuglog.info(d)
 
-    def __init__(self, debug: bool = False):
-        """Initialize a new JournalLexer"""
-        self.build(debug=debug)
+    def __init__(
+        self,
+        debug: bool = False,
+        diagnostics: Diagnostics | None = None,
+        profile: bool = False,
+    ):
+        """
+        Initialize a new JournalLexer, illegal characters are recorded in diagnostics.
+        With profile, hit counts and timings of every rule are collected in self.profile.
+        """
         self.debug = debug
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        self.state_trail = deque(["INITIAL"], maxlen=5)
+        self.build(debug=debug)
+        self.profile = None
+        if profile:
+            from .profiling import LexProfile
+
+            self.profile = LexProfile()
+            self.profile.install(self.lexer)
         if self.debug:
             self.debuglog = lex.PlyLogger(sys.stderr)
         self.max_token_name_length = max(len(x) + 1 for x in self.tokens)
 
     def build(self, **kwargs):
         """Reinitialize the lexer module (this is called on __init__)"""
-        self.lexer = lex.lex(module=self, **kwargs)
+        lextab = None
+        if self.tabmodule is not None and not self.debug:
+            lextab = load_tables(self.tabmodule, type(self), "t_", "_lexsignature")
+        self.lexer = lex.lex(module=self, lextab=lextab, reflags=self.reflags, **kwargs)
+        # PLY keeps the last lexer built in module globals, for lex.token() and
+        # lex.input(). They aren't used here, and would keep the input alive.
+        lex.lexer = lex.token = lex.input = None
+        if not self.debug:
+            # Without debugging, the parser calls the lexer directly,
+            # instead of going through the token wrapper below.
+            self.token = self.lexer.token
 
-    def input(self, s: str):
-        """Wrapper for the lex input function"""
+    def input(self, s: str, start: int = 0, end: int | None = None, lineno: int = 1):
+        """
+        Wrapper for the lex input function.
+        Only s[start:end] is lexed, without copying it, starting at line lineno.
+        """
         self.lexer.input(s)
+        self.lexer.lexpos = start
+        if end is not None:
+            self.lexer.lexlen = end
+        self.lexer.lineno = lineno
 
     def token(self):
         """Wrapper for the lex token function, can print debug information to stdout if debug is enabled"""
@@ -46,7 +83,7 @@ class LexWrapper(object):
                     tok.type + "]",
                     tok.lineno,
                     tok.lexpos,
-                    tok.value.replace("\n", "\\n"),
+                    str(tok.value).replace("\n", "\\n"),
                     width=self.max_token_name_length,
                 )
             )
@@ -57,29 +94,26 @@ class LexWrapper(object):
         self.input(data)
         _debug = self.debug
         self.debug = True
-        while True:
-            self.lexer.token()
+        if not hasattr(self, "debuglog"):
+            self.debuglog = lex.PlyLogger(sys.stderr)
+        while LexWrapper.token(self) is not None:
+            pass
         self.debug = _debug
 
     def _hl_token(self, t):
-        try:
-            linestart = t.lexer.lexdata.rfind("\n", 0, t.lexpos) + 1
-            lineend = t.lexer.lexdata.find("\n", t.lexpos)
-            markpos = t.lexpos - linestart
-            lineno = t.lexer.lexdata[0 : linestart + 1].count("\n")
-            print(
-                f"Illegal character at '{t.value[0]}' on line {lineno}, position {markpos}"
-            )
-            print(f"    {t.lexer.lexdata[linestart:lineend]}")
-            print(f"    {' ' * markpos}^")
-        except Exception as e:
-            print(f"Illegal character '{p.value}'")
-            print(
-                f"Additionally a error occuren when showing the position of the illegal character\n{e}"
-            )
+        self.diagnostics.add(
+            "lex", f"Illegal character '{t.value[0]}'", t.lexer.lexdata, t.lexpos
+        )
 
     @property
     def lexdata(self):
         if hasattr(self, "lexer"):
             return self.lexer.lexdata
         return None
+
+    @property
+    def lexlen(self):
+        """The end of the input in lexdata, see input"""
+        if hasattr(self, "lexer"):
+            return self.lexer.lexlen
+        return None
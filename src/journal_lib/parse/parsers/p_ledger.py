@@ -2,6 +2,7 @@ from datetime import datetime
 
 from journal_lib.parse.parsewrapper import ParseWrapper
 from journal_lib.parse.lexers.l_ledger import JournalLexer
+from journal_lib.parse.tables import TABMODULE
 from journal_lib.dataclasses import (
     Journal,
     JournalEntry,
@@ -13,33 +14,69 @@ from journal_lib.dataclasses import (
 
 class JournalParser(ParseWrapper):
     tokens = JournalLexer.tokens
+    tabmodule = TABMODULE
+
+    # Rules constructing the dataclasses, timed separately with ParseStats
+    CONSTRUCT_RULES = (
+        "p_journal",
+        "p_element_entry",
+        "p_element_account",
+        "p_element_commodity",
+        "p_transaction_with_amount",
+        "p_transaction_without_amount",
+    )
+
+    # Top level tokens which start a new element, see p_error
+    ELEMENT_START = ("DATE", "KW_ACCOUNT", "KW_COMMODITY")
+
+    def parse(self, input=None, lexer=None, **kwargs):
+        # Elements parsed before a syntax error, see p_error
+        self.recovered = []
+        journal = super().parse(input, lexer=lexer, **kwargs)
+        if journal is None:
+            # The input ended in the middle of an element
+            journal = Journal.from_elements(self.recovered)
+        self.recovered = []
+        return journal
 
     def p_journal(self, p):
-        """journal : elements"""
-        p[0] = Journal.from_elements(p[1])
+        """journal : elements
+                   | empty"""
+        elements = self.recovered
+        if p[1] is not None:
+            elements.extend(p[1])
+        p[0] = Journal.from_elements(elements)
 
         if self.debug:
-            for x in p[1]:
+            for x in elements:
                 print(repr(x))
 
+    # The grammar actions below pass tuples and extend lists in place,
+    # to avoid allocating new containers on every reduction.
+
     def p_elements(self, p):
         """elements : elements element
                     | element"""
         if len(p) == 3:
-            p[0] = p[1] + [p[2]]
+            p[1].append(p[2])
+            p[0] = p[1]
         else:
             p[0] = [p[1]]
 
     def p_element_entry(self, p):
         """element : DATE effective_date status TEXT transactions"""
+        cleared, pending = p[3]
+        transactions, comments = p[5]
         p[0] = JournalEntry(
             date=p[1],
             effective_date=p[2],
-            cleared=p[3]["cleared"],
-            pending=p[3]["pending"],
+            cleared=cleared,
+            pending=pending,
             title=p[4],
-            transactions=p[5]["transactions"],
-            comments=p[5]["comments"],
+            transactions=transactions,
+            comments=comments,
+            lineno=p.lineno(1),
+            column=self._column(p.lexpos(1)),
         )
 
     def p_element_account(self, p):
@@ -58,17 +95,19 @@ class JournalParser(ParseWrapper):
                                 | COMMODITY_DEFAULT commodity_attributes
                                 | empty
         """
-        p[0] = {}
+        if len(p) == 2:
+            p[0] = {}
+            return
+        # The attributes are reduced from the last one, which takes precedence
+        p[0] = p[len(p) - 1]
         if p[1] == "format":
-            p[0]["format"] = p[2]
+            p[0].setdefault("format", p[2])
         elif p[1] == "note":
-            p[0]["note"] = p[2]
+            p[0].setdefault("note", p[2])
         elif p[1] == "nomarket":
             p[0]["nomarket"] = True
         elif p[1] == "default":
             p[0]["default"] = True
-        if len(p) > 3 and p[3]:
-            p[0].update(p[3])
 
     def p_effective_date(self, p):
         """effective_date : ENTRY_EFFECTIVE_DATE_SEPARATOR DATE
@@ -78,11 +117,8 @@ class JournalParser(ParseWrapper):
     def p_status(self, p):
         """status : ENTRY_STATUS
                   | empty"""
-        p[0] = (
-            {"cleared": p[1] == "*", "pending": p[1] == "!"}
-            if p[1]
-            else {"cleared": False, "pending": False}
-        )
+        # (cleared, pending)
+        p[0] = (p[1] == "*", p[1] == "!")
 
     def p_empty(self, p):
         """empty :"""
@@ -90,42 +126,40 @@ class JournalParser(ParseWrapper):
 
     def p_transactions(self, p):
         """transactions : transactions transaction"""
-        p[0] = {
-            "comments": p[1]["comments"],
-            "transactions": p[1]["transactions"] + [p[2]],
-        }
+        p[1][0].append(p[2])
+        p[0] = p[1]
 
     def p_comments(self, p):
         """transactions : transactions COMMENT"""
-        p[0] = {
-            "comments": p[1]["comments"] + [p[2]],
-            "transactions": p[1]["transactions"],
-        }
+        p[1][1].append(p[2])
+        p[0] = p[1]
 
     def p_transactions_single(self, p):
         """transactions : transaction"""
-        p[0] = {"comments": [], "transactions": [p[1]]}
+        # (transactions, comments)
+        p[0] = ([p[1]], [])
 
     def p_transactions_comment_single(self, p):
         """transactions : COMMENT"""
-        p[0] = {"comments": [p[1]], "transactions": []}
+        p[0] = ([], [p[1]])
 
     def p_amount_prefixed(self, p):
         """amount : COMMODITY AMOUNT"""
-        p[0] = {"currency": p[1], "amount": p[2]}
+        # (currency, amount)
+        p[0] = (p[1], p[2])
 
     def p_amount_suffixed(self, p):
         """amount : AMOUNT COMMODITY"""
-        p[0] = {"currency": p[2], "amount": p[1]}
+        p[0] = (p[2], p[1])
 
     def p_transaction_with_amount(self, p):
         """transaction : TEXT amount INLINE_COMMENT
                        | TEXT amount"""
-
+        currency, amount = p[2]
         p[0] = JournalEntryTransaction(
             account=p[1],
-            currency=p[2]["currency"],
-            amount=p[2]["amount"],
+            currency=currency,
+            amount=amount,
             comment=p[3] if len(p) > 3 else None,
         )
 
@@ -139,8 +173,40 @@ class JournalParser(ParseWrapper):
             comment=p[2] if len(p) > 2 else None,
         )
 
+    def _column(self, lexpos: int) -> int:
+        """The column of a position in the input, counted from 0 like in Diagnostic"""
+        return lexpos - self.lexer.lexdata.rfind("\n", 0, lexpos) - 1
+
     def p_error(self, p):
-        if p:
-            self._hl_token(p)
+        """
+        Record the error, keep the elements parsed so far, and restart the parser
+        at the next top level element, so one pass reports every broken element.
+        """
+        data = self.lexer.lexdata
+        # The previous element was cut short, and p starts the next one
+        cut_short = (
+            p is not None
+            and p.type in self.ELEMENT_START
+            and (p.lexpos == 0 or data[p.lexpos - 1] == "\n")
+        )
+        if p is None:
+            self._hl_eof()
+        elif cut_short:
+            self._hl_end(f"Syntax error, incomplete element before '{p.value}'", p.lexpos)
         else:
-            print("Syntax error at EOF")
+            self._hl_token(p)
+
+        for sym, value in self.parser.stack_values()[1:]:
+            if sym.type == "elements":
+                self.recovered.extend(value)
+            elif sym.type == "element":
+                self.recovered.append(value)
+        if p is None:
+            return None
+
+        self.parser.restart()
+        self.parser.errok()
+        if cut_short:
+            return p
+        self.lexer.resync()
+        return self.lexer.token()
@@ -1,28 +1,71 @@
 from .ply import yacc
+from .tables import load_tables
+from .diagnostics import Diagnostics
 
 
 class ParseWrapper(object):
-    def __init__(self, tokens=None, debug: bool = False):
+    # Name of a module with pre-generated parsing tables, see tables.py
+    tabmodule = None
+
+    def __init__(
+        self, tokens=None, debug: bool = False, diagnostics: Diagnostics | None = None
+    ):
+        """Initialize a new parser, syntax errors are recorded in diagnostics"""
         if tokens is not None:
             self.tokens = tokens
         self.debug = debug
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        self.lexer = None
         self.build(debug=debug)
 
     def build(self, **kwargs):
-        self.parser = yacc.yacc(module=self, **kwargs)
+        tabmodule = None
+        if self.tabmodule is not None and not self.debug:
+            tabmodule = load_tables(self.tabmodule, type(self), "p_", "_lrsignature")
+        self.parser = yacc.yacc(module=self, tabmodule=tabmodule, **kwargs)
+        # Like the lexer globals, see LexWrapper.build
+        yacc.parse = None
+
+    def parse(self, input=None, lexer=None, **kwargs):
+        self.lexer = lexer
+        try:
+            return self.parser.parse(input, lexer=lexer, **kwargs)
+        finally:
+            # Drop every reference to the input and the lexer, so the input
+            # can be freed while the parser and the result are kept
+            self.lexer = None
+            self.parser.token = None
+            del self.parser.statestack[:]
+            del self.parser.symstack[:]
+            if self.parser.valstack is not None:
+                del self.parser.valstack[:]
+            self.diagnostics.release_source()
+            if input is not None:
+                lexer.input("")
 
-    def parse(self, *args, **kwargs):
-        return self.parser.parse(*args, **kwargs)
+    def wrap_rules(self, names, wrap):
+        """Replace the function of every production of the rules in names with wrap(function)"""
+        for production in self.parser.productions:
+            if production.func in names:
+                production.callable = wrap(production.callable)
 
     def _hl_token(self, p):
-        try:
-            linestart = p.lexer.lexdata.rfind("\n", 0, p.lexpos) + 1
-            lineend = p.lexer.lexdata.find("\n", p.lexpos)
-            markpos = p.lexpos - linestart
-            marklen = len(str(p.value))
-            lineno = p.lexer.lexdata[0 : linestart + 1].count("\n")
-            print(f"Syntax error at '{p.value}' on line {lineno}, position {markpos}")
-            print(f"    {p.lexer.lexdata[linestart:lineend]}")
-            print(f"    {' ' * markpos}{'^' * marklen}")
-        except Exception as e:
-            print(f"An error occured when showing the position of token {p}\n{e}")
+        self.diagnostics.add(
+            "syntax",
+            f"Syntax error at '{p.value}'",
+            p.lexer.lexdata,
+            p.lexpos,
+            len(str(p.value)),
+        )
+
+    def _hl_end(self, message: str, end: int):
+        """Record an error at the end of the last line before end, where an element was cut short"""
+        data = self.lexer.lexdata
+        while end > 0 and data[end - 1] == "\n":
+            end -= 1
+        self.diagnostics.add("syntax", message, data, end, 0)
+
+    def _hl_eof(self):
+        # The end of the input is lexlen, which is before the end of data when only a chunk
+        # of data is parsed
+        self._hl_end("Syntax error at EOF", self.lexer.lexlen)
@@ -46,6 +46,10 @@ StringTypes = (str, bytes)
 # This regular expression is used to match valid token names
 _is_identifier = re.compile(r'^[a-zA-Z0-9_]+$')
 
+# The master regexes of every table module read by readtab(), compiled
+# the first time the module is read
+_compiled_tables = {}
+
 # Exception thrown when invalid token encountered and no default error
 # handler is defined.
 class LexError(Exception):
@@ -146,6 +150,81 @@ class Lexer:
             c.lexmodule = object
         return c
 
+    # ------------------------------------------------------------
+    # writetab() - Write lexer information to a table module
+    #
+    # The tables are written as Python literals to the open file f,
+    # and can be read back with readtab() once f has been imported.
+    # ------------------------------------------------------------
+    def writetab(self, f):
+        f.write('_lextokens      = set(%s)\n' % repr(tuple(sorted(self.lextokens))))
+        f.write('_lexreflags     = %s\n' % repr(int(self.lexreflags)))
+        f.write('_lexliterals    = %s\n' % repr(self.lexliterals))
+        f.write('_lexstateinfo   = %s\n' % repr(self.lexstateinfo))
+
+        # Rewrite the lexstatere table, replacing function objects with function names
+        tabre = {}
+        for statename, lre in self.lexstatere.items():
+            titem = []
+            for (pat, func), retext, renames in zip(lre, self.lexstateretext[statename], self.lexstaterenames[statename]):
+                titem.append((retext, _funcs_to_names(func, renames), renames))
+            tabre[statename] = titem
+
+        f.write('_lexstatere     = %s\n' % repr(tabre))
+        f.write('_lexstateignore = %s\n' % repr(self.lexstateignore))
+
+        taberr = {}
+        for statename, ef in self.lexstateerrorf.items():
+            taberr[statename] = ef.__name__ if ef else None
+        f.write('_lexstateerrorf = %s\n' % repr(taberr))
+
+        tabeof = {}
+        for statename, ef in self.lexstateeoff.items():
+            tabeof[statename] = ef.__name__ if ef else None
+        f.write('_lexstateeoff   = %s\n' % repr(tabeof))
+
+    # ------------------------------------------------------------
+    # readtab() - Read lexer information from a table module
+    # ------------------------------------------------------------
+    def readtab(self, lextab, fdict):
+        self.lextokens      = lextab._lextokens
+        self.lexreflags     = lextab._lexreflags
+        self.lexliterals    = lextab._lexliterals
+        self.lextokens_all  = self.lextokens | set(self.lexliterals)
+        self.lexstateinfo   = lextab._lexstateinfo
+        self.lexstateignore = lextab._lexstateignore
+        self.lexstatere     = {}
+        self.lexstateretext = {}
+        self.lexstaterenames = {}
+        compiled = _compiled_tables.get(lextab)
+        if compiled is None:
+            compiled = _compiled_tables[lextab] = {
+                statename: [re.compile(pat, lextab._lexreflags) for pat, _, _ in lre]
+                for statename, lre in lextab._lexstatere.items()
+            }
+        for statename, lre in lextab._lexstatere.items():
+            titem = []
+            txtitem = []
+            nameitem = []
+            for cre, (pat, func_name, renames) in zip(compiled[statename], lre):
+                titem.append((cre, _names_to_funcs(func_name, fdict)))
+                txtitem.append(pat)
+                nameitem.append(renames)
+
+            self.lexstatere[statename] = titem
+            self.lexstateretext[statename] = txtitem
+            self.lexstaterenames[statename] = nameitem
+
+        self.lexstateerrorf = {}
+        for statename, ef in lextab._lexstateerrorf.items():
+            self.lexstateerrorf[statename] = fdict[ef] if ef else None
+
+        self.lexstateeoff = {}
+        for statename, ef in lextab._lexstateeoff.items():
+            self.lexstateeoff[statename] = fdict[ef] if ef else None
+
+        self.begin('INITIAL')
+
     # ------------------------------------------------------------
     # input() - Push a new string into the lexer
     # ------------------------------------------------------------
@@ -340,6 +419,36 @@ def get_caller_module_dict(levels):
     f = sys._getframe(levels)
     return { **f.f_globals, **f.f_locals }
 
+# -----------------------------------------------------------------------------
+# _funcs_to_names()
+#
+# Given a list of regular expression functions, this converts it to a list
+# suitable for output to a table file
+# -----------------------------------------------------------------------------
+def _funcs_to_names(funclist, namelist):
+    result = []
+    for f, name in zip(funclist, namelist):
+        if f and f[0]:
+            result.append((name, f[1]))
+        else:
+            result.append(f)
+    return result
+
+# -----------------------------------------------------------------------------
+# _names_to_funcs()
+#
+# Given a list of regular expression function names, this converts it back to
+# functions.
+# -----------------------------------------------------------------------------
+def _names_to_funcs(namelist, fdict):
+    result = []
+    for n in namelist:
+        if n and n[0]:
+            result.append((fdict[n[0]], n[1]))
+        else:
+            result.append(n)
+    return result
+
 # -----------------------------------------------------------------------------
 # _form_master_re()
 #
@@ -715,7 +824,7 @@ class LexerReflect(object):
 # Build all of the regular expression rules from definitions in the supplied module
 # -----------------------------------------------------------------------------
 def lex(*, module=None, object=None, debug=False, 
-        reflags=int(re.VERBOSE), debuglog=None, errorlog=None):
+        reflags=int(re.VERBOSE), debuglog=None, errorlog=None, lextab=None):
 
     global lexer
 
@@ -745,6 +854,15 @@ def lex(*, module=None, object=None, debug=False,
     else:
         ldict = get_caller_module_dict(2)
 
+    # If a table module written by writetab() is given, read the lexer from it
+    # instead of collecting and validating the rules
+    if lextab is not None:
+        lexobj.readtab(lextab, ldict)
+        token = lexobj.token
+        input = lexobj.input
+        lexer = lexobj
+        return lexobj
+
     # Collect parser information from the dictionary
     linfo = LexerReflect(ldict, log=errorlog, reflags=reflags)
     linfo.get_all()
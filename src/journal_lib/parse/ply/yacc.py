@@ -154,6 +154,8 @@ def format_stack_entry(r):
 #        .endlexpos  = Ending lex position (optional, set automatically)
 
 class YaccSymbol:
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'endlineno', 'endlexpos', 'lexer')
+
     def __str__(self):
         return self.type
 
@@ -218,6 +220,86 @@ class YaccProduction:
     def error(self):
         raise SyntaxError
 
+# The production object passed to grammar rules by parseopt_notrack().
+# Instead of a slice copied off the symbol stack, it reads the values of
+# the right hand side straight from the value stack, where the symbols of
+# the production start at index base + 1.  p[0] is kept in result until
+# the parser pushes it.  The symbols of nonterminals on the stack are shared,
+# so setting a position gives the symbol its own copy first, and a result
+# with a position set is pushed as its own symbol instead of the shared one.
+
+class YaccStackProduction(YaccProduction):
+    def __init__(self, symstack, valstack, nonterminals):
+        super().__init__(None, symstack)
+        self.values = valstack
+        self.nonterminals = nonterminals
+        self.base = 0
+        self.length = 0
+        self.result = None
+        self.symbol = None          # Symbol of the result, when a position is set
+
+    def __getitem__(self, n):
+        if isinstance(n, slice):
+            return [self[i] for i in range(self.length + 1)[n]]
+        if n == 0:
+            return self.result
+        if n > 0:
+            if n > self.length:
+                raise IndexError('production index out of range')
+            return self.values[self.base + n]
+        return self.values[self.base + 1 + n]
+
+    def __setitem__(self, n, v):
+        if n == 0:
+            self.result = v
+        else:
+            self.values[self.base + n] = v
+
+    def __len__(self):
+        return self.length + 1
+
+    def _symbol(self, n):
+        if n == 0:
+            return self.symbol
+        if n > self.length:
+            raise IndexError('production index out of range')
+        return self.stack[self.base + n]
+
+    def _own_symbol(self, n):
+        # The symbol of p[n], which can be given a position
+        if n == 0:
+            if self.symbol is None:
+                self.symbol = YaccSymbol()
+            return self.symbol
+        sym = self._symbol(n)
+        if self.nonterminals.get(sym.type) is sym:
+            copy = YaccSymbol()
+            copy.type = sym.type
+            sym = self.stack[self.base + n] = copy
+        return sym
+
+    def lineno(self, n):
+        return getattr(self._symbol(n), 'lineno', 0)
+
+    def set_lineno(self, n, lineno):
+        self._own_symbol(n).lineno = lineno
+
+    def linespan(self, n):
+        startline = getattr(self._symbol(n), 'lineno', 0)
+        endline = getattr(self._symbol(n), 'endlineno', startline)
+        return startline, endline
+
+    def lexpos(self, n):
+        return getattr(self._symbol(n), 'lexpos', 0)
+
+    def set_lexpos(self, n, lexpos):
+        self._own_symbol(n).lexpos = lexpos
+
+    def lexspan(self, n):
+        startpos = getattr(self._symbol(n), 'lexpos', 0)
+        endpos = getattr(self._symbol(n), 'endlexpos', startpos)
+        return startpos, endpos
+
 # -----------------------------------------------------------------------------
 #                               == LRParser ==
 #
@@ -232,6 +314,16 @@ class LRParser:
         self.errorfunc = errorf
         self.set_defaulted_states()
         self.errorok = True
+        self.symstack = []
+        self.statestack = []
+        self.valstack = None        # Values of the symbols, only used by parseopt_notrack()
+        # One symbol per nonterminal, shared by every reduction in parseopt_notrack()
+        self.nonterminals = {}
+        for p in self.productions:
+            if p.name not in self.nonterminals:
+                sym = YaccSymbol()
+                sym.type = p.name
+                self.nonterminals[p.name] = sym
 
     def errok(self):
         self.errorok = True
@@ -243,6 +335,15 @@ class LRParser:
         sym.type = '$end'
         self.symstack.append(sym)
         self.statestack.append(0)
+        if self.valstack is not None:
+            del self.valstack[:]
+            self.valstack.append(None)
+
+    # The (symbol, value) pairs on the symbol stack, bottom first, for error handlers
+    def stack_values(self):
+        if self.valstack is not None:
+            return list(zip(self.symstack, self.valstack))
+        return [(sym, getattr(sym, 'value', None)) for sym in self.symstack]
 
     # Defaulted state support.
     # This method identifies parser states where there is only one possible reduction action.
@@ -262,6 +363,16 @@ class LRParser:
     def disable_defaulted_states(self):
         self.defaulted_states = {}
 
+    # Write the parsing tables as Python literals to the open file f.
+    # They can be read back with LRTable.read_table() once f has been imported.
+    def write_table(self, f):
+        f.write('_lr_action = %s\n' % repr(self.action))
+        f.write('_lr_goto = %s\n' % repr(self.goto))
+        f.write('_lr_productions = [\n')
+        for p in self.productions:
+            f.write('  (%r, %r, %d, %r),\n' % (p.str, p.name, p.len, p.func))
+        f.write(']\n')
+
     # parse().
     #
     # This is the core parsing engine.  To operate, it requires a lexer object.
@@ -271,6 +382,10 @@ class LRParser:
     # character index.
 
     def parse(self, input=None, lexer=None, debug=False, tracking=False):
+        # Without debugging or tracking, use the specialized parsing engine
+        if not debug and not tracking:
+            return self.parseopt_notrack(input, lexer)
+
         # If debugging has been specified as a flag, turn it into a logging object
         if isinstance(debug, int) and debug:
             debug = PlyLogger(sys.stderr)
@@ -306,6 +421,7 @@ class LRParser:
         # Set up the state and symbol stacks
         statestack = self.statestack = []   # Stack of parsing states
         symstack = self.symstack = []       # Stack of grammar symbols
+        self.valstack = None
         pslice.stack = symstack             # Put in the production
         errtoken   = None                   # Err token
 
@@ -504,9 +620,11 @@ class LRParser:
                         if self.errorok:
                             # User must have done some kind of panic
                             # mode recovery on their own.  The
-                            # returned token is the next lookahead
+                            # returned token is the next lookahead.
+                            # The stacks may have been reset with restart().
                             lookahead = tok
                             errtoken = None
+                            state = statestack[-1]
                             continue
                     else:
                         if errtoken:
@@ -580,6 +698,231 @@ class LRParser:
             # If we'r here, something really bad happened
             raise RuntimeError('yacc: internal parser error!!!\n')
 
+    # parseopt_notrack().
+    #
+    # The parsing engine used when neither debug nor tracking is requested.
+    # This is the same algorithm as parse(), with the debugging and position
+    # tracking code removed, and frequently used names bound to locals.
+    # The values of the symbols are kept on a separate value stack, so a
+    # reduction pushes one shared symbol per nonterminal, and grammar rules
+    # read their arguments from the stack, see YaccStackProduction.
+    # Make sure changes to parse() are made here as well.
+
+    def parseopt_notrack(self, input=None, lexer=None):
+        lookahead = None                         # Current lookahead symbol
+        lookaheadstack = []                      # Stack of lookahead symbols
+        actions = self.action                    # Local reference to action table (to avoid lookup on self.)
+        goto    = self.goto                      # Local reference to goto table (to avoid lookup on self.)
+        prod    = self.productions               # Local reference to production list (to avoid lookup on self.)
+        defaulted_states = self.defaulted_states # Local reference to defaulted states
+        nonterminals = self.nonterminals         # Shared symbols of the nonterminals
+        errorcount = 0                           # Used during error recovery
+        Symbol = YaccSymbol
+
+        # If no lexer was given, we will try to use the lex module
+        if not lexer:
+            from . import lex
+            lexer = lex.lexer
+
+        # If input was supplied, pass to lexer
+        if input is not None:
+            lexer.input(input)
+
+        # Set the token function
+        get_token = self.token = lexer.token
+
+        # Set up the state and symbol stacks
+        statestack = self.statestack = []   # Stack of parsing states
+        symstack = self.symstack = []       # Stack of grammar symbols
+        valstack = self.valstack = []       # Values of the grammar symbols
+        errtoken   = None                   # Err token
+        push_state = statestack.append
+        push_sym = symstack.append
+        push_val = valstack.append
+
+        # Production object passed to grammar rules, reading from the stacks
+        pslice = YaccStackProduction(symstack, valstack, nonterminals)
+        pslice.lexer = lexer
+        pslice.parser = self
+
+        # The start state is assumed to be (0,$end)
+
+        push_state(0)
+        sym = Symbol()
+        sym.type = '$end'
+        push_sym(sym)
+        push_val(None)
+        state = 0
+        while True:
+            if state not in defaulted_states:
+                if not lookahead:
+                    if not lookaheadstack:
+                        lookahead = get_token()     # Get the next token
+                    else:
+                        lookahead = lookaheadstack.pop()
+                    if not lookahead:
+                        lookahead = Symbol()
+                        lookahead.type = '$end'
+
+                # Check the action table
+                t = actions[state].get(lookahead.type)
+            else:
+                t = defaulted_states[state]
+
+            if t is not None:
+                if t > 0:
+                    # shift a symbol on the stack
+                    push_state(t)
+                    state = t
+                    push_sym(lookahead)
+                    push_val(lookahead.value)
+                    lookahead = None
+
+                    # Decrease error count on successful shift
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    # reduce a symbol on the stack, emit a production.
+                    # The grammar rule reads the right hand side from the
+                    # top of the value stack, which is popped afterwards.
+                    p = prod[-t]
+                    pname = p.name
+                    plen  = p.len
+                    pslice.base = len(valstack) - plen - 1
+                    pslice.length = plen
+                    pslice.result = None
+
+                    try:
+                        # Call the grammar rule with our special slice object
+                        self.state = state
+                        p.callable(pslice)
+                    except SyntaxError:
+                        # If an error was set. Enter error recovery state
+                        lookaheadstack.append(lookahead)    # Save the current lookahead token
+                        if plen:
+                            symstack.pop()                  # Drop the last symbol of the production
+                            valstack.pop()
+                        statestack.pop()                    # Pop back one state (before the reduce)
+                        state = statestack[-1]
+                        sym = Symbol()
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        self.errorok = False
+                        pslice.symbol = None
+                        continue
+
+                    if plen:
+                        del symstack[-plen:]
+                        del valstack[-plen:]
+                        del statestack[-plen:]
+                    sym = pslice.symbol
+                    if sym is None:
+                        push_sym(nonterminals[pname])
+                    else:
+                        # The rule set a position of the result
+                        sym.type = pname
+                        push_sym(sym)
+                        pslice.symbol = None
+                    push_val(pslice.result)
+                    state = goto[statestack[-1]][pname]
+                    push_state(state)
+                    continue
+
+                if t == 0:
+                    return valstack[-1]
+
+            if t is None:
+
+                # We have some kind of parsing error here.  See parse() for
+                # a description of the error recovery.
+                if errorcount == 0 or self.errorok:
+                    errorcount = error_count
+                    self.errorok = False
+                    errtoken = lookahead
+                    if errtoken.type == '$end':
+                        errtoken = None               # End of file!
+                    if self.errorfunc:
+                        if errtoken and not hasattr(errtoken, 'lexer'):
+                            errtoken.lexer = lexer
+                        self.state = state
+                        tok = self.errorfunc(errtoken)
+                        if self.errorok:
+                            # User must have done some kind of panic
+                            # mode recovery on their own.  The
+                            # returned token is the next lookahead.
+                            # The stacks may have been reset with restart().
+                            lookahead = tok
+                            errtoken = None
+                            state = statestack[-1]
+                            continue
+                    else:
+                        if errtoken:
+                            if hasattr(errtoken, 'lineno'):
+                                lineno = lookahead.lineno
+                            else:
+                                lineno = 0
+                            if lineno:
+                                sys.stderr.write('yacc: Syntax error at line %d, token=%s\n' % (lineno, errtoken.type))
+                            else:
+                                sys.stderr.write('yacc: Syntax error, token=%s' % errtoken.type)
+                        else:
+                            sys.stderr.write('yacc: Parse error in input. EOF\n')
+                            return
+
+                else:
+                    errorcount = error_count
+
+                # case 1:  the statestack only has 1 entry on it.  The token is
+                # discarded and we just keep going.
+
+                if len(statestack) <= 1 and lookahead.type != '$end':
+                    lookahead = None
+                    errtoken = None
+                    state = 0
+                    # Nuke the pushback stack
+                    del lookaheadstack[:]
+                    continue
+
+                # case 2: the statestack has a couple of entries on it, but we're
+                # at the end of the file. Bail out
+
+                if lookahead.type == '$end':
+                    return
+
+                if lookahead.type != 'error':
+                    sym = symstack[-1]
+                    if sym.type == 'error':
+                        # Error is on top of stack, we'll just nuke input
+                        # symbol and continue
+                        lookahead = None
+                        continue
+
+                    # Create the error symbol for the first time and make it the new lookahead symbol
+                    t = Symbol()
+                    t.type = 'error'
+
+                    if hasattr(lookahead, 'lineno'):
+                        t.lineno = t.endlineno = lookahead.lineno
+                    if hasattr(lookahead, 'lexpos'):
+                        t.lexpos = t.endlexpos = lookahead.lexpos
+                    t.value = lookahead
+                    lookaheadstack.append(lookahead)
+                    lookahead = t
+                else:
+                    symstack.pop()
+                    valstack.pop()
+                    statestack.pop()
+                    state = statestack[-1]
+
+                continue
+
+            # If we'r here, something really bad happened
+            raise RuntimeError('yacc: internal parser error!!!\n')
+
 # -----------------------------------------------------------------------------
 #                          === Grammar Representation ===
 #
@@ -682,6 +1025,32 @@ class Production(object):
         if self.func:
             self.callable = pdict[self.func]
 
+# -----------------------------------------------------------------------------
+# class MiniProduction
+#
+# A production read from a table module.  It only holds the information
+# needed by the parsing engine.
+# -----------------------------------------------------------------------------
+
+class MiniProduction(object):
+    def __init__(self, str, name, len, func):
+        self.name     = name
+        self.len      = len
+        self.func     = func
+        self.callable = None
+        self.str      = str
+
+    def __str__(self):
+        return self.str
+
+    def __repr__(self):
+        return f'MiniProduction({self.str})'
+
+    # Bind the production function name to a callable
+    def bind(self, pdict):
+        if self.func:
+            self.callable = pdict[self.func]
+
 # -----------------------------------------------------------------------------
 # class LRItem
 #
@@ -1340,6 +1709,16 @@ class LRTable:
         self.grammar.compute_follow()
         self.lr_parse_table()
 
+    # Read the tables from a module written by LRParser.write_table().
+    # The grammar is not available on the returned table.
+    @classmethod
+    def read_table(cls, module):
+        lr = cls.__new__(cls)
+        lr.lr_action = module._lr_action
+        lr.lr_goto = module._lr_goto
+        lr.lr_productions = [MiniProduction(*p) for p in module._lr_productions]
+        return lr
+
     # Bind all production function names to callable objects in pdict
     def bind_callables(self, pdict):
         for p in self.lr_productions:
@@ -2270,7 +2649,7 @@ class ParserReflect(object):
 
 def yacc(*, debug=yaccdebug, module=None, start=None,
          check_recursion=True, optimize=False, debugfile=debug_file,
-         debuglog=None, errorlog=None):
+         debuglog=None, errorlog=None, tabmodule=None):
 
     # Reference to the parsing method of the last built parser
     global parse
@@ -2292,6 +2671,15 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
     else:
         pdict = get_caller_module_dict(2)
 
+    # If a table module written by LRParser.write_table() is given, read the
+    # parsing tables from it instead of collecting and validating the grammar
+    if tabmodule is not None:
+        lr = LRTable.read_table(tabmodule)
+        lr.bind_callables(pdict)
+        parser = LRParser(lr, pdict.get('p_error'))
+        parse = parser.parse
+        return parser
+
     # Set start symbol if it's specified directly using an argument
     if start is not None:
         pdict['start'] = start
@@ -1,17 +1,21 @@
 import re
 from pathlib import Path
+from typing import Iterator
 
+INCLUDE_RE = re.compile(r"^\s*include\s+([^\n]+)\s*$", re.IGNORECASE)
 
-def preprocess_includes(filepath: Path):
+
+def preprocess_includes(filepath: Path, stats=None):
     """
     Reads the file at 'filepath', processing any "include" directives,
     and returns a single string containing the preprocessed file content.
+    The files read are counted in stats, if given.
 
     This does not report circular includes, so that would become a infinite loop
     """
-    INCLUDE_RE = re.compile(r"^\s*include\s+([^\n]+)\s*$", re.IGNORECASE)
-
     def read_file(file_path):
+        if stats is not None:
+            stats.files += 1
         with open(file_path, "r") as file:
             return file.readlines()
 
@@ -27,3 +31,20 @@ def preprocess_includes(filepath: Path):
             i += 1
 
     return "".join(lines)
+
+
+def iter_lines_with_includes(filepath: Path, stats=None) -> Iterator[str]:
+    """
+    Yield the lines of the file at 'filepath', with the lines of the included
+    files in place of the "include" directives, like preprocess_includes.
+    The files are read as the lines are consumed, so they are never held in memory.
+    """
+    if stats is not None:
+        stats.files += 1
+    with open(filepath, "r") as file:
+        for line in file:
+            match = INCLUDE_RE.match(line)
+            if match:
+                yield from iter_lines_with_includes(match.group(1), stats)
+            else:
+                yield line
@@ -0,0 +1,172 @@
+"""
+Hit counts and timings of the rules of a lexer, per lexer state.
+
+Every master regular expression of every state is replaced with a proxy
+counting the match attempts, the failed ones and the time spent matching,
+and every rule function is wrapped to count its calls and the time spent in
+it. Rules are also counted when they match, which includes rules without a
+function.
+
+Enable it with LexWrapper(profile=True), or run
+
+    python -m journal_lib.parse.profiling FILE [--sort hits] [--json]
+"""
+import json
+import time
+from dataclasses import dataclass, asdict
+
+SORT_KEYS = ("time", "hits", "name")
+
+
+@dataclass
+class RuleProfile:
+    state: str
+    rule: str
+    hits: int = 0  # Matches of the rule regex
+    calls: int = 0  # Calls of the rule function
+    time: float = 0.0  # Seconds spent in the rule function
+
+
+@dataclass
+class RegexProfile:
+    state: str
+    regex: int  # Index of the master regex in the state, PLY splits large ones
+    attempts: int = 0
+    failures: int = 0
+    time: float = 0.0  # Seconds spent matching
+
+
+class _ProfiledRegex:
+    """Stands in for a compiled master regex in the lexer tables"""
+
+    def __init__(self, regex, profile: RegexProfile, rules: list):
+        self.regex = regex
+        self.profile = profile
+        self.rules = rules  # RuleProfile by group index
+
+    def match(self, data: str, pos: int):
+        start = time.perf_counter()
+        m = self.regex.match(data, pos)
+        profile = self.profile
+        profile.time += time.perf_counter() - start
+        profile.attempts += 1
+        if m is None:
+            profile.failures += 1
+        elif (rule := self.rules[m.lastindex]) is not None:
+            rule.hits += 1
+        return m
+
+
+def _profiled_func(func, profile: RuleProfile):
+    perf_counter = time.perf_counter
+
+    def profiled(t):
+        start = perf_counter()
+        try:
+            return func(t)
+        finally:
+            profile.time += perf_counter() - start
+            profile.calls += 1
+
+    return profiled
+
+
+class LexProfile:
+    """Collects the rule and regex profiles of a PLY lexer, see install"""
+
+    def __init__(self):
+        self.rules: dict[tuple[str, str], RuleProfile] = {}
+        self.regexes: list[RegexProfile] = []
+
+    def _rule(self, state: str, name: str) -> RuleProfile:
+        if (profile := self.rules.get((state, name))) is None:
+            profile = self.rules[(state, name)] = RuleProfile(state, name)
+        return profile
+
+    def install(self, lexer):
+        """Replace the tables of the PLY lexer with profiled ones"""
+        for state, lexre in lexer.lexstatere.items():
+            profiled = []
+            for i, (regex, indexfunc) in enumerate(lexre):
+                names = lexer.lexstaterenames[state][i]
+                rules = [None if name is None else self._rule(state, name) for name in names]
+                new_indexfunc = []
+                for entry, rule in zip(indexfunc, rules):
+                    if entry is not None and entry[0] is not None:
+                        entry = (_profiled_func(entry[0], rule), entry[1])
+                    new_indexfunc.append(entry)
+                regex_profile = RegexProfile(state, i)
+                self.regexes.append(regex_profile)
+                profiled.append((_ProfiledRegex(regex, regex_profile, rules), new_indexfunc))
+            lexer.lexstatere[state] = profiled
+        for table in (lexer.lexstateerrorf, lexer.lexstateeoff):
+            for state, func in table.items():
+                if func is not None:
+                    rule = self._rule(state, func.__name__)
+                    table[state] = _profiled_func(func, rule)
+        # Reload the tables of the current state
+        lexer.begin(lexer.lexstate)
+
+    def reset(self):
+        """Zero all the counters"""
+        for rule in self.rules.values():
+            rule.hits = rule.calls = 0
+            rule.time = 0.0
+        for regex in self.regexes:
+            regex.attempts = regex.failures = 0
+            regex.time = 0.0
+
+    def sorted_rules(self, sort: str = "time") -> list[RuleProfile]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort!r}, expected one of {SORT_KEYS}")
+        rules = list(self.rules.values())
+        if sort == "name":
+            return sorted(rules, key=lambda r: (r.state, r.rule))
+        return sorted(rules, key=lambda r: getattr(r, sort), reverse=True)
+
+    def to_dict(self, sort: str = "time") -> dict:
+        return {
+            "rules": [asdict(r) for r in self.sorted_rules(sort)],
+            "regexes": [asdict(r) for r in self.regexes],
+        }
+
+    def to_json(self, sort: str = "time") -> str:
+        return json.dumps(self.to_dict(sort), indent=2)
+
+    def table(self, sort: str = "time") -> str:
+        """Format the profiles as a text table, with the rules sorted by sort"""
+        lines = [f"{'state':<16}{'rule':<40}{'hits':>10}{'calls':>10}{'time ms':>10}"]
+        for r in self.sorted_rules(sort):
+            lines.append(
+                f"{r.state:<16}{r.rule:<40}{r.hits:>10}{r.calls:>10}{r.time * 1000:>10.2f}"
+            )
+        lines.append("")
+        lines.append(f"{'state':<16}{'regex':<40}{'attempts':>10}{'failures':>10}{'time ms':>10}")
+        for r in self.regexes:
+            lines.append(
+                f"{r.state:<16}{r.regex:<40}{r.attempts:>10}{r.failures:>10}{r.time * 1000:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+def main():
+    from argparse import ArgumentParser
+    from pathlib import Path
+    from journal_lib.parse.lexers.l_ledger import JournalLexer
+    from journal_lib.parse.preprocessing import preprocess_includes
+
+    parser = ArgumentParser(description="Profile the lexer rules on a journal file")
+    parser.add_argument("file", help="The journal file to read")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="time")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    lexer = JournalLexer(profile=True)
+    lexer.input(preprocess_includes(Path(args.file)))
+    while lexer.token() is not None:
+        pass
+    print(lexer.profile.to_json(args.sort) if args.json else lexer.profile.table(args.sort))
+
+
+if __name__ == "__main__":
+    main()
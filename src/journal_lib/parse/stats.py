@@ -0,0 +1,123 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+
+PHASES = ("preprocess", "lexer_build", "parser_build", "tokenize", "reduce", "construct")
+COUNTS = ("files", "bytes", "lines", "tokens", "entries", "postings", "errors")
+
+
+@dataclass
+class PhaseTime:
+    """Wall clock and CPU time spent in a phase, in seconds"""
+
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+@dataclass
+class ParseStats:
+    """
+    Timings and counts collected while reading a journal, enabled by passing an
+    instance to journal_from_str or journal_from_file. Reading several journals
+    with the same instance adds up the numbers.
+
+    The reduce phase is the time spent in the parser, apart from tokenizing and
+    constructing the dataclasses. callback is called with the stats after every
+    journal read, to forward them elsewhere.
+    """
+
+    callback: Callable[["ParseStats"], None] | None = field(
+        default=None, repr=False, compare=False
+    )
+    preprocess: PhaseTime = field(default_factory=PhaseTime)
+    lexer_build: PhaseTime = field(default_factory=PhaseTime)
+    parser_build: PhaseTime = field(default_factory=PhaseTime)
+    tokenize: PhaseTime = field(default_factory=PhaseTime)
+    reduce: PhaseTime = field(default_factory=PhaseTime)
+    construct: PhaseTime = field(default_factory=PhaseTime)
+    files: int = 0
+    bytes: int = 0
+    lines: int = 0
+    tokens: int = 0
+    entries: int = 0
+    postings: int = 0
+    errors: int = 0
+
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the with block to the phase name"""
+        t = getattr(self, name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            t.wall += time.perf_counter() - wall
+            t.cpu += time.process_time() - cpu
+
+    @contextmanager
+    def parsing(self):
+        """Time a parse, the time spent in tokenize and construct is subtracted from reduce"""
+        nested = (self.tokenize, self.construct)
+        wall = sum(t.wall for t in nested)
+        cpu = sum(t.cpu for t in nested)
+        with self.phase("reduce"):
+            yield
+        self.reduce.wall -= sum(t.wall for t in nested) - wall
+        self.reduce.cpu -= sum(t.cpu for t in nested) - cpu
+
+    def timed(self, name: str, func):
+        """Wrap func, adding the time spent in it to the phase name"""
+        t = getattr(self, name)
+        perf_counter, process_time = time.perf_counter, time.process_time
+
+        def timed_func(*args):
+            wall, cpu = perf_counter(), process_time()
+            try:
+                return func(*args)
+            finally:
+                t.wall += perf_counter() - wall
+                t.cpu += process_time() - cpu
+
+        return timed_func
+
+    def timed_tokens(self, token):
+        """Wrap a lexer token function, timing it and counting the tokens"""
+        timed_token = self.timed("tokenize", token)
+
+        def counted_token():
+            tok = timed_token()
+            if tok is not None:
+                self.tokens += 1
+            return tok
+
+        return counted_token
+
+    def count_input(self, data: str):
+        """Count the size of an input string"""
+        self.bytes += len(data.encode("utf-8"))
+        self.lines += data.count("\n") + (not data.endswith("\n") and data != "")
+
+    def count_journal(self, journal):
+        """Count the entries and postings of a parsed journal"""
+        self.entries += len(journal.entries)
+        self.postings += sum(len(entry.transactions) for entry in journal.entries)
+
+    def to_dict(self) -> dict:
+        """The stats as a flat dictionary, like {"tokenize_wall": 0.1, "tokens": 10, ...}"""
+        d = {}
+        for name in PHASES:
+            t = getattr(self, name)
+            d[f"{name}_wall"] = t.wall
+            d[f"{name}_cpu"] = t.cpu
+        for name in COUNTS:
+            d[name] = getattr(self, name)
+        return d
+
+    def __str__(self):
+        lines = [f"{'phase':<14}{'wall ms':>10}{'cpu ms':>10}"]
+        for name in PHASES:
+            t = getattr(self, name)
+            lines.append(f"{name:<14}{t.wall * 1000:>10.2f}{t.cpu * 1000:>10.2f}")
+        lines.append(", ".join(f"{name}: {getattr(self, name)}" for name in COUNTS))
+        return "\n".join(lines)
@@ -0,0 +1,35 @@
+"""Generates ledgertab.py, see tables.py"""
+from pathlib import Path
+
+from journal_lib.parse.tables import signature
+
+
+def write_tables(filename: Path | None = None):
+    """Build JournalLexer and JournalParser by reflection, and write their tables to filename"""
+    from journal_lib.parse.lexers.l_ledger import JournalLexer
+    from journal_lib.parse.parsers.p_ledger import JournalParser
+
+    class ReflectedLexer(JournalLexer):
+        tabmodule = None
+
+    class ReflectedParser(JournalParser):
+        tabmodule = None
+
+    if filename is None:
+        filename = Path(__file__).parent / "ledgertab.py"
+
+    lexer = ReflectedLexer()
+    parser = ReflectedParser()
+    with open(filename, "w") as f:
+        f.write("# This file is automatically generated by journal_lib.parse.tabgen.\n")
+        f.write("# Do not edit, regenerate it with `python -m journal_lib.parse.tabgen`.\n")
+        f.write("# fmt: off\n\n")
+        f.write(f"_lexsignature = {signature(JournalLexer, 't_')!r}\n")
+        lexer.lexer.writetab(f)
+        f.write("\n")
+        f.write(f"_lrsignature = {signature(JournalParser, 'p_')!r}\n")
+        parser.parser.write_table(f)
+
+
+if __name__ == "__main__":
+    write_tables()
@@ -0,0 +1,54 @@
+"""
+Ahead-of-time generated lexer and parser tables.
+
+The master regular expressions of every lexer state, the rule index mappings
+and the LALR tables for JournalLexer and JournalParser are written as literals
+to ledgertab.py, which is shipped with the package. The wrappers import that
+module instead of reflecting on the classes and building the tables when they
+are created.
+
+Regenerate the tables after changing the lexer or the grammar with
+
+    python -m journal_lib.parse.tabgen
+
+If the tables are stale, the signatures stored with them won't match, and the
+lexer and parser are built by reflection as before. tests/test_tables.py
+checks that the shipped tables are up to date.
+"""
+import importlib
+import zlib
+from functools import lru_cache
+
+TABMODULE = "journal_lib.parse.ledgertab"
+
+# Class attributes, besides the rules, which change the generated tables
+SPEC_ATTRIBUTES = ("tokens", "states", "literals", "precedence", "start", "reflags")
+
+
+@lru_cache(maxsize=None)
+def signature(cls, prefix: str) -> str:
+    """
+    Compute a signature of the rules starting with prefix (t_ for a lexer, p_ for a parser)
+    of cls, from their regexes or grammar docstrings in the order they are defined, which is
+    the order PLY sees them in. Line numbers are left out, so the tables don't go stale when
+    code around the rules moves. Cached per class.
+    """
+    rules = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith(prefix):
+                rules[name] = getattr(value, "regex", value.__doc__) if callable(value) else value
+    spec = [(name, getattr(cls, name)) for name in SPEC_ATTRIBUTES if hasattr(cls, name)]
+    data = repr((spec, list(rules.items())))
+    return f"{zlib.crc32(data.encode()):08x}"
+
+
+def load_tables(name: str, cls, prefix: str, key: str):
+    """Import the table module name, if it exists and matches the signature of cls"""
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        return None
+    if getattr(module, key, None) != signature(cls, prefix):
+        return None
+    return module
@@ -0,0 +1,40 @@
+import importlib
+
+# The reports built on PostingColumns import NumPy when it is installed, so
+# every report module is only imported when one of its names is first used.
+_lazy_attributes = {
+    "PERIODS": ".balances",
+    "BalanceMatrix": ".balances",
+    "balance_matrix": ".balances",
+    "period_label": ".balances",
+    "period_number": ".balances",
+    "Aggregate": ".aggregates",
+    "aggregate": ".aggregates",
+    "rolling": ".aggregates",
+    "BalanceRow": ".query",
+    "JournalIndex": ".query",
+    "Query": ".query",
+    "QueryError": ".query",
+    "compile_query": ".query",
+    "run_query": ".query",
+    "RegisterRow": ".register",
+    "format_register_row": ".register",
+    "iter_register": ".register",
+    "statement_path": ".register",
+    "write_register": ".register",
+    "write_statements": ".register",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name: str):
+    if (module := _lazy_attributes.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
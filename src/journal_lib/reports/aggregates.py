@@ -0,0 +1,241 @@
+"""
+Aggregates of postings by calendar period or rolling window.
+
+aggregate groups the postings of a journal by period, see balances.PERIODS,
+and rolling groups them by windows of a number of days ending on every day.
+Within a period or window, postings are grouped by account, truncated to a
+depth if given, and by commodity. Every group has the total, the number of
+postings, the smallest and largest amount, and the top largest postings.
+
+Both make a single pass over the postings sorted by date. A rolling window
+is slid a day at a time, adding the postings entering it and removing the
+ones leaving it, so each posting is only visited twice.
+"""
+import datetime
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass, field, replace
+from decimal import Decimal
+
+from journal_lib.columns import PostingColumns, _ordinal, np
+from journal_lib.dataclasses import Journal
+from .balances import PERIODS, period_label, period_number
+
+
+@dataclass
+class Aggregate:
+    total: Decimal
+    count: int
+    min: Decimal
+    max: Decimal
+    # The largest postings as (date, entry index, account, amount), largest first
+    largest: list[tuple[str, int, str, Decimal]] = field(default_factory=list)
+
+
+def _decimal(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def _groups(columns: PostingColumns, accounts: str | None, depth: int | None) -> list[str | None]:
+    """The group of every account, or None if it doesn't match the pattern accounts"""
+    pattern = re.compile(accounts) if accounts is not None else None
+    groups = []
+    for name in columns.accounts:
+        if pattern is not None and pattern.search(name) is None:
+            groups.append(None)
+        else:
+            groups.append(":".join(name.split(":")[:depth]) if depth is not None else name)
+    return groups
+
+
+def _sorted_rows(columns: PostingColumns, groups: list[str | None], low: int | None, high: int | None) -> list[int]:
+    """The rows of the postings in a group and dated from low up to high, sorted by date"""
+    if np is not None:
+        dates = columns.numpy("date")
+        mask = np.asarray([group is not None for group in groups], dtype=bool)[columns.numpy("account")]
+        if low is not None:
+            mask &= dates >= low
+        if high is not None:
+            mask &= dates < high
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(dates[rows], kind="stable")].tolist()
+    dates = columns.date
+    rows = [
+        row
+        for row, (day, account) in enumerate(zip(dates, columns.account))
+        if groups[account] is not None and (low is None or day >= low) and (high is None or day < high)
+    ]
+    rows.sort(key=dates.__getitem__)
+    return rows
+
+
+class _Labels:
+    """Dates and postings formatted once, as a posting is in the windows of many days"""
+
+    def __init__(self, columns: PostingColumns):
+        self.columns = columns
+        self.dates = {}
+        self.postings = {}
+
+    def date(self, ordinal: int) -> str:
+        if (label := self.dates.get(ordinal)) is None:
+            label = self.dates[ordinal] = datetime.date.fromordinal(ordinal).isoformat()
+        return label
+
+    def posting(self, row: int) -> tuple[str, int, str, Decimal]:
+        if (posting := self.postings.get(row)) is None:
+            c = self.columns
+            posting = self.postings[row] = (
+                self.date(c.date[row]),
+                c.entry[row],
+                c.accounts[c.account[row]],
+                _decimal(c.amount[row]),
+            )
+        return posting
+
+    def largest(self, rows) -> list[tuple[str, int, str, Decimal]]:
+        return [self.posting(row) for _, row in rows]
+
+
+def aggregate(
+    journal: Journal | PostingColumns,
+    period: str = "month",
+    accounts: str | None = None,
+    depth: int | None = None,
+    top: int = 0,
+    start: str | datetime.date | None = None,
+    end: str | datetime.date | None = None,
+) -> dict[tuple[str, str, str | None], Aggregate]:
+    """
+    Aggregate the postings of journal by period, account and commodity, keyed by
+    (period, account, commodity) in order of period. Only accounts matching the regex
+    accounts and postings from start up to, but not including, end are counted.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period {period!r}, expected one of {', '.join(PERIODS)}")
+    columns = journal if isinstance(journal, PostingColumns) else journal.to_columns()
+    groups = _groups(columns, accounts, depth)
+    low = _ordinal(start) if start is not None else None
+    high = _ordinal(end) if end is not None else None
+    dates, account, commodity, amounts = columns.date, columns.account, columns.commodity, columns.amount
+
+    buckets = {}
+    numbers = {}
+    for row in _sorted_rows(columns, groups, low, high):
+        day = dates[row]
+        if (number := numbers.get(day)) is None:
+            number = numbers[day] = period_number(period, day)
+        amount = amounts[row]
+        key = (number, groups[account[row]], commodity[row])
+        if (bucket := buckets.get(key)) is None:
+            buckets[key] = [amount, 1, amount, amount, [(amount, row)] if top else None]
+            continue
+        bucket[0] += amount
+        bucket[1] += 1
+        if amount < bucket[2]:
+            bucket[2] = amount
+        elif amount > bucket[3]:
+            bucket[3] = amount
+        if top:
+            # A min-heap of the top largest
+            if len(bucket[4]) < top:
+                heapq.heappush(bucket[4], (amount, row))
+            elif amount > bucket[4][0][0]:
+                heapq.heapreplace(bucket[4], (amount, row))
+
+    result = {}
+    labels = {}
+    postings = _Labels(columns)
+    for (number, group, c), (total, count, smallest, largest, heap) in sorted(
+        buckets.items(), key=lambda item: (item[0][0], item[0][1], item[0][2])
+    ):
+        if (label := labels.get(number)) is None:
+            label = labels[number] = period_label(period, number)
+        result[label, group, columns.commodities[c]] = Aggregate(
+            total=_decimal(total),
+            count=count,
+            min=_decimal(smallest),
+            max=_decimal(largest),
+            largest=postings.largest(sorted(heap, reverse=True)) if top else [],
+        )
+    return result
+
+
+def rolling(
+    journal: Journal | PostingColumns,
+    days: int = 30,
+    accounts: str | None = None,
+    depth: int | None = None,
+    top: int = 0,
+    start: str | datetime.date | None = None,
+    end: str | datetime.date | None = None,
+) -> dict[tuple[str, str, str | None], Aggregate]:
+    """
+    Aggregate the postings of journal in the window of days days ending on every day, by
+    account and commodity, keyed by (date, account, commodity) in order of account, commodity
+    and date. Days with empty windows are left out. Only accounts matching the regex accounts
+    are counted, and only windows ending from start up to, but not including, end.
+    """
+    if days < 1:
+        raise ValueError("A rolling window must be at least one day")
+    columns = journal if isinstance(journal, PostingColumns) else journal.to_columns()
+    groups = _groups(columns, accounts, depth)
+    first = _ordinal(start) if start is not None else None
+    high = _ordinal(end) if end is not None else None
+    # Postings before start are still in the windows of the first days
+    low = first - days + 1 if first is not None else None
+    dates, account, commodity, amounts = columns.date, columns.account, columns.commodity, columns.amount
+
+    streams = {}
+    rows = _sorted_rows(columns, groups, low, high)
+    for row in rows:
+        streams.setdefault((groups[account[row]], commodity[row]), []).append(row)
+    if not rows:
+        return {}
+    last = high - 1 if high is not None else dates[rows[-1]]
+
+    result = {}
+    labels = _Labels(columns)
+    for (group, c), stream in sorted(streams.items(), key=lambda item: (item[0][0], item[0][1])):
+        name = columns.commodities[c]
+        window = deque()  # (date, amount, row) in the window, oldest first
+        ordered = []  # (amount, row) in the window, smallest first
+        total = 0
+        i = 0
+        day = dates[stream[0]]
+        current = None  # The aggregate of the window, until a posting enters or leaves it
+        while day <= last:
+            while i < len(stream) and dates[stream[i]] == day:
+                row = stream[i]
+                window.append((day, amounts[row], row))
+                insort(ordered, (amounts[row], row))
+                total += amounts[row]
+                i += 1
+                current = None
+            while window and window[0][0] <= day - days:
+                _, amount, row = window.popleft()
+                del ordered[bisect_left(ordered, (amount, row))]
+                total -= amount
+                current = None
+            if not window:
+                if i == len(stream):
+                    break
+                # Skip to the next posting, the windows in between are empty
+                day = dates[stream[i]]
+                continue
+            if first is None or day >= first:
+                if current is None:
+                    current = Aggregate(
+                        total=_decimal(total),
+                        count=len(window),
+                        min=_decimal(ordered[0][0]),
+                        max=_decimal(ordered[-1][0]),
+                        largest=labels.largest(ordered[: -top - 1 : -1]) if top else [],
+                    )
+                    result[labels.date(day), group, name] = current
+                else:
+                    result[labels.date(day), group, name] = replace(current, largest=list(current.largest))
+            day += 1
+    return result
@@ -0,0 +1,167 @@
+"""
+Balances of accounts by period, as dense matrices for charting.
+
+balance_matrix buckets the postings of a journal by day, week, month,
+quarter or year, and sums them into a matrix of accounts by periods for every
+commodity, in one pass over the posting columns. Every period from the first
+to the last is included, also periods without postings. With rollup, parent
+accounts hold the sum of their children, like in ledger's balance report.
+
+The matrices are amounts in hundredths, indexed [commodity][account][period].
+They are NumPy arrays when NumPy is installed, otherwise lists of lists.
+"""
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import accumulate
+
+from journal_lib.columns import PostingColumns, _month, _np_sums, _ordinal, month_name, np
+from journal_lib.dataclasses import Journal
+
+PERIODS = ("day", "week", "month", "quarter", "year")
+
+
+def period_number(period: str, ordinal: int) -> int:
+    """
+    The number of the period of a date ordinal, consecutive periods have consecutive numbers.
+    Months are numbered like the month column of PostingColumns, and quarters from those.
+    """
+    if period == "day":
+        return ordinal
+    if period == "week":
+        # Ordinal 1 is a monday, so weeks start on mondays
+        return (ordinal - 1) // 7
+    if period == "year":
+        return datetime.date.fromordinal(ordinal).year
+    month = _month(ordinal)
+    return month if period == "month" else month // 3
+
+
+def period_label(period: str, number: int) -> str:
+    """Format a period number as YYYY-MM-DD, YYYY-Www, YYYY-MM, YYYY-Qq or YYYY"""
+    if period == "day":
+        return datetime.date.fromordinal(number).isoformat()
+    if period == "week":
+        year, week, _ = datetime.date.fromordinal(number * 7 + 1).isocalendar()
+        return f"{year:04}-W{week:02}"
+    if period == "month":
+        return month_name(number)
+    if period == "quarter":
+        return f"{number // 4 + 1:04}-Q{number % 4 + 1}"
+    return f"{number:04}"
+
+
+def _parents(account: str) -> list[str]:
+    parts = account.split(":")
+    return [":".join(parts[:i]) for i in range(1, len(parts))]
+
+
+def _selected(columns: PostingColumns, names: tuple[str, ...], mask) -> list:
+    """The columns names of the rows set in mask, as NumPy arrays if NumPy is installed"""
+    if np is not None:
+        selected = [columns.numpy(name) for name in names]
+        return selected if mask is None else [c[mask] for c in selected]
+    selected = [getattr(columns, name) for name in names]
+    if mask is None:
+        return selected
+    rows = [row for row, keep in zip(zip(*selected), mask) if keep]
+    return [list(c) for c in zip(*rows)] if rows else [[] for _ in names]
+
+
+@dataclass
+class BalanceMatrix:
+    period: str
+    accounts: list[str]
+    periods: list[str]
+    commodities: list[str | None]
+    changes: list  # Net change of every account in every period
+    balances: list  # Balance of every account at the end of every period
+
+    def series(self, account: str, commodity: str | None, cumulative: bool = True) -> list[Decimal]:
+        """The balances, or the changes without cumulative, of one account and commodity"""
+        matrix = self.balances if cumulative else self.changes
+        row = matrix[self.commodities.index(commodity)][self.accounts.index(account)]
+        return [Decimal(int(value)).scaleb(-2) for value in row]
+
+
+def balance_matrix(
+    journal: Journal | PostingColumns,
+    period: str = "month",
+    rollup: bool = True,
+    depth: int | None = None,
+    start: str | datetime.date | None = None,
+    end: str | datetime.date | None = None,
+) -> BalanceMatrix:
+    """
+    Sum the postings of journal into a BalanceMatrix of accounts by periods, see PERIODS.
+    Accounts deeper than depth are counted in their parent at that depth. Only postings from
+    start up to, but not including, end are counted, and the periods span start to end if given.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period {period!r}, expected one of {', '.join(PERIODS)}")
+    columns = journal if isinstance(journal, PostingColumns) else journal.to_columns()
+
+    # The rows of the matrix, parents sorted before their children
+    targets = []
+    for account in columns.accounts:
+        targets.append(":".join(account.split(":")[:depth]) if depth is not None else account)
+    names = set(targets)
+    if rollup:
+        for name in list(names):
+            names.update(_parents(name))
+    accounts = sorted(names)
+    rows = {name: row for row, name in enumerate(accounts)}
+    row_of = [rows[target] for target in targets]
+    parents = [[rows[parent] for parent in _parents(name)] if rollup else [] for name in accounts]
+
+    mask = columns.date_mask(start, end) if start is not None or end is not None else None
+    dates, account, commodity, amounts = _selected(columns, ("date", "account", "commodity", "amount"), mask)
+
+    if len(dates):
+        low, high = (int(dates.min()), int(dates.max())) if np is not None else (min(dates), max(dates))
+    else:
+        low = high = None
+    first = _ordinal(start) if start is not None else low
+    last = _ordinal(end) - 1 if end is not None else high
+    if first is None or last is None or last < first:
+        numbers = range(0)
+    else:
+        numbers = range(period_number(period, first), period_number(period, last) + 1)
+    if len(dates):
+        # The period of every day spanned by the postings, counted from the first period
+        table = [period_number(period, day) - numbers[0] for day in range(low, high + 1)]
+
+    shape = (len(columns.commodities), len(accounts), len(numbers))
+    leaves = sorted(set(row_of))
+    if np is not None:
+        changes = np.zeros(shape, dtype=np.int64)
+        if len(dates):
+            index = commodity.astype(np.intp) * shape[1] + np.asarray(row_of, dtype=np.intp)[account]
+            index *= shape[2]
+            index += np.asarray(table, dtype=np.intp)[dates - low]
+            changes += _np_sums(index, amounts, changes.size).reshape(shape)
+        if rollup:
+            direct = changes.copy()
+            for row in leaves:
+                for parent in parents[row]:
+                    changes[:, parent] += direct[:, row]
+        balances = np.cumsum(changes, axis=2)
+    else:
+        changes = [[[0] * shape[2] for _ in range(shape[1])] for _ in range(shape[0])]
+        for day, a, c, amount in zip(dates, account, commodity, amounts):
+            changes[c][row_of[a]][table[day - low]] += amount
+        if rollup:
+            for matrix in changes:
+                direct = [list(row) for row in matrix]
+                for row in leaves:
+                    for parent in parents[row]:
+                        matrix[parent] = [x + y for x, y in zip(matrix[parent], direct[row])]
+        balances = [[list(accumulate(row)) for row in matrix] for matrix in changes]
+    return BalanceMatrix(
+        period=period,
+        accounts=accounts,
+        periods=[period_label(period, number) for number in numbers],
+        commodities=list(columns.commodities),
+        changes=changes,
+        balances=balances,
+    )
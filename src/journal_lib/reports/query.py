@@ -0,0 +1,291 @@
+"""
+A small ledger-like query language for balance and register reports.
+
+    bal ^Expenses date:2023 cur:NOK status:cleared depth:2
+    reg Assets:Checking payee:/rema/ date:2023-01..2023-04
+
+A query is a command, bal or reg, followed by terms. Terms without a prefix
+are account regexes, and a posting matches if its account matches any of
+them. The other terms are
+
+    date:PERIOD    YYYY, YYYY-MM, YYYY-MM-DD, or a range START..END with END
+                   not included, where either side may be left out
+    cur:NAME       the commodity, repeat to allow several
+    status:STATUS  cleared, pending or unmarked, or *, ! and -, repeat to allow several
+    payee:REGEX    the title of the entry, desc: is the same
+    depth:N        for bal, count accounts deeper than N in their parent
+
+Regexes are case insensitive, and may be written between slashes.
+
+compile_query parses a query once into a Query, which can be run against
+many journals. Running it uses a JournalIndex of the journal, with the
+postings sorted by date, so the date range is found by bisection and only
+the postings in it are looked at. Account regexes are matched once per
+account, with plain prefixes found by bisection in the sorted account names,
+and payee regexes once per distinct title. The remaining filters are set
+lookups in a single pass over the postings in the date range.
+"""
+import datetime
+import re
+import shlex
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Iterator
+
+from journal_lib.columns import CLEARED, PENDING, _ordinal, np
+from journal_lib.dataclasses import Journal
+from .register import RegisterRow
+
+COMMANDS = {"bal": "bal", "balance": "bal", "reg": "reg", "register": "reg"}
+STATUSES = {"cleared": CLEARED, "*": CLEARED, "pending": PENDING, "!": PENDING, "unmarked": 0, "-": 0}
+
+DATE_RE = re.compile(r"(\d{4})(?:[-/](\d{1,2})(?:[-/](\d{1,2}))?)?")
+# A regex matching names starting with a literal prefix, which can be found by bisection
+PREFIX_RE = re.compile(r"\^([\w: ]+)")
+
+
+class QueryError(ValueError):
+    """Raised for a query which can't be parsed"""
+
+
+@dataclass
+class BalanceRow:
+    account: str
+    commodity: str | None
+    amount: Decimal
+
+
+def _date_bound(text: str, end: bool) -> int:
+    """The ordinal of the first day of the period text, or of the day after it with end"""
+    m = DATE_RE.fullmatch(text)
+    if m is None:
+        raise QueryError(f"Invalid date {text!r}")
+    year, month, day = int(m.group(1)), m.group(2), m.group(3)
+    try:
+        if day is not None:
+            start = _ordinal(f"{year:04}-{int(month):02}-{int(day):02}")
+            return start + 1 if end else start
+        if month is not None:
+            if end:
+                year, month = (year + 1, 1) if int(month) == 12 else (year, int(month) + 1)
+            return _ordinal(f"{year:04}-{int(month):02}-01")
+        return _ordinal(f"{year + 1 if end else year:04}-01-01")
+    except ValueError:
+        raise QueryError(f"Invalid date {text!r}") from None
+
+
+def _date_range(text: str) -> tuple[int | None, int | None]:
+    if ".." not in text:
+        return _date_bound(text, False), _date_bound(text, True)
+    start, end = text.split("..", 1)
+    return (
+        _date_bound(start, False) if start else None,
+        _date_bound(end, False) if end else None,
+    )
+
+
+def _regex(text: str) -> re.Pattern:
+    if len(text) > 1 and text.startswith("/") and text.endswith("/"):
+        text = text[1:-1]
+    try:
+        return re.compile(text, re.I)
+    except re.error as e:
+        raise QueryError(f"Invalid regex {text!r}: {e}") from None
+
+
+@dataclass
+class Query:
+    command: str
+    accounts: list[re.Pattern] = field(default_factory=list)
+    start: int | None = None  # Date ordinals, end not included
+    end: int | None = None
+    commodities: set[str] | None = None
+    statuses: set[int] | None = None
+    payee: re.Pattern | None = None
+    depth: int | None = None
+
+    def run(self, journal: "Journal | JournalIndex") -> Iterator[BalanceRow] | Iterator[RegisterRow]:
+        """Run the query, and yield its rows"""
+        index = journal if isinstance(journal, JournalIndex) else JournalIndex(journal)
+        if self.command == "bal":
+            return self._balance(index)
+        return self._register(index)
+
+    def rows(self, index: "JournalIndex") -> list[int]:
+        """The rows of the matching postings in the columns of index, in order of date"""
+        columns = index.columns
+        accounts = index.match_accounts(self.accounts)
+        commodities = None
+        if self.commodities is not None:
+            commodities = {i for i, name in enumerate(columns.commodities) if name in self.commodities}
+        entries = index.match_titles(self.payee) if self.payee is not None else None
+        lo, hi = index.date_slice(self.start, self.end)
+        if lo >= hi or not accounts or commodities == set():
+            return []
+
+        if np is not None:
+            rows = index.np_order[lo:hi]
+            mask = np.zeros(len(columns.accounts), dtype=bool)
+            mask[list(accounts)] = True
+            mask = mask[columns.numpy("account")[rows]]
+            if commodities is not None:
+                selected = np.zeros(len(columns.commodities), dtype=bool)
+                selected[list(commodities)] = True
+                mask &= selected[columns.numpy("commodity")[rows]]
+            if self.statuses is not None:
+                mask &= np.isin(columns.numpy("status")[rows] & (CLEARED | PENDING), list(self.statuses))
+            if entries is not None:
+                mask &= np.asarray(entries, dtype=bool)[columns.numpy("entry")[rows]]
+            return rows[mask].tolist()
+
+        account, commodity, status, entry = columns.account, columns.commodity, columns.status, columns.entry
+        statuses = self.statuses
+        return [
+            row
+            for row in index.order[lo:hi]
+            if account[row] in accounts
+            and (commodities is None or commodity[row] in commodities)
+            and (statuses is None or status[row] & (CLEARED | PENDING) in statuses)
+            and (entries is None or entries[entry[row]])
+        ]
+
+    def _balance(self, index: "JournalIndex") -> Iterator[BalanceRow]:
+        columns = index.columns
+        sums = {}
+        account, commodity, amounts = columns.account, columns.commodity, columns.amount
+        for row in self.rows(index):
+            key = (account[row], commodity[row])
+            sums[key] = sums.get(key, 0) + amounts[row]
+
+        # Every account counts in its parents, like in ledger's balance report
+        totals = {}
+        for (a, c), value in sums.items():
+            parts = columns.accounts[a].split(":")
+            for i in range(1, min(len(parts), self.depth or len(parts)) + 1):
+                key = (":".join(parts[:i]), columns.commodities[c])
+                totals[key] = totals.get(key, 0) + value
+        for (name, c), value in sorted(totals.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+            yield BalanceRow(account=name, commodity=c, amount=Decimal(value).scaleb(-2))
+
+    def _register(self, index: "JournalIndex") -> Iterator[RegisterRow]:
+        columns = index.columns
+        titles = index.titles
+        running = {}
+        for row in self.rows(index):
+            commodity = columns.commodities[columns.commodity[row]]
+            amount = columns.amount[row]
+            total = running[commodity] = running.get(commodity, 0) + amount
+            yield RegisterRow(
+                date=index.date_label(columns.date[row]),
+                title=titles[columns.entry[row]],
+                account=columns.accounts[columns.account[row]],
+                commodity=commodity,
+                amount=Decimal(amount).scaleb(-2),
+                total=Decimal(total).scaleb(-2),
+            )
+
+
+class JournalIndex:
+    """The postings of a journal sorted by date and the accounts sorted by name, for running queries"""
+
+    def __init__(self, journal: Journal):
+        self.columns = columns = journal.to_columns()
+        self.titles = [entry.title for entry in journal.entries]
+        if np is not None:
+            dates = columns.numpy("date")
+            self.np_order = np.argsort(dates, kind="stable")
+            self.order = None
+            self.sorted_dates = dates[self.np_order]
+        else:
+            self.order = sorted(range(len(columns)), key=columns.date.__getitem__)
+            self.sorted_dates = [columns.date[row] for row in self.order]
+        # Lowercased, as regexes are case insensitive
+        self.account_names = sorted((name.lower(), i) for i, name in enumerate(columns.accounts))
+        self._dates = {}
+        self._titles = {}
+
+    def date_slice(self, start: int | None, end: int | None) -> tuple[int, int]:
+        """The positions in the date order of the postings from start up to end"""
+        search = bisect_left if np is None else np.searchsorted
+        lo = 0 if start is None else int(search(self.sorted_dates, start))
+        hi = len(self.sorted_dates) if end is None else int(search(self.sorted_dates, end))
+        return lo, hi
+
+    def match_accounts(self, patterns: list[re.Pattern]) -> set[int]:
+        """The ids of the accounts matching any of patterns, or all without patterns"""
+        if not patterns:
+            return set(range(len(self.columns.accounts)))
+        ids = set()
+        for pattern in patterns:
+            m = PREFIX_RE.fullmatch(pattern.pattern)
+            if m is not None:
+                prefix = m.group(1).lower()
+                i = bisect_left(self.account_names, (prefix,))
+                while i < len(self.account_names) and self.account_names[i][0].startswith(prefix):
+                    ids.add(self.account_names[i][1])
+                    i += 1
+            else:
+                ids.update(i for name, i in self.account_names if pattern.search(name))
+        return ids
+
+    def match_titles(self, pattern: re.Pattern) -> list[bool]:
+        """Whether the title of every entry matches pattern"""
+        key = (pattern.pattern, pattern.flags)
+        if (matches := self._titles.get(key)) is None:
+            seen = {}
+            matches = self._titles[key] = [
+                seen[title] if title in seen else seen.setdefault(title, bool(pattern.search(title or "")))
+                for title in self.titles
+            ]
+        return matches
+
+    def date_label(self, ordinal: int) -> str:
+        if (label := self._dates.get(ordinal)) is None:
+            label = self._dates[ordinal] = datetime.date.fromordinal(ordinal).isoformat()
+        return label
+
+
+def compile_query(text: str) -> Query:
+    """Parse the query text into a Query"""
+    # Split like a shell, for quoted terms with spaces, but keep backslashes for the regexes
+    lexer = shlex.shlex(text, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ""
+    try:
+        words = list(lexer)
+    except ValueError as e:
+        raise QueryError(f"Invalid query: {e}") from None
+    if not words:
+        raise QueryError("Empty query")
+    if (command := COMMANDS.get(words[0])) is None:
+        raise QueryError(f"Unknown command {words[0]!r}, expected bal or reg")
+
+    query = Query(command=command)
+    for word in words[1:]:
+        prefix, sep, value = word.partition(":")
+        if not sep or prefix not in ("date", "cur", "status", "payee", "desc", "depth"):
+            query.accounts.append(_regex(word))
+            continue
+        if not value:
+            raise QueryError(f"Missing value in {word!r}")
+        if prefix == "date":
+            query.start, query.end = _date_range(value)
+        elif prefix == "cur":
+            query.commodities = (query.commodities or set()) | {value}
+        elif prefix == "status":
+            if value not in STATUSES:
+                raise QueryError(f"Unknown status {value!r}, expected cleared, pending or unmarked")
+            query.statuses = (query.statuses or set()) | {STATUSES[value]}
+        elif prefix in ("payee", "desc"):
+            query.payee = _regex(value)
+        else:
+            if not value.isdigit() or int(value) < 1:
+                raise QueryError(f"Invalid depth {value!r}")
+            query.depth = int(value)
+    return query
+
+
+def run_query(text: str, journal: "Journal | JournalIndex") -> Iterator[BalanceRow] | Iterator[RegisterRow]:
+    """Compile and run the query text on journal"""
+    return compile_query(text).run(journal)
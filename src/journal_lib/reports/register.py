@@ -0,0 +1,158 @@
+"""
+Register reports, streamed a posting at a time.
+
+iter_register yields a RegisterRow for every posting of the matching
+accounts, with the running total of its commodity. Only the running totals
+are kept in memory, so entries can be the iterator of a streaming parse,
+like iter_entries_from_file, as well as the entries of a Journal. The
+entries must be sorted by date, which is checked as they are read.
+
+write_statements writes a register of every account to its own file in one
+pass over the entries, buffering a few lines per account at a time.
+"""
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from journal_lib.dataclasses import JournalEntry, _to_minor, format_amount
+
+STATEMENT_BUFFER_LINES = 256
+
+FILENAME_RE = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class RegisterRow:
+    date: str
+    title: str | None
+    account: str
+    commodity: str | None
+    amount: Decimal
+    total: Decimal  # Running total of the commodity over the rows so far
+
+
+def _decimal(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def iter_register(
+    entries: Iterable[JournalEntry],
+    accounts: str | None = None,
+    by_account: bool = False,
+) -> Iterator[RegisterRow]:
+    """
+    Yield a RegisterRow for every posting of entries with an account matching the regex accounts.
+    The totals run over all the rows, or over the rows of each account with by_account.
+    Elided amounts are inferred, with a row for every commodity they balance.
+    Raises ValueError if the entries aren't sorted by date.
+    """
+    pattern = re.compile(accounts) if accounts is not None else None
+    matches = {}
+    totals = {}
+    last = ""
+    for entry in entries:
+        day = entry.date.replace("/", "-")
+        if day < last:
+            raise ValueError(f"The entries must be sorted by date, {day} '{entry.title}' is after {last}")
+        last = day
+        balance = None
+        for t in entry.transactions:
+            if (match := matches.get(t.account)) is None:
+                match = matches[t.account] = pattern is None or pattern.search(t.account) is not None
+            if not match:
+                continue
+            if t.amount is not None:
+                amounts = ((t.currency, _to_minor(t.amount)),)
+            else:
+                if balance is None:
+                    balance = {}
+                    for other in entry.transactions:
+                        if other.amount is not None:
+                            balance[other.currency] = balance.get(other.currency, 0) - _to_minor(other.amount)
+                amounts = balance.items()
+            for currency, amount in amounts:
+                key = (t.account, currency) if by_account else currency
+                total = totals[key] = totals.get(key, 0) + amount
+                yield RegisterRow(
+                    date=day,
+                    title=entry.title,
+                    account=t.account,
+                    commodity=currency,
+                    amount=_decimal(amount),
+                    total=_decimal(total),
+                )
+
+
+def format_register_row(row: RegisterRow, account: bool = True) -> str:
+    """Format a row as a line of a register report, without the account if account is False"""
+    amount = format_amount(str(row.amount), row.commodity)
+    total = format_amount(str(row.total), row.commodity)
+    title = (row.title or "").ljust(30)
+    if account:
+        return f"{row.date} {title} {row.account.ljust(40)} {amount:>16} {total:>16}\n"
+    return f"{row.date} {title} {amount:>16} {total:>16}\n"
+
+
+def write_register(
+    entries: Iterable[JournalEntry],
+    fp,
+    accounts: str | None = None,
+    by_account: bool = False,
+    batch_size: int = 1024,
+):
+    """Write the register of entries to the text file fp, see iter_register"""
+    lines = []
+    for row in iter_register(entries, accounts, by_account):
+        lines.append(format_register_row(row))
+        if len(lines) >= batch_size:
+            fp.write("".join(lines))
+            lines = []
+    fp.write("".join(lines))
+
+
+def statement_path(directory: Path, account: str) -> Path:
+    """The file of the statement of account in directory"""
+    return Path(directory) / (FILENAME_RE.sub("_", account) + ".txt")
+
+
+def write_statements(
+    entries: Iterable[JournalEntry],
+    directory: Path | str,
+    accounts: str | None = None,
+    buffer_lines: int = STATEMENT_BUFFER_LINES,
+) -> dict[str, Path]:
+    """
+    Write a register of every account matching the regex accounts to its own file in directory,
+    with running totals by account, and return the file of every account. Lines are kept for
+    buffer_lines rows of an account at a time, and files are only open while they are written.
+    """
+    paths = {}
+    buffers = {}
+    used = set()
+
+    def flush(account: str):
+        path = paths.get(account)
+        mode = "a"
+        if path is None:
+            path = statement_path(directory, account)
+            # Different account names can give the same file name
+            n = 1
+            while path in used:
+                n += 1
+                path = path.with_stem(f"{path.stem.rsplit('~', 1)[0]}~{n}")
+            used.add(path)
+            paths[account] = path
+            mode = "w"
+        with open(path, mode) as fp:
+            fp.write("".join(buffers.pop(account)))
+
+    for row in iter_register(entries, accounts, by_account=True):
+        buffer = buffers.setdefault(row.account, [])
+        buffer.append(format_register_row(row, account=False))
+        if len(buffer) >= buffer_lines:
+            flush(row.account)
+    for account in list(buffers):
+        flush(account)
+    return paths
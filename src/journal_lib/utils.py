@@ -1,28 +1,362 @@
+import sys
+from contextlib import nullcontext
 from pathlib import Path
-from journal_lib.dataclasses import Journal
-from journal_lib.parse import JournalParser, JournalLexer, preprocess_includes
+from decimal import Decimal
+from typing import Iterator
+from journal_lib.dataclasses import Journal, JournalEntry, JournalEntryHeader, _to_minor
+from journal_lib.parse import JournalParser, JournalLexer, EntryFilter, preprocess_includes
+from journal_lib.parse.diagnostics import Diagnostics
+from journal_lib.parse.stats import ParseStats
+from journal_lib.parse.chunking import chunk_bounds, iter_chunks, CHUNK_SIZE
+from journal_lib.parse.preprocessing import iter_lines_with_includes
 
 
-def journal_from_str(data: str, debug: bool = False) -> Journal:
-    """Read a string of Journal entries into a Journal object"""
+def _no_phase(name: str):
+    return nullcontext()
+
+
+def journal_from_str(
+    data: str,
+    debug: bool = False,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    stats: ParseStats | None = None,
+) -> Journal:
+    """
+    Read a string of Journal entries into a Journal object.
+    Entries not matching entry_filter are skipped while lexing.
+    Lexing and syntax errors are collected in diagnostics, or warned as a
+    JournalSyntaxWarning if diagnostics isn't given.
+    Timings and counts are collected in stats, if given.
+    """
+    warn = diagnostics is None
+    if warn:
+        diagnostics = Diagnostics()
+    phase = _no_phase if stats is None else stats.phase
     if debug:
         print("= Building lexer ===========")
-    lexer = JournalLexer(debug=debug)
+    with phase("lexer_build"):
+        lexer = JournalLexer(
+            debug=debug, entry_filter=entry_filter, diagnostics=diagnostics
+        )
     if debug:
         print("= Building parser ==========")
-    parser = JournalParser(debug=debug)
+    with phase("parser_build"):
+        parser = JournalParser(debug=debug, diagnostics=diagnostics)
     if debug:
         print("= PARSE ====================")
-    journal = parser.parse(data, lexer=lexer)
+    if stats is None:
+        journal = parser.parse(data, lexer=lexer)
+    else:
+        errors = len(diagnostics)
+        lexer.token = stats.timed_tokens(lexer.token)
+        parser.wrap_rules(parser.CONSTRUCT_RULES, lambda f: stats.timed("construct", f))
+        with stats.parsing():
+            journal = parser.parse(data, lexer=lexer)
+        stats.count_input(data)
+        stats.count_journal(journal)
+        stats.errors += len(diagnostics) - errors
+        if stats.callback is not None:
+            stats.callback(stats)
     if debug:
         print("= JOURNAL ==================")
+    if warn:
+        diagnostics.warn(stacklevel=2)
     return journal
 
 
-def journal_from_file(filename: Path, debug: bool = False) -> Journal:
-    """Read a journal file into a Journal object"""
-    journal_raw = preprocess_includes(filename)
-    return journal_from_str(journal_raw, debug=debug)
+def journal_from_file(
+    filename: Path,
+    debug: bool = False,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    stats: ParseStats | None = None,
+) -> Journal:
+    """Read a journal file into a Journal object, see journal_from_str"""
+    warn = diagnostics is None
+    if warn:
+        diagnostics = Diagnostics()
+    phase = _no_phase if stats is None else stats.phase
+    with phase("preprocess"):
+        journal_raw = preprocess_includes(filename, stats=stats)
+    journal = journal_from_str(
+        journal_raw,
+        debug=debug,
+        entry_filter=entry_filter,
+        diagnostics=diagnostics,
+        stats=stats,
+    )
+    if warn:
+        diagnostics.warn(stacklevel=2)
+    return journal
+
+
+def iter_journals_from_str(
+    data: str,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Journal]:
+    """
+    Parse a string of Journal entries a chunk at a time, see parse/chunking.py,
+    and yield a Journal of the elements in every chunk.
+    Only the elements of one chunk are kept in memory at a time.
+    Errors are collected in diagnostics, or warned when done if it isn't given.
+    """
+    lexer = JournalLexer(entry_filter=entry_filter, diagnostics=diagnostics)
+    parser = JournalParser(diagnostics=lexer.diagnostics)
+    lineno = 1
+    try:
+        for start, end in chunk_bounds(data, chunk_size):
+            lexer.input(data, start, end, lineno)
+            lexer._state_begin("INITIAL")
+            yield parser.parse(lexer=lexer)
+            lineno += data.count("\n", start, end)
+    finally:
+        lexer.input("")
+    if diagnostics is None:
+        lexer.diagnostics.warn(stacklevel=2)
+
+
+def iter_entries_from_str(
+    data: str,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[JournalEntry]:
+    """Yield the entries of a string of Journal entries, parsing a chunk at a time"""
+    for journal in iter_journals_from_str(data, entry_filter, diagnostics, chunk_size):
+        yield from journal.entries
+
+
+def _file_chunks(lexer: JournalLexer, filename: Path, chunk_size: int) -> Iterator[None]:
+    """
+    Read a journal file and its includes a chunk at a time, see parse/chunking.py,
+    and give every chunk to lexer as input before yielding.
+    Only one chunk of the file is kept in memory at a time.
+    """
+    diagnostics = lexer.diagnostics
+    lineno = 1
+    try:
+        for chunk in iter_chunks(iter_lines_with_includes(filename), chunk_size):
+            # Diagnostics count lines from the start of the chunk
+            diagnostics.line_offset = lineno - 1
+            lexer.input(chunk, lineno=lineno)
+            lexer._state_begin("INITIAL")
+            yield
+            lineno += chunk.count("\n")
+    finally:
+        lexer.input("")
+        diagnostics.line_offset = 0
+        diagnostics.release_source()
+
+
+def iter_journals_from_file(
+    filename: Path,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Journal]:
+    """
+    Parse a journal file a chunk at a time, reading the file as it is parsed,
+    and yield a Journal of the elements in every chunk.
+    Errors are collected in diagnostics, or warned when done if it isn't given.
+    """
+    lexer = JournalLexer(entry_filter=entry_filter, diagnostics=diagnostics)
+    parser = JournalParser(diagnostics=lexer.diagnostics)
+    for _ in _file_chunks(lexer, filename, chunk_size):
+        yield parser.parse(lexer=lexer)
+    if diagnostics is None:
+        lexer.diagnostics.warn(stacklevel=2)
+
+
+def iter_entries_from_file(
+    filename: Path,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[JournalEntry]:
+    """Yield the entries of a journal file, parsing a chunk at a time"""
+    for journal in iter_journals_from_file(filename, entry_filter, diagnostics, chunk_size):
+        yield from journal.entries
+
+
+def _add_entry_balances(postings: list[list], totals: dict[str, dict[str | None, int]]):
+    """Add the [account, currency, amount] postings of an entry to totals, inferring elided amounts"""
+    balance = {}
+    elided = []
+    for account, currency, amount in postings:
+        if amount is None:
+            elided.append(account)
+            continue
+        value = _to_minor(amount)
+        sums = totals.get(account) or totals.setdefault(account, {})
+        sums[currency] = sums.get(currency, 0) + value
+        balance[currency] = balance.get(currency, 0) - value
+    for account in elided:
+        sums = totals.get(account) or totals.setdefault(account, {})
+        for currency, value in balance.items():
+            sums[currency] = sums.get(currency, 0) + value
+
+
+def _reduce_balances(lexer: JournalLexer, totals: dict[str, dict[str | None, int]]):
+    """
+    Sum the postings of the entries in the input of lexer into totals, by account and
+    currency in hundredths, straight from the tokens. Every entry is discarded when
+    the next element starts, and no parser is involved.
+    """
+    postings = []  # [account, currency, amount] of the current entry
+    posting = None
+    in_header = False  # The title of the entry is next
+    in_entry = False
+    effective_date = False
+    for tok in iter(lexer.token, None):
+        type = tok.type
+        if type == "TEXT":
+            if in_entry:
+                posting = [tok.value, None, None]
+                postings.append(posting)
+            elif in_header:
+                in_header = False
+                in_entry = True
+        elif type == "AMOUNT":
+            if posting is not None:
+                posting[2] = tok.value
+        elif type == "COMMODITY":
+            if posting is not None:
+                posting[1] = tok.value
+        elif type == "DATE":
+            if effective_date:
+                effective_date = False
+                continue
+            _add_entry_balances(postings, totals)
+            postings = []
+            posting = None
+            in_header = True
+            in_entry = False
+        elif type == "ENTRY_EFFECTIVE_DATE_SEPARATOR":
+            effective_date = True
+        elif type in ("KW_ACCOUNT", "KW_COMMODITY"):
+            _add_entry_balances(postings, totals)
+            postings = []
+            posting = None
+            in_header = in_entry = False
+    _add_entry_balances(postings, totals)
+
+
+def _balances(totals: dict[str, dict[str | None, int]]) -> dict[tuple[str, str | None], Decimal]:
+    return {
+        (account, currency): Decimal(value).scaleb(-2)
+        for account, sums in sorted(totals.items())
+        for currency, value in sums.items()
+    }
+
+
+def balances_from_str(
+    data: str,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+) -> dict[tuple[str, str | None], Decimal]:
+    """
+    Sum the postings of a string of Journal entries by (account, currency), with elided amounts
+    inferred, without building the entries. Syntax errors the parser would report are not detected.
+    Lexing errors are collected in diagnostics, or warned if it isn't given.
+    """
+    lexer = JournalLexer(entry_filter=entry_filter, diagnostics=diagnostics)
+    lexer.input(data)
+    totals = {}
+    try:
+        _reduce_balances(lexer, totals)
+    finally:
+        lexer.input("")
+        lexer.diagnostics.release_source()
+    if diagnostics is None:
+        lexer.diagnostics.warn(stacklevel=2)
+    return _balances(totals)
+
+
+def balances_from_file(
+    filename: Path,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict[tuple[str, str | None], Decimal]:
+    """
+    Sum the postings of a journal file by (account, currency) like balances_from_str, reading
+    the file a chunk at a time, so the memory used doesn't grow with the size of the file.
+    """
+    lexer = JournalLexer(entry_filter=entry_filter, diagnostics=diagnostics)
+    totals = {}
+    for _ in _file_chunks(lexer, filename, chunk_size):
+        _reduce_balances(lexer, totals)
+    if diagnostics is None:
+        lexer.diagnostics.warn(stacklevel=2)
+    return _balances(totals)
+
+
+def headers_from_str(
+    data: str,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+) -> list[JournalEntryHeader]:
+    """
+    Read only the entry headers from a string of Journal entries, with title None for
+    entries without one. Entry bodies are skipped by the lexer, and no parser is involved.
+    Lexing errors are collected in diagnostics, or warned if it isn't given.
+    """
+    lexer = JournalLexer(
+        entry_filter=entry_filter, headers_only=True, diagnostics=diagnostics
+    )
+    lexer.input(data)
+
+    headers = []
+    header = None
+    effective_date = False
+    while (tok := lexer.token()) is not None:
+        if tok.type == "DATE":
+            if effective_date:
+                header.effective_date = tok.value
+                effective_date = False
+            else:
+                header = JournalEntryHeader(
+                    date=tok.value,
+                    cleared=False,
+                    pending=False,
+                    title=None,
+                    effective_date=None,
+                )
+        elif header is None:
+            continue
+        elif tok.type == "ENTRY_EFFECTIVE_DATE_SEPARATOR":
+            effective_date = True
+        elif tok.type == "ENTRY_STATUS":
+            header.cleared = tok.value == "*"
+            header.pending = tok.value == "!"
+        elif tok.type == "TEXT":
+            header.title = tok.value
+            headers.append(header)
+            header = None
+    lexer.diagnostics.release_source()
+    if diagnostics is None:
+        lexer.diagnostics.warn(stacklevel=2)
+    return headers
+
+
+def headers_from_file(
+    filename: Path,
+    entry_filter: EntryFilter | None = None,
+    diagnostics: Diagnostics | None = None,
+) -> list[JournalEntryHeader]:
+    """Read only the entry headers from a journal file"""
+    warn = diagnostics is None
+    if warn:
+        diagnostics = Diagnostics()
+    headers = headers_from_str(
+        preprocess_includes(filename), entry_filter=entry_filter, diagnostics=diagnostics
+    )
+    if warn:
+        diagnostics.warn(stacklevel=2)
+    return headers
 
 
 def test():
@@ -36,10 +370,21 @@ def test():
         action="store_true",
         help="Print more debug information from lexing and parsing",
     )
+    parser.add_argument(
+        "-s",
+        "--stats",
+        action="store_true",
+        help="Print timings and counts from reading the journal",
+    )
     args = parser.parse_args()
+    diagnostics = Diagnostics()
+    stats = ParseStats() if args.stats else None
 
     if args.file is not None:
-        print(journal_from_file(Path(args.file), debug=args.debug))
+        journal = journal_from_file(
+            Path(args.file), debug=args.debug, diagnostics=diagnostics, stats=stats
+        )
+        journal.write_to(sys.stdout)
 
     else:
         # Just a test string which includes most of the supported features of the parser
@@ -72,4 +417,15 @@ end comment
     Expenses:account one  $50.00
     Assets:Cash          
     """
-        print(journal_from_str(data, debug=args.debug))
+        print(
+            journal_from_str(
+                data, debug=args.debug, diagnostics=diagnostics, stats=stats
+            )
+        )
+
+    for diagnostic in diagnostics:
+        print(diagnostic)
+    if diagnostics.dropped:
+        print(f"... and {diagnostics.dropped} more errors")
+    if stats is not None:
+        print(stats)
@@ -0,0 +1,296 @@
+"""
+Validation of the entries of a journal, in a single pass.
+
+Every entry is checked as it is read for
+
+    unbalanced            the amounts don't sum to zero in every commodity
+    multiple_elided       more than one posting without an amount
+
+and with strict, every account and commodity must be declared with an
+account or commodity directive
+
+    undeclared_account    an account without an account directive
+    undeclared_commodity  a commodity without a commodity directive
+
+Amounts are summed as integer hundredths, and the declarations and first
+uses are kept in sets and dicts, so nothing but the violations grows with
+the journal. Directives count wherever they are in the journal, and an
+undeclared name is reported once, at its first use.
+
+Violations are located by the line and column of the date of their entry,
+also for an undeclared name, which is in one of the postings of the entry.
+Postings don't keep their own positions, as it would slow down parsing.
+
+validate_str and validate_file parse a chunk at a time, see
+parse/chunking.py. With workers, the chunks are parsed and checked in a
+pool of processes, and the results of every chunk merged in order.
+"""
+from collections import deque
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from journal_lib.dataclasses import Journal, JournalEntry, _to_minor, format_amount
+from journal_lib.parse import JournalLexer, JournalParser
+from journal_lib.parse.chunking import CHUNK_SIZE, chunk_bounds, iter_chunks
+from journal_lib.parse.diagnostics import Diagnostic, Diagnostics
+from journal_lib.parse.preprocessing import iter_lines_with_includes
+from journal_lib.utils import iter_journals_from_file, iter_journals_from_str
+
+KINDS = ("unbalanced", "multiple_elided", "undeclared_account", "undeclared_commodity")
+
+
+@dataclass
+class Violation:
+    kind: str  # One of KINDS
+    message: str
+    lineno: int | None  # Line and column of the entry date, when parsed
+    column: int | None
+    date: str
+    title: str | None
+    account: str | None = None
+    commodity: str | None = None
+
+    def __str__(self):
+        where = f" on line {self.lineno}, position {self.column}" if self.lineno is not None else ""
+        title = f" {self.title}" if self.title is not None else ""
+        return f"{self.message}, in {self.date}{title}{where}"
+
+
+def _where(entry: JournalEntry) -> tuple[int | None, int | None, str, str | None]:
+    return entry.lineno, entry.column, entry.date, entry.title
+
+
+class Validator:
+    """
+    Checks entries one at a time, see the module docstring.
+    Validators of consecutive parts of a journal can be merged, in order, before finish.
+    """
+
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self.violations: list[Violation] = []
+        self.declared_accounts: set[str] = set()
+        self.declared_commodities: set[str] = set()
+        # The entry of the first use of every account and commodity, as (lineno, column, date, title)
+        self.accounts: dict[str, tuple[int | None, int | None, str, str | None]] = {}
+        self.commodities: dict[str, tuple[int | None, int | None, str, str | None]] = {}
+
+    def check_journal(self, journal: Journal):
+        """Check the entries and collect the declarations of journal"""
+        self.declared_accounts.update(a.account for a in journal.accounts)
+        self.declared_commodities.update(c.commodity for c in journal.commodities)
+        for entry in journal.entries:
+            self.check_entry(entry)
+
+    def check_entry(self, entry: JournalEntry):
+        balance = {}
+        elided = 0
+        strict = self.strict
+        for t in entry.transactions:
+            if t.amount is None:
+                elided += 1
+            else:
+                balance[t.currency] = balance.get(t.currency, 0) + _to_minor(t.amount)
+            if strict:
+                if t.account not in self.accounts:
+                    self.accounts[t.account] = _where(entry)
+                if t.currency is not None and t.currency not in self.commodities:
+                    self.commodities[t.currency] = _where(entry)
+
+        if elided > 1:
+            self._add(entry, "multiple_elided", f"{elided} postings without an amount, at most one can be elided")
+        elif elided == 0:
+            # With one elided amount the entry balances by definition
+            off = [(currency, value) for currency, value in balance.items() if value]
+            if off:
+                amounts = ", ".join(format_amount(str(Decimal(value).scaleb(-2)), c) for c, value in off)
+                self._add(entry, "unbalanced", f"Entry does not balance, off by {amounts}")
+
+    def _add(self, entry: JournalEntry, kind: str, message: str):
+        self.violations.append(
+            Violation(
+                kind=kind,
+                message=message,
+                lineno=entry.lineno,
+                column=entry.column,
+                date=entry.date,
+                title=entry.title,
+            )
+        )
+
+    def merge(self, other: "Validator"):
+        """Add the results of a validator of the part of the journal after this one"""
+        self.violations.extend(other.violations)
+        self.declared_accounts |= other.declared_accounts
+        self.declared_commodities |= other.declared_commodities
+        for name, where in other.accounts.items():
+            self.accounts.setdefault(name, where)
+        for name, where in other.commodities.items():
+            self.commodities.setdefault(name, where)
+
+    def finish(self) -> list[Violation]:
+        """The violations, with the undeclared names when strict, in order of line"""
+        violations = list(self.violations)
+        if self.strict:
+            for name, (lineno, column, date, title) in self.accounts.items():
+                if name not in self.declared_accounts:
+                    violations.append(
+                        Violation(
+                            kind="undeclared_account",
+                            message=f"Account {name} is not declared",
+                            lineno=lineno,
+                            column=column,
+                            date=date,
+                            title=title,
+                            account=name,
+                        )
+                    )
+            for name, (lineno, column, date, title) in self.commodities.items():
+                if name not in self.declared_commodities:
+                    violations.append(
+                        Violation(
+                            kind="undeclared_commodity",
+                            message=f"Commodity {name} is not declared",
+                            lineno=lineno,
+                            column=column,
+                            date=date,
+                            title=title,
+                            commodity=name,
+                        )
+                    )
+        # Stable, so the violations of an entry keep their order
+        violations.sort(key=lambda v: v.lineno or 0)
+        return violations
+
+
+def validate_journal(journal: Journal, strict: bool = False) -> list[Violation]:
+    """Validate a parsed journal, see the module docstring"""
+    validator = Validator(strict)
+    validator.check_journal(journal)
+    return validator.finish()
+
+
+def validate_entries(
+    entries: Iterable[JournalEntry],
+    strict: bool = False,
+    accounts: Iterable[str] = (),
+    commodities: Iterable[str] = (),
+) -> list[Violation]:
+    """Validate entries, like from iter_entries_from_file, with the declared accounts and commodities"""
+    validator = Validator(strict)
+    validator.declared_accounts.update(accounts)
+    validator.declared_commodities.update(commodities)
+    for entry in entries:
+        validator.check_entry(entry)
+    return validator.finish()
+
+
+def _validate_chunk(
+    chunk: str, lineno: int, offset: int, strict: bool
+) -> tuple[Validator, list[Diagnostic], int]:
+    """Parse and check a chunk starting on line lineno and at position offset, in a worker process"""
+    diagnostics = Diagnostics()
+    diagnostics.line_offset = lineno - 1
+    lexer = JournalLexer(diagnostics=diagnostics)
+    parser = JournalParser(diagnostics=diagnostics)
+    lexer.input(chunk, lineno=lineno)
+    validator = Validator(strict)
+    validator.check_journal(parser.parse(lexer=lexer))
+    errors = diagnostics.errors
+    if offset:
+        # Positions in the input, like when it is parsed in one process
+        errors = [replace(error, lexpos=error.lexpos + offset) for error in errors]
+    return validator, errors, diagnostics.dropped
+
+
+def _validate_parallel(
+    chunks: Iterator[tuple[str, int, int]], strict: bool, workers: int, diagnostics: Diagnostics
+) -> list[Violation]:
+    """Check (chunk, lineno, offset) chunks in a pool of workers, keeping a few chunks per worker in flight"""
+    # Only imported when used, as it imports multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    validator = Validator(strict)
+
+    def collect(future):
+        result, errors, dropped = future.result()
+        validator.merge(result)
+        diagnostics.extend(errors)
+        diagnostics.dropped += dropped
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk, lineno, offset in chunks:
+            pending.append(pool.submit(_validate_chunk, chunk, lineno, offset, strict))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    return validator.finish()
+
+
+def _numbered(chunks: Iterable[tuple[str, int]]) -> Iterator[tuple[str, int, int]]:
+    """Add the first line number to every (chunk, offset)"""
+    lineno = 1
+    for chunk, offset in chunks:
+        yield chunk, lineno, offset
+        lineno += chunk.count("\n")
+
+
+def validate_str(
+    data: str,
+    strict: bool = False,
+    workers: int | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> list[Violation]:
+    """
+    Parse and validate a string of Journal entries a chunk at a time, in workers processes if given.
+    Syntax errors are collected in diagnostics, or warned if it isn't given.
+    """
+    warn = diagnostics is None
+    if warn:
+        diagnostics = Diagnostics()
+    if workers:
+        chunks = _numbered((data[start:end], start) for start, end in chunk_bounds(data, chunk_size))
+        violations = _validate_parallel(chunks, strict, workers, diagnostics)
+    else:
+        validator = Validator(strict)
+        for journal in iter_journals_from_str(data, diagnostics=diagnostics, chunk_size=chunk_size):
+            validator.check_journal(journal)
+        violations = validator.finish()
+    if warn:
+        diagnostics.warn(stacklevel=2)
+    return violations
+
+
+def validate_file(
+    filename: Path,
+    strict: bool = False,
+    workers: int | None = None,
+    diagnostics: Diagnostics | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> list[Violation]:
+    """
+    Parse and validate a journal file and its includes a chunk at a time, reading the file as it
+    is parsed, in workers processes if given. Syntax errors are collected in diagnostics, or
+    warned if it isn't given.
+    """
+    warn = diagnostics is None
+    if warn:
+        diagnostics = Diagnostics()
+    if workers:
+        # Positions are in the chunk, like in iter_journals_from_file
+        lines = iter_lines_with_includes(filename)
+        chunks = _numbered((chunk, 0) for chunk in iter_chunks(lines, chunk_size))
+        violations = _validate_parallel(chunks, strict, workers, diagnostics)
+    else:
+        validator = Validator(strict)
+        for journal in iter_journals_from_file(filename, diagnostics=diagnostics, chunk_size=chunk_size):
+            validator.check_journal(journal)
+        violations = validator.finish()
+    if warn:
+        diagnostics.warn(stacklevel=2)
+    return violations
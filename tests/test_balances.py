@@ -0,0 +1,53 @@
+import pytest
+
+from journal_lib import Diagnostics, balances_from_file, balances_from_str, journal_from_str
+from journal_lib.parse.chunking import chunk_bounds
+
+ACCOUNTS = ("Expenses:Food", "Expenses:Rent", "Expenses:Fuel", "Income:Salary")
+
+
+def journal() -> str:
+    """A journal with elided amounts, two commodities, comments and directives between the entries"""
+    blocks = ["account Assets:Cash\ncommodity NOK\n"]
+    for i in range(60):
+        account = ACCOUNTS[i % len(ACCOUNTS)]
+        amount = f"{i * 7 % 100}.{i % 100:02}"
+        date = f"2023-{i % 12 + 1:02}-{i % 28 + 1:02}"
+        if i % 3 == 0:
+            postings = f"    {account}  {amount} NOK\n    Assets:Cash\n"
+        elif i % 3 == 1:
+            postings = f"    {account}  ${amount}\n    Assets:Cash  $-{amount}\n"
+        else:
+            postings = f"    {account}  {amount} NOK  ; note\n    ; entry comment\n    {account}  $1\n    Assets:Cash\n"
+        header = f"{date}={date} * Entry {i}" if i % 5 == 0 else f"{date} Entry {i}"
+        blocks.append(header + "\n" + postings)
+        if i % 10 == 0:
+            blocks.append("comment\nNot an entry\n\nstill a comment\nend comment\n")
+        if i % 15 == 0:
+            blocks.append(f"; a comment\naccount {account}\n")
+    return "\n".join(blocks)
+
+
+def eager_balances(data: str) -> dict:
+    return journal_from_str(data, diagnostics=Diagnostics()).to_columns().account_totals()
+
+
+def test_streaming_balances_match_eager_balances():
+    data = journal()
+    diagnostics = Diagnostics()
+    expected = eager_balances(data)
+    assert len(expected) == 10
+    assert balances_from_str(data, diagnostics=diagnostics) == expected
+    assert not diagnostics.errors
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, 400, 1 << 20])
+def test_balances_across_chunk_boundaries(tmp_path, chunk_size):
+    data = journal()
+    path = tmp_path / "main.journal"
+    path.write_text(data)
+    if chunk_size < 100:
+        assert len(list(chunk_bounds(data, chunk_size))) > 60
+    diagnostics = Diagnostics()
+    assert balances_from_file(path, diagnostics=diagnostics, chunk_size=chunk_size) == eager_balances(data)
+    assert not diagnostics.errors
@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+import pytest
+
+from journal_lib import JournalEntry, JournalEntryTransaction, journal_from_str
+from journal_lib.columns import PostingColumns
+from journal_lib.dataclasses import _to_minor
+
+JOURNAL = """2023-01-01 * Groceries
+    Expenses:Food  10.50 NOK
+    Expenses:Coffee  2 NOK
+    Assets:Cash
+
+2023-02-01 * Rent
+    Expenses:Rent  1,000.00 NOK
+    Assets:Cash  -1,000.00 NOK
+"""
+
+
+@pytest.mark.parametrize(
+    "amount, minor",
+    [("10", 1000), ("10.50", 1050), ("-0.05", -5), ("1.5", 150), ("1.230", 123), ("-12.3400", -1234)],
+)
+def test_to_minor(amount, minor):
+    assert _to_minor(amount) == minor
+
+
+@pytest.mark.parametrize("amount", ["1.234", "-0.001", "10.5001"])
+def test_to_minor_excess_precision(amount):
+    with pytest.raises(ValueError, match="more than two decimals"):
+        _to_minor(amount)
+
+
+def test_columns_refuse_excess_precision():
+    entry = JournalEntry(
+        date="2023-01-01",
+        cleared=False,
+        pending=False,
+        title="Fuel",
+        effective_date=None,
+        transactions=[
+            JournalEntryTransaction(account="Expenses:Fuel", currency="NOK", amount="1.234", comment=None),
+            JournalEntryTransaction(account="Assets:Cash", currency=None, amount=None, comment=None),
+        ],
+        comments=[],
+    )
+    with pytest.raises(ValueError):
+        PostingColumns.from_entries([entry])
+
+
+def test_account_totals():
+    totals = journal_from_str(JOURNAL).to_columns().account_totals()
+    assert totals == {
+        ("Expenses:Food", "NOK"): Decimal("10.50"),
+        ("Expenses:Coffee", "NOK"): Decimal("2.00"),
+        ("Assets:Cash", "NOK"): Decimal("-1012.50"),
+        ("Expenses:Rent", "NOK"): Decimal("1000.00"),
+    }
@@ -0,0 +1,87 @@
+import warnings
+
+import pytest
+
+from journal_lib import (
+    Diagnostics,
+    JournalSyntaxWarning,
+    balances_from_str,
+    iter_entries_from_str,
+    iter_journals_from_str,
+    journal_from_str,
+    validate_str,
+)
+
+BROKEN = """2023-01-01 * Groceries
+    Expenses:Food  10 NOK
+    Assets:Cash
+
+2023-01-02 * Broken
+    Expenses:Food  10 NOK  @@@
+    Assets:Cash
+
+2023-01-03 * Coffee
+    Expenses:Food  5 NOK
+    Assets:Cash
+"""
+
+
+def test_errors_are_warned_without_diagnostics():
+    with pytest.warns(JournalSyntaxWarning, match="line 6"):
+        journal = journal_from_str(BROKEN)
+    assert journal.entries[-1].title == "Coffee"
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        lambda data: list(iter_entries_from_str(data)),
+        balances_from_str,
+        validate_str,
+    ],
+)
+def test_streaming_readers_warn(read):
+    with pytest.warns(JournalSyntaxWarning):
+        read(BROKEN)
+
+
+def test_errors_are_collected_with_diagnostics():
+    diagnostics = Diagnostics()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        journal_from_str(BROKEN, diagnostics=diagnostics)
+    assert [d.lineno for d in diagnostics] and diagnostics.errors[0].lineno == 6
+
+
+def test_no_warning_without_errors():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        journal_from_str(BROKEN.replace("  @@@", ""))
+
+
+def test_eof_error_in_a_chunk():
+    data = """2023-01-01 * Groceries
+    Expenses:Food  10 NOK
+    Assets:Cash
+
+2023-01-02 * Broken
+
+2023-01-03 * Coffee
+    Expenses:Food  5 NOK
+    Assets:Cash
+"""
+    diagnostics = Diagnostics()
+    # The first chunk ends after the broken entry
+    journals = list(iter_journals_from_str(data, diagnostics=diagnostics, chunk_size=70))
+    assert [[e.title for e in j.entries] for j in journals] == [["Groceries"], ["Coffee"]]
+    [error] = diagnostics.errors
+    assert error.message == "Syntax error at EOF"
+    assert (error.lineno, error.column, error.line) == (5, 19, "2023-01-02 * Broken")
+
+
+def test_eof_error_at_the_end():
+    diagnostics = Diagnostics()
+    data = "2023-01-01 * Groceries\n    Assets:Cash\n\n2023-01-02 * Broken\n"
+    journal_from_str(data, diagnostics=diagnostics)
+    [error] = diagnostics.errors
+    assert (error.lineno, error.column) == (4, 19)
@@ -0,0 +1,70 @@
+import sqlite3
+
+from journal_lib import JournalEntry, JournalEntryTransaction, journal_from_str
+from journal_lib.export import journal_to_sqlite
+from journal_lib.export.ledger import entry_to_ledger, journal_to_ledger
+
+JOURNAL = """account Assets:Cash
+
+2023-01-01=2023-01-02 * Groceries
+    ; weekly
+    Expenses:Food  10.50 NOK  ; milk
+    Assets:Cash
+"""
+
+
+def entry(title: str | None) -> JournalEntry:
+    return JournalEntry(
+        date="2023-01-01",
+        cleared=True,
+        pending=False,
+        title=title,
+        effective_date=None,
+        transactions=[
+            JournalEntryTransaction(account="Expenses:Food", currency="NOK", amount="10", comment=None),
+            JournalEntryTransaction(account="Assets:Cash", currency=None, amount=None, comment=None),
+        ],
+        comments=[],
+    )
+
+
+def test_entry_without_title():
+    assert entry_to_ledger(entry(None)).splitlines()[0] == "2023-01-01 *"
+    assert entry_to_ledger(entry("Food")).splitlines()[0] == "2023-01-01 * Food"
+
+
+def test_round_trip():
+    journal = journal_from_str(JOURNAL)
+    assert journal_from_str(journal_to_ledger(journal)) == journal
+
+
+def postings(db_path) -> list[tuple]:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT e.title, a.name, p.commodity, p.amount, p.amount_minor, p.inferred "
+            "FROM postings p JOIN entries e ON e.id = p.entry_id JOIN accounts a ON a.id = p.account_id "
+            "ORDER BY p.id"
+        ).fetchall()
+
+
+def test_sqlite_from_file_with_includes(tmp_path):
+    included = tmp_path / "included.journal"
+    included.write_text("2023-01-03 * Rent\n    Expenses:Rent  1,000.00 NOK\n    Assets:Cash\n")
+    main = tmp_path / "main.journal"
+    main.write_text(JOURNAL + f"\ninclude {included}\n")
+    counts = journal_to_sqlite(main, tmp_path / "file.db")
+    assert counts == {"added": 2, "deleted": 0, "unchanged": 0}
+    assert postings(tmp_path / "file.db") == [
+        ("Groceries", "Expenses:Food", "NOK", "10.50", 1050, 0),
+        ("Groceries", "Assets:Cash", "NOK", "-10.50", -1050, 1),
+        ("Rent", "Expenses:Rent", "NOK", "1000.00", 100000, 0),
+        ("Rent", "Assets:Cash", "NOK", "-1000.00", -100000, 1),
+    ]
+
+    # The same as loading the parsed journal
+    journal = journal_from_str(JOURNAL + "\n" + included.read_text())
+    journal_to_sqlite(journal, tmp_path / "journal.db")
+    assert postings(tmp_path / "journal.db") == postings(tmp_path / "file.db")
+
+    counts = journal_to_sqlite(main, tmp_path / "file.db", incremental=True)
+    assert counts == {"added": 0, "deleted": 0, "unchanged": 2}
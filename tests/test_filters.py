@@ -0,0 +1,30 @@
+from journal_lib import EntryFilter, journal_from_str
+
+JOURNAL = """2023-02-01 = 2023-02-03 ! Rent
+    Expenses:Rent  100 NOK
+    Assets:Cash
+
+2023-02-01=2023-02-03 * Groceries
+    Expenses:Food  10 NOK
+    Assets:Cash
+
+2023-02-02 Coffee
+    Expenses:Food  5 NOK
+    Assets:Cash
+"""
+
+
+def titles(entry_filter: EntryFilter) -> list[str]:
+    return [entry.title for entry in journal_from_str(JOURNAL, entry_filter=entry_filter).entries]
+
+
+def test_status_with_effective_date():
+    assert titles(EntryFilter(status="pending")) == ["Rent"]
+    assert titles(EntryFilter(status="cleared")) == ["Groceries"]
+    assert titles(EntryFilter(status="unmarked")) == ["Coffee"]
+
+
+def test_status_matches_unfiltered_parse():
+    entries = journal_from_str(JOURNAL).entries
+    kept = titles(EntryFilter(status=("cleared", "pending", "unmarked")))
+    assert kept == [entry.title for entry in entries]
@@ -0,0 +1,31 @@
+from journal_lib import Diagnostics, balances_from_str, headers_from_str, journal_from_str
+
+JOURNAL = """2023-01-01 * Groceries
+    Expenses:Food  10 NOK
+    Assets:Cash
+
+2023-01-02 *
+    Expenses:Rent  100 NOK
+    Assets:Cash
+
+2023-01-03=2023-01-05 !
+    Expenses:Food  5 NOK
+    Assets:Cash
+"""
+
+
+def test_headers_match_full_parse():
+    diagnostics = Diagnostics()
+    entries = journal_from_str(JOURNAL, diagnostics=diagnostics).entries
+    headers = headers_from_str(JOURNAL, diagnostics=diagnostics)
+    assert not diagnostics.errors
+    assert [h.title for h in headers] == ["Groceries", None, None]
+    assert [(h.date, h.effective_date, h.cleared, h.pending, h.title) for h in headers] == [
+        (e.date, e.effective_date, e.cleared, e.pending, e.title) for e in entries
+    ]
+
+
+def test_untitled_entry_keeps_its_first_posting():
+    entry = journal_from_str(JOURNAL).entries[1]
+    assert [t.account for t in entry.transactions] == ["Expenses:Rent", "Assets:Cash"]
+    assert balances_from_str(JOURNAL)[("Expenses:Rent", "NOK")] == 100
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+
+def run(code: str) -> str:
+    """Run code in a fresh interpreter, so nothing is imported beforehand"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    return result.stdout.strip()
+
+
+def test_star_import_package():
+    code = "from journal_lib import *\nprint(journal_from_str.__name__, Journal.__name__, EntryFilter.__name__)"
+    assert run(code) == "journal_from_str Journal EntryFilter"
+
+
+def test_star_import_parse():
+    code = "from journal_lib.parse import *\nprint(JournalLexer.__name__, JournalParser.__name__)"
+    assert run(code) == "JournalLexer JournalParser"
+
+
+def test_lazy_import():
+    code = "import sys, journal_lib\nprint('journal_lib.parse.ply.yacc' in sys.modules)"
+    assert run(code) == "False"
+
+
+def test_parsing_does_not_import_numpy():
+    code = (
+        "import sys\n"
+        "from journal_lib import journal_from_str, validate_journal\n"
+        "from journal_lib.reports import iter_register\n"
+        "print('numpy' in sys.modules, 'journal_lib.columns' in sys.modules)"
+    )
+    assert run(code) == "False False"
@@ -0,0 +1,79 @@
+from journal_lib import Diagnostics, iter_entries_from_str, journal_from_str
+
+JOURNAL = """account Assets:Cash
+
+2023-01-01 * One
+    Expenses:Food  10 NOK
+    Assets:Cash
+
+2023-01-02 * Two amounts
+    Expenses:Food  10 NOK 5 NOK
+    Assets:Cash
+
+2023-01-03 * Three
+    Expenses:Rent  100 NOK  ; rent
+    Assets:Cash  -100 NOK
+
+2023-01-04 * No postings
+
+2023-01-05 * Five
+    Expenses:Food  5 NOK
+    Assets:Cash
+
+account
+
+2023-01-06 * Six
+    ; a comment
+    Expenses:Fuel  $20
+    Assets:Cash
+
+2023-01-07 * Last
+"""
+
+ERRORS = [
+    ("Syntax error at '5'", 8, 26),
+    ("Syntax error, incomplete element before '2023-01-05'", 15, 24),
+    ("Syntax error, incomplete element before '2023-01-06'", 21, 7),
+    ("Syntax error at EOF", 28, 17),
+]
+
+
+def postings(entry):
+    return [(t.account, t.amount, t.currency, t.comment) for t in entry.transactions]
+
+
+def test_one_pass_reports_every_error():
+    diagnostics = Diagnostics()
+    journal = journal_from_str(JOURNAL, diagnostics=diagnostics)
+    assert [(d.message, d.lineno, d.column) for d in diagnostics] == ERRORS
+    assert all(d.kind == "syntax" for d in diagnostics)
+    assert diagnostics.errors[0].line == "    Expenses:Food  10 NOK 5 NOK"
+
+    assert [a.account for a in journal.accounts] == ["Assets:Cash"]
+    assert [(e.title, e.lineno) for e in journal.entries] == [
+        ("One", 3),
+        ("Three", 11),
+        ("Five", 17),
+        ("Six", 23),
+    ]
+    one, three, five, six = journal.entries
+    assert postings(one) == [("Expenses:Food", "10", "NOK", None), ("Assets:Cash", None, None, None)]
+    assert postings(three) == [("Expenses:Rent", "100", "NOK", "rent"), ("Assets:Cash", "-100", "NOK", None)]
+    assert postings(five) == [("Expenses:Food", "5", "NOK", None), ("Assets:Cash", None, None, None)]
+    assert postings(six) == [("Expenses:Fuel", "20", "$", None), ("Assets:Cash", None, None, None)]
+    assert six.comments == ["a comment"]
+
+
+def test_error_at_eof_keeps_the_entries_before():
+    diagnostics = Diagnostics()
+    data = "2023-01-01 * One\n    Assets:Cash  5 NOK\n    Expenses:Food\n\n2023-01-02"
+    journal = journal_from_str(data, diagnostics=diagnostics)
+    assert [e.title for e in journal.entries] == ["One"]
+    assert [(d.message, d.lineno, d.column) for d in diagnostics] == [("Syntax error at EOF", 5, 10)]
+
+
+def test_chunks_report_the_same_errors():
+    diagnostics = Diagnostics()
+    titles = [e.title for e in iter_entries_from_str(JOURNAL, diagnostics=diagnostics, chunk_size=40)]
+    assert titles == ["One", "Three", "Five", "Six"]
+    assert [(d.message, d.lineno, d.column) for d in diagnostics] == ERRORS
@@ -0,0 +1,239 @@
+import io
+from decimal import Decimal
+
+import pytest
+
+from journal_lib import journal_from_str
+from journal_lib.columns import month_name
+from journal_lib.reports import (
+    Aggregate,
+    BalanceRow,
+    JournalIndex,
+    QueryError,
+    RegisterRow,
+    aggregate,
+    balance_matrix,
+    compile_query,
+    iter_register,
+    period_label,
+    period_number,
+    rolling,
+    run_query,
+    statement_path,
+    write_register,
+    write_statements,
+)
+
+JOURNAL = """2023-01-05 * Groceries
+    Expenses:Food:Groceries  10.50 NOK
+    Assets:Cash
+
+2023-01-20 * Coffee
+    Expenses:Food:Coffee  4.00 NOK
+    Assets:Cash
+
+2023-02-01 * Rent
+    Expenses:Rent  1,000.00 NOK
+    Assets:Bank
+
+2023-04-02 * Books
+    Expenses:Books  $20
+    Assets:Bank  $-20
+"""
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def journal(request, monkeypatch):
+    """The journal, with the reports run with and without NumPy"""
+    if request.param == "pure":
+        import journal_lib.columns
+        import journal_lib.reports.aggregates
+        import journal_lib.reports.balances
+        import journal_lib.reports.query
+
+        for module in (
+            journal_lib.columns,
+            journal_lib.reports.balances,
+            journal_lib.reports.aggregates,
+            journal_lib.reports.query,
+        ):
+            monkeypatch.setattr(module, "np", None)
+    else:
+        pytest.importorskip("numpy")
+    return journal_from_str(JOURNAL)
+
+
+def amounts(*values: str) -> list[Decimal]:
+    return [Decimal(value) for value in values]
+
+
+def test_month_numbers_match_the_month_column(journal):
+    columns = journal.to_columns()
+    months = [int(month) for month in columns.column("month")]
+    assert months == [period_number("month", day) for day in columns.date]
+    assert [month_name(m) for m in months] == [period_label("month", m) for m in months]
+    assert period_label("month", months[0]) == "2023-01"
+
+
+def test_balance_matrix(journal):
+    matrix = balance_matrix(journal)
+    assert matrix.accounts == [
+        "Assets",
+        "Assets:Bank",
+        "Assets:Cash",
+        "Expenses",
+        "Expenses:Books",
+        "Expenses:Food",
+        "Expenses:Food:Coffee",
+        "Expenses:Food:Groceries",
+        "Expenses:Rent",
+    ]
+    assert matrix.periods == ["2023-01", "2023-02", "2023-03", "2023-04"]
+    assert matrix.commodities == ["NOK", "$"]
+    assert matrix.series("Expenses", "NOK") == amounts("14.50", "1014.50", "1014.50", "1014.50")
+    assert matrix.series("Assets:Cash", "NOK", cumulative=False) == amounts("-14.50", "0", "0", "0")
+    assert matrix.series("Assets:Bank", "$") == amounts("0", "0", "0", "-20")
+
+
+def test_balance_matrix_by_quarter(journal):
+    matrix = balance_matrix(journal, period="quarter", rollup=False, depth=1, start="2023-01-10")
+    assert matrix.accounts == ["Assets", "Expenses"]
+    assert matrix.periods == ["2023-Q1", "2023-Q2"]
+    assert matrix.series("Expenses", "NOK", cumulative=False) == amounts("1004", "0")
+    assert matrix.series("Expenses", "$", cumulative=False) == amounts("0", "20")
+
+
+def test_aggregate_by_month(journal):
+    result = aggregate(journal, accounts="^Expenses", depth=2, top=1)
+    assert list(result) == [
+        ("2023-01", "Expenses:Food", "NOK"),
+        ("2023-02", "Expenses:Rent", "NOK"),
+        ("2023-04", "Expenses:Books", "$"),
+    ]
+    assert result["2023-01", "Expenses:Food", "NOK"] == Aggregate(
+        total=Decimal("14.50"),
+        count=2,
+        min=Decimal("4.00"),
+        max=Decimal("10.50"),
+        largest=[("2023-01-05", 0, "Expenses:Food:Groceries", Decimal("10.50"))],
+    )
+
+
+def test_aggregate_by_year_from_start(journal):
+    result = aggregate(journal, period="year", start="2023-01-10", end="2023-04-01")
+    assert {key: (a.total, a.count) for key, a in result.items()} == {
+        ("2023", "Assets:Bank", "NOK"): (Decimal("-1000"), 1),
+        ("2023", "Assets:Cash", "NOK"): (Decimal("-4"), 1),
+        ("2023", "Expenses:Food:Coffee", "NOK"): (Decimal("4"), 1),
+        ("2023", "Expenses:Rent", "NOK"): (Decimal("1000"), 1),
+    }
+
+
+def test_rolling(journal):
+    result = rolling(journal, days=10, accounts="Food", depth=2, start="2023-01-12", end="2023-01-22")
+    assert {day: a.total for (day, group, commodity), a in result.items()} == {
+        "2023-01-12": Decimal("10.50"),
+        "2023-01-13": Decimal("10.50"),
+        "2023-01-14": Decimal("10.50"),
+        "2023-01-20": Decimal("4.00"),
+        "2023-01-21": Decimal("4.00"),
+    }
+    assert {(group, commodity) for _, group, commodity in result} == {("Expenses:Food", "NOK")}
+
+
+def test_rolling_window_with_two_postings(journal):
+    result = rolling(journal, days=30, accounts="Food", depth=2, top=2, start="2023-01-20", end="2023-01-21")
+    assert result == {
+        ("2023-01-20", "Expenses:Food", "NOK"): Aggregate(
+            total=Decimal("14.50"),
+            count=2,
+            min=Decimal("4.00"),
+            max=Decimal("10.50"),
+            largest=[
+                ("2023-01-05", 0, "Expenses:Food:Groceries", Decimal("10.50")),
+                ("2023-01-20", 1, "Expenses:Food:Coffee", Decimal("4.00")),
+            ],
+        )
+    }
+
+
+def test_balance_query(journal):
+    assert list(run_query("bal ^Expenses depth:2", journal)) == [
+        BalanceRow("Expenses", "$", Decimal("20")),
+        BalanceRow("Expenses", "NOK", Decimal("1014.50")),
+        BalanceRow("Expenses:Books", "$", Decimal("20")),
+        BalanceRow("Expenses:Food", "NOK", Decimal("14.50")),
+        BalanceRow("Expenses:Rent", "NOK", Decimal("1000")),
+    ]
+    rows = run_query("bal assets date:2023-01 cur:NOK", journal)
+    assert [(row.account, row.amount) for row in rows] == [
+        ("Assets", Decimal("-14.50")),
+        ("Assets:Cash", Decimal("-14.50")),
+    ]
+
+
+def test_register_query(journal):
+    index = JournalIndex(journal)
+    query = compile_query("reg ^Assets:Bank")
+    assert list(query.run(index)) == [
+        RegisterRow("2023-02-01", "Rent", "Assets:Bank", "NOK", Decimal("-1000"), Decimal("-1000")),
+        RegisterRow("2023-04-02", "Books", "Assets:Bank", "$", Decimal("-20"), Decimal("-20")),
+    ]
+    rows = run_query("reg Assets payee:/^r/ date:2023-02..", index)
+    assert [(row.date, row.title) for row in rows] == [("2023-02-01", "Rent")]
+    assert list(run_query("reg status:pending", index)) == []
+
+
+@pytest.mark.parametrize("text", ["", "sum Assets", "bal depth:x", "reg payee:(", "bal date:2023-13"])
+def test_invalid_queries(text):
+    with pytest.raises(QueryError):
+        compile_query(text)
+
+
+def test_register_running_totals():
+    entries = journal_from_str(JOURNAL).entries
+    rows = [
+        (row.date, row.account, row.commodity, row.amount, row.total) for row in iter_register(entries, "^Assets")
+    ]
+    assert rows == [
+        ("2023-01-05", "Assets:Cash", "NOK", Decimal("-10.50"), Decimal("-10.50")),
+        ("2023-01-20", "Assets:Cash", "NOK", Decimal("-4.00"), Decimal("-14.50")),
+        ("2023-02-01", "Assets:Bank", "NOK", Decimal("-1000"), Decimal("-1014.50")),
+        ("2023-04-02", "Assets:Bank", "$", Decimal("-20"), Decimal("-20")),
+    ]
+    totals = [row.total for row in iter_register(entries, "^Assets", by_account=True)]
+    assert totals == [Decimal("-10.50"), Decimal("-14.50"), Decimal("-1000"), Decimal("-20")]
+
+
+def test_register_infers_every_commodity():
+    data = "2023-01-01 * Exchange\n    Assets:NOK  -100 NOK\n    Assets:USD  $10\n    Equity:Conversion\n"
+    rows = list(iter_register(journal_from_str(data).entries, "Equity"))
+    assert [(row.commodity, row.amount) for row in rows] == [("NOK", Decimal("100")), ("$", Decimal("-10"))]
+
+
+def test_register_needs_sorted_entries():
+    entries = journal_from_str(JOURNAL).entries
+    with pytest.raises(ValueError, match="sorted by date"):
+        list(iter_register(entries[::-1]))
+
+
+def test_write_register():
+    fp = io.StringIO()
+    write_register(journal_from_str(JOURNAL).entries, fp, accounts="Cash", batch_size=1)
+    assert fp.getvalue().splitlines() == [
+        f"2023-01-05 {'Groceries':30} {'Assets:Cash':40} {'-10.50 NOK':>16} {'-10.50 NOK':>16}",
+        f"2023-01-20 {'Coffee':30} {'Assets:Cash':40} {'-4.00 NOK':>16} {'-14.50 NOK':>16}",
+    ]
+
+
+def test_write_statements(tmp_path):
+    paths = write_statements(journal_from_str(JOURNAL).entries, tmp_path, accounts="^Assets", buffer_lines=1)
+    assert paths == {
+        "Assets:Cash": statement_path(tmp_path, "Assets:Cash"),
+        "Assets:Bank": statement_path(tmp_path, "Assets:Bank"),
+    }
+    assert paths["Assets:Bank"].read_text().splitlines() == [
+        f"2023-02-01 {'Rent':30} {'-1000.00 NOK':>16} {'-1000.00 NOK':>16}",
+        f"2023-04-02 {'Books':30} {'$-20.00':>16} {'$-20.00':>16}",
+    ]
+    assert len(paths["Assets:Cash"].read_text().splitlines()) == 2
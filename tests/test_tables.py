@@ -0,0 +1,19 @@
+import importlib
+
+from journal_lib.parse import JournalLexer, JournalParser
+from journal_lib.parse.tabgen import write_tables
+from journal_lib.parse.tables import TABMODULE, load_tables
+
+
+def test_shipped_tables_match_the_grammar():
+    module = importlib.import_module(TABMODULE)
+    assert load_tables(TABMODULE, JournalLexer, "t_", "_lexsignature") is module
+    assert load_tables(TABMODULE, JournalParser, "p_", "_lrsignature") is module
+
+
+def test_shipped_tables_are_regenerated(tmp_path):
+    filename = tmp_path / "ledgertab.py"
+    write_tables(filename)
+    module = importlib.import_module(TABMODULE)
+    with open(module.__file__) as f:
+        assert filename.read_text() == f.read()
@@ -0,0 +1,87 @@
+from journal_lib import Diagnostics, journal_from_str, validate_file, validate_journal, validate_str
+
+JOURNAL = """account Assets:Cash
+account Expenses:Food
+commodity NOK
+
+2023-01-01 * Groceries
+    Expenses:Food  10 NOK
+    Assets:Cash
+
+2023-01-02 * Unbalanced
+    Expenses:Food  10 NOK
+    Assets:Cash  -9 NOK
+
+2023-01-03 * Two elided
+    Expenses:Food
+    Assets:Cash
+
+2023-01-04 * Undeclared
+    Expenses:Fuel  $5
+    Assets:Cash  $-5
+"""
+
+
+def test_violations():
+    violations = validate_journal(journal_from_str(JOURNAL), strict=True)
+    assert [(v.kind, v.lineno, v.column) for v in violations] == [
+        ("unbalanced", 9, 0),
+        ("multiple_elided", 13, 0),
+        ("undeclared_account", 17, 0),
+        ("undeclared_commodity", 17, 0),
+    ]
+    assert violations[0].message == "Entry does not balance, off by 1.00 NOK"
+    assert violations[2].account == "Expenses:Fuel"
+    assert violations[3].commodity == "$"
+
+
+def test_not_strict():
+    kinds = [v.kind for v in validate_journal(journal_from_str(JOURNAL))]
+    assert kinds == ["unbalanced", "multiple_elided"]
+
+
+def test_chunks_and_workers_agree():
+    data = "\n".join([JOURNAL] * 20)
+    expected = validate_str(data, strict=True, diagnostics=Diagnostics())
+    assert len(expected) == 20 * 2 + 2
+    assert validate_str(data, strict=True, diagnostics=Diagnostics(), chunk_size=200) == expected
+    assert validate_str(data, strict=True, workers=2, diagnostics=Diagnostics(), chunk_size=200) == expected
+
+
+BROKEN = """2023-01-05 * Bad amount
+    Expenses:Food  10 NOK 5
+    Assets:Cash
+
+2023-01-06 * No postings
+
+2023-01-07 * Illegal
+    Expenses:Food  ¤10
+    Assets:Cash
+"""
+
+
+def where(diagnostics: Diagnostics) -> list[tuple]:
+    return [(d.kind, d.message, d.lineno, d.column, d.line) for d in diagnostics]
+
+
+def test_workers_report_the_same_diagnostics(tmp_path):
+    data = "\n".join([JOURNAL, BROKEN] * 10) + "\n2023-02-01 * Last\n"
+    whole = Diagnostics()
+    expected = validate_str(data, strict=True, diagnostics=whole)
+    assert len(whole.errors) == 10 * 4 + 1
+    assert whole.errors[-1].message == "Syntax error at EOF"
+
+    serial = Diagnostics()
+    assert validate_str(data, strict=True, diagnostics=serial, chunk_size=200) == expected
+    parallel = Diagnostics()
+    assert validate_str(data, strict=True, workers=2, diagnostics=parallel, chunk_size=200) == expected
+    assert where(serial) == where(parallel) == where(whole)
+    assert serial.errors == parallel.errors
+
+    path = tmp_path / "main.journal"
+    path.write_text(data)
+    serial = Diagnostics()
+    assert validate_file(path, strict=True, diagnostics=serial, chunk_size=200) == expected
+    parallel = Diagnostics()
+    assert validate_file(path, strict=True, workers=2, diagnostics=parallel, chunk_size=200) == expected
+    assert where(serial) == where(parallel) == where(whole)
@@ -0,0 +1,58 @@
+from journal_lib.parse.ply import lex, yacc
+
+
+class Grammar:
+    tokens = ("A", "B")
+    t_ignore = " "
+    t_A = "a"
+    t_B = "b"
+
+    def __init__(self, relocate: bool = False):
+        # Move the pairs before every pair but the first to line 7 in p_pairs
+        self.relocate = relocate
+
+    def t_newline(self, t):
+        r"\n"
+        t.lexer.lineno += 1
+
+    def t_error(self, t):
+        t.lexer.skip(1)
+
+    def p_pairs(self, p):
+        """pairs : pairs pair
+                 | pair"""
+        if len(p) == 3 and self.relocate:
+            p.set_lineno(1, 7)
+            p[0] = p[1] + [(p[2], p.lineno(1), p.lexpos(2))]
+        elif len(p) == 3:
+            p[0] = p[1] + [(p[2], p.lineno(2), p.lexpos(2))]
+        else:
+            p[0] = [(p[1], p.lineno(1), p.lexpos(1))]
+
+    def p_pair(self, p):
+        """pair : A B"""
+        # The position of a pair is the position of its B
+        p.set_lineno(0, p.lineno(2))
+        p.set_lexpos(0, p.lexpos(2))
+        p[0] = "ab"
+
+    def p_error(self, p):
+        pass
+
+
+def parse(data: str, relocate: bool = False):
+    grammar = Grammar(relocate)
+    parser = yacc.yacc(module=grammar, debug=False)
+    return parser, parser.parse(data, lexer=lex.lex(module=grammar))
+
+
+def test_positions_set_on_results():
+    _, result = parse("a b\na\nb")
+    assert result == [("ab", 1, 2), ("ab", 3, 6)]
+
+
+def test_positions_set_on_symbols():
+    parser, result = parse("a b a b a b", relocate=True)
+    assert result == [("ab", 1, 2), ("ab", 7, 6), ("ab", 7, 10)]
+    # The symbol shared by the reductions of pairs doesn't keep the position
+    assert not hasattr(parser.nonterminals["pairs"], "lineno")